@@ -5,14 +5,18 @@ import base64
 from model.pose_detector import PoseDetector
 from model.feedback_rules import check_pullup_form
 from model.rep_counter import RepCounter
+from utils.codec import get_codec
 
 # Flask API configuration
 FLASK_API_URL = "http://localhost:5000/api"
 
-def encode_frame_to_base64(frame):
+# Upload codec (libjpeg-turbo when simplejpeg is installed) at its default quality,
+# well below the 95 OpenCV defaults to
+CODEC = get_codec()
+
+def encode_frame_to_base64(frame, quality=None):
     """Convert frame to base64 string for API transmission"""
-    _, buffer = cv2.imencode('.jpg', frame)
-    frame_base64 = base64.b64encode(buffer).decode('utf-8')
+    frame_base64 = base64.b64encode(CODEC.encode(frame, quality)).decode('utf-8')
     return frame_base64
 
 def call_flask_api(endpoint, data):
@@ -0,0 +1,123 @@
+import asyncio
+import contextlib
+import os
+from concurrent.futures import ThreadPoolExecutor
+from starlette.applications import Starlette
+from starlette.middleware import Middleware
+from starlette.middleware.cors import CORSMiddleware
+from starlette.responses import JSONResponse, Response, StreamingResponse
+from starlette.routing import Route
+from server.admission import now_ms
+from server.broadcast import AsyncSubscriber
+from server.encoding import BINARY_MEDIA_TYPE, encode_binary, to_json, wants_binary
+from server.factory import SSE_HEADERS, parse_args, print_banner, start_local_transport
+from server.pipeline import AnalysisService
+from server.profiles import get_profile, configure_logging
+
+# Same endpoints and responses as flask_server.py, served by an asyncio event loop.
+# Connections cost a coroutine instead of a thread; CPU work (decode, MediaPipe,
+# encode) runs on a bounded thread pool so the loop stays free.
+
+# Profile comes from $SERVER_PROFILE (dev/prod/bench), defaulting to prod
+profile = get_profile()
+configure_logging(profile)
+
+# Sessions, load tracking and admission control shared by all endpoints
+service = AnalysisService(profile)
+
+# One worker per inference slot plus the frames admission control lets wait
+executor = ThreadPoolExecutor(
+    max_workers=service.admission.max_concurrent + service.admission.max_waiting,
+    thread_name_prefix="inference",
+)
+
+def respond(result, accept=None):
+    body, status, headers = result
+    if status == 200 and wants_binary(accept):
+        return Response(encode_binary(body), status_code=status, headers=headers, media_type=BINARY_MEDIA_TYPE)
+    return JSONResponse(to_json(body), status_code=status, headers=headers)
+
+async def read_json(request):
+    try:
+        return await request.json()
+    except ValueError:
+        return None
+
+async def health_check(request):
+    """Health check endpoint"""
+    return respond(service.health())
+
+async def metrics(request):
+    """Load and quality metrics"""
+    return respond(service.metrics())
+
+async def reset_counter(request):
+    """Reset the rep counter"""
+    return respond(service.reset_counter(await read_json(request)))
+
+async def analyze_frame(request):
+    """Simple frame analysis - just rep counting and angle like app.py"""
+    arrival_ms = now_ms()
+    data = await read_json(request)
+
+    # Reject empty or already-expired frames without occupying a worker
+    rejected = service.precheck_frame(data, arrival_ms=arrival_ms)
+    if rejected is not None:
+        return respond(rejected)
+
+    loop = asyncio.get_running_loop()
+    return respond(await loop.run_in_executor(executor, service.analyze_frame, data, None, arrival_ms),
+                   request.headers.get('accept'))
+
+async def session_events(request):
+    """Live reps/stage/angle/feedback of a session as server-sent events"""
+    session_id = request.path_params["session_id"]
+    broadcaster = service.broadcaster
+    subscriber = broadcaster.subscribe(
+        session_id, AsyncSubscriber(asyncio.get_running_loop(), broadcaster.queue_size))
+
+    async def stream():
+        try:
+            async for message in subscriber.events():
+                yield message
+        finally:
+            broadcaster.unsubscribe(session_id, subscriber)
+
+    return StreamingResponse(stream(), media_type='text/event-stream', headers=SSE_HEADERS)
+
+@contextlib.asynccontextmanager
+async def lifespan(app):
+    # LOCAL_TRANSPORT is set by --local-transport (empty string = default address)
+    local_transport = None
+    if os.environ.get("LOCAL_TRANSPORT") is not None:
+        local_transport = start_local_transport(service, os.environ["LOCAL_TRANSPORT"])
+    yield
+    if local_transport is not None:
+        local_transport.close()
+    executor.shutdown(wait=False)
+
+app = Starlette(
+    routes=[
+        Route('/api/health', health_check, methods=['GET']),
+        Route('/api/metrics', metrics, methods=['GET']),
+        Route('/api/reset-counter', reset_counter, methods=['POST']),
+        Route('/api/analyze-frame', analyze_frame, methods=['POST']),
+        Route('/api/sessions/{session_id}/events', session_events, methods=['GET']),
+    ],
+    middleware=[Middleware(CORSMiddleware, allow_origins=['*'], allow_methods=['*'], allow_headers=['*'])],
+    lifespan=lifespan,
+)
+
+if __name__ == '__main__':
+    import uvicorn
+
+    args = parse_args("ASGI API server")
+    if args.profile:
+        # Re-import under the requested profile
+        os.environ["SERVER_PROFILE"] = args.profile
+        profile = get_profile(args.profile)
+    if args.local_transport is not None:
+        os.environ["LOCAL_TRANSPORT"] = args.local_transport
+    print_banner("ASGI API Server", profile, args.port)
+    uvicorn.run("asgi_server:app", host=args.host, port=args.port, backlog=4096, timeout_keep_alive=75,
+                log_level=profile["log_level"].lower(), reload=profile["debug"])
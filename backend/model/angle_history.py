@@ -0,0 +1,82 @@
+# angle_history.py
+import numpy as np
+
+class AngleHistory:
+    """Fixed-size ring buffer of timestamped joint angles for one session.
+
+    Holds the last `seconds` of samples at up to `max_fps`; appending is O(1)
+    and never allocates. Window statistics are computed over NumPy views, so
+    rules can look at motion over time without keeping growing Python lists.
+    """
+
+    def __init__(self, seconds=10.0, max_fps=60, channels=("angle",)):
+        self.seconds = seconds
+        self.channels = tuple(channels)
+        self.capacity = int(seconds * max_fps)
+        self.timestamps = np.zeros(self.capacity)
+        self.values = np.zeros((self.capacity, len(self.channels)))
+        self._next = 0  # slot the next sample goes into
+        self._size = 0
+
+    def append(self, timestamp, *values):
+        """Add one sample (timestamp in seconds, one value per channel)"""
+        self.timestamps[self._next] = timestamp
+        self.values[self._next] = values
+        self._next = (self._next + 1) % self.capacity
+        self._size = min(self._size + 1, self.capacity)
+
+    def __len__(self):
+        return self._size
+
+    def clear(self):
+        self._next = 0
+        self._size = 0
+
+    def window(self, seconds=None):
+        """(timestamps, values) of the samples in the last `seconds`, oldest first"""
+        start = (self._next - self._size) % self.capacity
+        if start + self._size <= self.capacity:
+            timestamps = self.timestamps[start:start + self._size]
+            values = self.values[start:start + self._size]
+        else:
+            # Wrapped around: one copy to put the samples back in order
+            order = np.arange(start, start + self._size) % self.capacity
+            timestamps, values = self.timestamps[order], self.values[order]
+        if self._size:
+            cutoff = timestamps[-1] - (seconds or self.seconds)
+            first = np.searchsorted(timestamps, cutoff, side="left")
+            timestamps, values = timestamps[first:], values[first:]
+        return timestamps, values
+
+    def stats(self, seconds=None):
+        """Per-channel statistics over the window: mean, min, max, range, variance,
+        mean and peak absolute velocity (units per second)"""
+        timestamps, values = self.window(seconds)
+        if len(timestamps) == 0:
+            return {}
+        low, high = values.min(axis=0), values.max(axis=0)
+        stats = {
+            "samples": len(timestamps),
+            "duration": float(timestamps[-1] - timestamps[0]),
+            "mean": values.mean(axis=0),
+            "min": low,
+            "max": high,
+            "range": high - low,
+            "variance": values.var(axis=0),
+            "velocity": np.zeros(len(self.channels)),
+            "peak_velocity": np.zeros(len(self.channels)),
+        }
+        if len(timestamps) > 1:
+            dt = np.diff(timestamps)
+            valid = dt > 0
+            if valid.any():
+                speed = np.abs(np.diff(values, axis=0)[valid] / dt[valid, None])
+                stats["velocity"] = speed.mean(axis=0)
+                stats["peak_velocity"] = speed.max(axis=0)
+        return stats
+
+    def channel_stats(self, channel="angle", seconds=None):
+        """stats() for a single channel, as plain floats"""
+        stats = self.stats(seconds)
+        i = self.channels.index(channel)
+        return {key: (float(value[i]) if isinstance(value, np.ndarray) else value) for key, value in stats.items()}
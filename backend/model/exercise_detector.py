@@ -0,0 +1,129 @@
+# exercise_detector.py
+"""
+Server-side exercise detection for sessions in "auto" mode.
+
+The classifier (model/classifier.py, loaded from EXERCISE_CLASSIFIER) gives
+per-frame exercise probabilities; they are averaged over a short window and
+an exercise is confirmed once its mean passes `confirm`. A confirmed
+exercise is only replaced when its own mean falls below `release` and
+another one passes `confirm`, so a few odd frames never flip the counter.
+
+Without a classifier the decision comes from the candidate rep counters the
+session runs in parallel: the first exercise to lead every other candidate
+by `confirm_reps` reps is confirmed. Only exercises whose first stage the
+athlete is not already in when a set starts can win it, since a set starts at
+rest; that is what tells apart exercises counted on the same angle in
+opposite directions (pull-up and shoulder abduction). Reps are tallied again
+after every confirmation, and a set ends after `pause_frames` frames without
+a rep, so a later switch of exercise is picked up too.
+"""
+import logging
+import os
+from collections import deque
+
+import numpy as np
+
+from .classifier import NO_PHASE, PoseClassifier
+from .rep_counter import EXERCISES, crosses
+
+logger = logging.getLogger(__name__)
+
+AUTO = "auto"
+
+# Trained classifier for the server, e.g. EXERCISE_CLASSIFIER=model/classifier.npz
+CLASSIFIER = PoseClassifier.load(os.environ["EXERCISE_CLASSIFIER"]) if os.environ.get("EXERCISE_CLASSIFIER") else None
+
+class ExerciseDetector:
+    """Decides which exercise a session is doing from a window of recent frames"""
+
+    def __init__(self, classifier=CLASSIFIER, window=30, confirm=0.7, release=0.4, confirm_reps=2,
+                 pause_frames=150):
+        self.classifier = classifier
+        self.confirm = confirm
+        self.release = release
+        self.confirm_reps = confirm_reps
+        self.pause_frames = pause_frames
+        self.exercise = None  # confirmed exercise
+        self.confidence = 0.0  # windowed probability of the confirmed exercise
+        self.phase = None  # the classifier's movement phase ("up" / "down") of the latest frame, if any
+        self._probabilities = deque(maxlen=window)
+        self._previous = None
+        # Rep fallback: exercises that can win the current set (None until it starts),
+        # reps tallied for them since the set started or the last confirmation
+        self._plausible = None
+        self._tally = {}
+        self._seen = {}
+        self._since_rep = 0
+
+    @property
+    def settled(self):
+        """True while the confirmed exercise is not in doubt (candidate counters can pause).
+        Never without a classifier: the candidate counters are what re-evaluates it"""
+        return self.exercise is not None and self.classifier is not None and self.confidence >= self.confirm
+
+    def update(self, features, counters):
+        """Feed one frame's feature vector (None without a pose) and the candidate
+        RepCounters {exercise: counter}; returns the confirmed exercise or None"""
+        if self.classifier is None:
+            return self._confirm_by_reps(counters)
+
+        result = self.classifier.classify(features, self._previous)
+        self._previous = features if result is not None else None
+        self.phase = result["phase"] if result is not None and result["phase"] != NO_PHASE else None
+        if result is None:
+            return self.exercise
+        self._probabilities.append(result["probabilities"])
+        if len(self._probabilities) < self._probabilities.maxlen // 2:
+            return self.exercise
+
+        mean = np.mean(self._probabilities, axis=0)
+        scores = {name: float(p) for name, p in zip(self.classifier.exercises, mean) if name in EXERCISES}
+        if not scores:
+            return self.exercise
+        best = max(scores, key=scores.get)
+        if self.exercise is not None:
+            self.confidence = scores.get(self.exercise, 0.0)
+        if scores[best] >= self.confirm and (self.exercise is None or self.confidence < self.release):
+            self.exercise, self.confidence = best, scores[best]
+        return self.exercise
+
+    def _confirm_by_reps(self, counters):
+        if any(counter.angle is None for counter in counters.values()):
+            return self.exercise
+        if self._plausible is None:
+            # A set starts at rest, outside the first stage of the exercise being done
+            self._plausible = {exercise for exercise, counter in counters.items()
+                               if not crosses(counter.angle, counter.config["enter"])}
+            self._tally = dict.fromkeys(self._plausible, 0)
+            self._seen = {exercise: counter.count for exercise, counter in counters.items()}
+            self._since_rep = 0
+            return self.exercise
+
+        self._since_rep += 1
+        for exercise, counter in counters.items():
+            if counter.count > self._seen[exercise]:
+                self._since_rep = 0
+                if exercise in self._tally:
+                    self._tally[exercise] += counter.count - self._seen[exercise]
+            self._seen[exercise] = counter.count
+        if self._tally:
+            leader = max(self._tally, key=self._tally.get)
+            lead = min((self._tally[leader] - n for e, n in self._tally.items() if e != leader),
+                       default=self._tally[leader])
+            if lead >= self.confirm_reps:
+                self.exercise = leader
+                self._tally = dict.fromkeys(self._tally, 0)
+        if self._since_rep >= self.pause_frames:
+            self._plausible = None  # the next frame starts a new set
+        return self.exercise
+
+    def reset(self):
+        self.exercise = None
+        self.confidence = 0.0
+        self.phase = None
+        self._probabilities.clear()
+        self._previous = None
+        self._plausible = None
+        self._tally = {}
+        self._seen = {}
+        self._since_rep = 0
@@ -0,0 +1,98 @@
+# features.py
+"""
+Camera-invariant pose features.
+
+Raw landmarks are normalized image coordinates, so every rule and threshold
+shifts with where the athlete stands and how far the camera is. Here a pose
+is centered on the hip midpoint and scaled by torso length (shoulder midpoint
+to hip midpoint), optionally keeping MediaPipe's z, and flattened into a
+fixed-length float32 vector:
+
+    normalized x, y (and z) of the 12 limb joints in FEATURE_JOINTS
+    the 8 joint angles in FEATURE_ANGLES, in units of 180 degrees
+    torso uprightness (cosine of the torso's angle to vertical)
+
+Everything is computed with array operations over (N, 33, 4) batches, or
+compact (N, len(SUBSET), 4) ones, so the same code serves one live frame and
+a whole recorded session. Frames without a pose give NaN rows.
+"""
+import numpy as np
+
+from .landmarks import LANDMARK_NAMES, SUBSET, X, Y, Z, rows
+
+# Shoulders, elbows, wrists, hips, knees, ankles (left/right pairs)
+FEATURE_JOINTS = list(SUBSET)
+# (a, vertex, c) landmark triples
+FEATURE_ANGLES = {
+    "left_elbow": (11, 13, 15),
+    "right_elbow": (12, 14, 16),
+    "left_shoulder": (23, 11, 13),
+    "right_shoulder": (24, 12, 14),
+    "left_hip": (11, 23, 25),
+    "right_hip": (12, 24, 26),
+    "left_knee": (23, 25, 27),
+    "right_knee": (24, 26, 28),
+}
+_TRIPLES = np.array(list(FEATURE_ANGLES.values()))
+LEFT_SHOULDER, RIGHT_SHOULDER, LEFT_HIP, RIGHT_HIP = 11, 12, 23, 24
+
+def feature_names(use_z=False):
+    axes = "xyz" if use_z else "xy"
+    return ([f"{LANDMARK_NAMES[j]}_{axis}" for j in FEATURE_JOINTS for axis in axes] +
+            [f"{name}_angle" for name in FEATURE_ANGLES] + ["torso_upright"])
+
+def feature_size(use_z=False):
+    return len(FEATURE_JOINTS) * (3 if use_z else 2) + len(FEATURE_ANGLES) + 1
+
+def angles_between(a, b, c):
+    """Angle ABC in degrees for arrays of 2D or 3D points (..., dims), via dot product and arccos"""
+    ba, bc = a - b, c - b
+    cosine = (ba * bc).sum(axis=-1) / (np.linalg.norm(ba, axis=-1) * np.linalg.norm(bc, axis=-1))
+    return np.degrees(np.arccos(np.clip(cosine, -1.0, 1.0)))
+
+def normalize_poses(poses, use_z=False, aspect=1.0):
+    """(N, joints, 2 or 3) coordinates centered on the hip midpoint, in torso lengths.
+
+    `aspect` is the frame's width / height: MediaPipe normalizes x by the width
+    and y by the height, so x (and z, which uses x's scale) is stretched back
+    before measuring distances.
+    """
+    poses = np.asarray(poses, dtype=np.float32)
+    points = poses[..., [X, Y, Z] if use_z else [X, Y]].copy()
+    if aspect != 1.0:
+        points[..., 0] *= aspect
+        if use_z:
+            points[..., 2] *= aspect
+    left_shoulder, right_shoulder, left_hip, right_hip = rows(poses, [LEFT_SHOULDER, RIGHT_SHOULDER,
+                                                                      LEFT_HIP, RIGHT_HIP])
+    hips = (points[:, left_hip] + points[:, right_hip]) / 2
+    shoulders = (points[:, left_shoulder] + points[:, right_shoulder]) / 2
+    torso = np.linalg.norm(shoulders - hips, axis=-1)
+    torso[torso < 1e-6] = np.nan
+    return (points - hips[:, None]) / torso[:, None, None]
+
+def pose_features(poses, use_z=False, aspect=1.0):
+    """(N, feature_size) float32 feature matrix for a full or compact (N, joints, 4) landmark array"""
+    with np.errstate(invalid="ignore", divide="ignore"):  # no-pose rows are NaN throughout
+        return _pose_features(poses, use_z, aspect)
+
+def _pose_features(poses, use_z, aspect):
+    points = normalize_poses(poses, use_z, aspect)
+    count = len(points)
+    features = np.empty((count, feature_size(use_z)), dtype=np.float32)
+    joints = len(FEATURE_JOINTS) * points.shape[-1]
+    features[:, :joints] = points[:, rows(points, FEATURE_JOINTS)].reshape(count, -1)
+
+    triples = rows(points, _TRIPLES)
+    angles = angles_between(points[:, triples[:, 0]], points[:, triples[:, 1]], points[:, triples[:, 2]])
+    features[:, joints:joints + len(_TRIPLES)] = angles / 180.0
+
+    # Hips are the origin and the torso is one unit long, so the shoulder midpoint is the
+    # torso direction; image y points down
+    left_shoulder, right_shoulder = rows(points, [LEFT_SHOULDER, RIGHT_SHOULDER])
+    features[:, -1] = -(points[:, left_shoulder, 1] + points[:, right_shoulder, 1]) / 2
+    return features
+
+def frame_features(pose, use_z=False, aspect=1.0):
+    """Feature vector of one full or compact landmark array (NaN when there is no pose)"""
+    return pose_features(pose[None], use_z, aspect)[0]
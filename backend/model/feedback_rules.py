@@ -1,6 +1,11 @@
 # feedback_rules.py
 import math
 
+import numpy as np
+
+from .features import angles_between
+from .landmarks import Landmark, rows
+
 def calculate_angle(a, b, c):
     """Calculate the angle ABC (point B is the vertex)"""
     ang = math.degrees(
@@ -9,18 +14,31 @@ def calculate_angle(a, b, c):
     )
     return abs(ang) if abs(ang) <= 180 else 360 - abs(ang)
 
-def check_pullup_form(landmarks, stage=None):
+def has_landmarks(landmarks):
+    """True for a non-empty landmark list or array"""
+    return landmarks is not None and len(landmarks) > 0
+
+def joint_angle(landmarks, a, b, c):
+    """Image-plane angle ABC from a landmark list or a full or compact landmark array"""
+    if isinstance(landmarks, np.ndarray):
+        return calculate_angle(*(Landmark(*p) for p in landmarks[rows(landmarks, (a, b, c))].tolist()))
+    return calculate_angle(landmarks[a], landmarks[b], landmarks[c])
+
+def rule_angles(landmarks, triples, world=None):
+    """Angles for (a, vertex, c) landmark triples: in 3D, all in one array step, from a
+    full or compact world-landmark array when given, else in the image plane"""
+    if world is None:
+        return [joint_angle(landmarks, a, b, c) for a, b, c in triples]
+    a, b, c = rows(world, triples).T
+    return angles_between(world[a, :3], world[b, :3], world[c, :3]).tolist()
+
+def check_pullup_form(landmarks, stage=None, world=None):
     """Check pull-up form based on elbow angle and body alignment"""
-    if not landmarks:
+    if not has_landmarks(landmarks):
         return "No person detected."
 
-    shoulder = landmarks[12]  # right shoulder
-    elbow = landmarks[14]     # right elbow
-    hip = landmarks[24]       # right hip
-    ankle = landmarks[28]     # right ankle
-
-    body_angle = calculate_angle(shoulder, hip, ankle)
-    armpit_angle = calculate_angle(elbow, shoulder, hip)
+    # Right side: shoulder-hip-ankle and elbow-shoulder-hip
+    body_angle, armpit_angle = rule_angles(landmarks, [(12, 24, 28), (14, 12, 24)], world)
 
     feedback = []
     if stage == "up" and armpit_angle > 70:
@@ -32,18 +50,13 @@ def check_pullup_form(landmarks, stage=None):
 
     return " | ".join(feedback) if feedback else "Pull-up form is good!"
 
-def check_squat_form(landmarks, stage=None):
+def check_squat_form(landmarks, stage=None, world=None):
     """Check squat form based on knee angle and posture"""
-    if not landmarks:
+    if not has_landmarks(landmarks):
         return "No person detected."
 
-    hip = landmarks[24]       # right hip
-    knee = landmarks[26]      # right knee
-    ankle = landmarks[28]     # right ankle
-    shoulder = landmarks[12]  # right shoulder
-
-    knee_angle = calculate_angle(hip, knee, ankle)
-    torso_angle = calculate_angle(shoulder, hip, knee)
+    # Right side: hip-knee-ankle and shoulder-hip-knee
+    knee_angle, torso_angle = rule_angles(landmarks, [(24, 26, 28), (12, 24, 26)], world)
 
     feedback = []
     if stage == "down" and knee_angle > 120:
@@ -55,18 +68,13 @@ def check_squat_form(landmarks, stage=None):
 
     return " | ".join(feedback) if feedback else "Squat form is good!"
 
-def check_shoulder_abduction_form(landmarks, stage=None):
+def check_shoulder_abduction_form(landmarks, stage=None, world=None):
     """Check shoulder abduction form"""
-    if not landmarks:
+    if not has_landmarks(landmarks):
         return "No person detected."
 
-    shoulder = landmarks[12]  # right shoulder
-    elbow = landmarks[14]     # right elbow
-    hip = landmarks[24]       # right hip
-    wrist = landmarks[16]     # right wrist
-
-    arm_angle = calculate_angle(hip, shoulder, elbow)
-    elbow_angle = calculate_angle(shoulder, elbow, wrist)
+    # Right side: hip-shoulder-elbow and shoulder-elbow-wrist
+    arm_angle, elbow_angle = rule_angles(landmarks, [(24, 12, 14), (12, 14, 16)], world)
 
     feedback = []
     if stage == "up" and arm_angle < 120:
@@ -78,3 +86,17 @@ def check_shoulder_abduction_form(landmarks, stage=None):
 
     return " | ".join(feedback) if feedback else "Shoulder abduction form is good!"
 
+
+# Peak joint speed (degrees per second) above which a movement looks uncontrolled
+TEMPO_LIMITS = {"pullup": 300.0, "squat": 250.0, "shoulderabduction": 200.0}
+# Minimum movement range (degrees) for the speed to count as a real movement, not jitter
+MIN_TEMPO_RANGE = 30.0
+
+def check_tempo(exercise, motion):
+    """Tempo cue from recent angle statistics (AngleHistory.channel_stats), or None"""
+    limit = TEMPO_LIMITS.get(exercise)
+    if not motion or limit is None or motion["samples"] < 3:
+        return None
+    if motion["peak_velocity"] > limit and motion["range"] > MIN_TEMPO_RANGE:
+        return "Slow down, control the movement."
+    return None
@@ -0,0 +1,97 @@
+# landmarks.py
+from collections import namedtuple
+
+import numpy as np
+
+NUM_LANDMARKS = 33
+# Columns of a landmark array row
+X, Y, Z, VISIBILITY = range(4)
+# MediaPipe PoseLandmark names, by index
+LANDMARK_NAMES = [
+    "nose", "left_eye_inner", "left_eye", "left_eye_outer", "right_eye_inner", "right_eye", "right_eye_outer",
+    "left_ear", "right_ear", "mouth_left", "mouth_right", "left_shoulder", "right_shoulder", "left_elbow",
+    "right_elbow", "left_wrist", "right_wrist", "left_pinky", "right_pinky", "left_index", "right_index",
+    "left_thumb", "right_thumb", "left_hip", "right_hip", "left_knee", "right_knee", "left_ankle", "right_ankle",
+    "left_heel", "right_heel", "left_foot_index", "right_foot_index",
+]
+
+# Stand-in for a MediaPipe landmark when rules run on stored arrays
+Landmark = namedtuple("Landmark", "x y z visibility")
+
+# The joints rep counting, form rules and features read: right shoulder, elbow, wrist,
+# hip, knee, ankle (12, 14, 16, 24, 26, 28) and their left mirrors. Compact arrays
+# hold only these rows, in this order; the rest (face, hands, feet) is never needed.
+SUBSET = (11, 12, 13, 14, 15, 16, 23, 24, 25, 26, 27, 28)
+_SLOTS = np.full(NUM_LANDMARKS, -1, dtype=np.intp)
+_SLOTS[list(SUBSET)] = np.arange(len(SUBSET))
+
+def landmark_indices(pose):
+    """MediaPipe landmark index of each row of a full (33) or compact (SUBSET) landmark array"""
+    return SUBSET if pose.shape[-2] == len(SUBSET) else tuple(range(NUM_LANDMARKS))
+
+def rows(pose, joints):
+    """Row positions of MediaPipe landmark indices in a full or compact landmark array.
+    Raises KeyError for a joint a compact array does not hold"""
+    joints = np.asarray(joints, dtype=np.intp)
+    if pose.shape[-2] == NUM_LANDMARKS:
+        return joints
+    slots = _SLOTS[joints]
+    if (slots < 0).any():
+        missing = sorted({LANDMARK_NAMES[j] for j in np.atleast_1d(joints)[np.atleast_1d(slots) < 0]})
+        raise KeyError(f"{', '.join(missing)} not in the compact landmark SUBSET")
+    return slots
+
+def landmarks_to_subset(landmarks, out=None):
+    """(len(SUBSET), 4) array of just the SUBSET joints; all NaN when there is no pose.
+
+    Reads only those entries of the detector's landmark list, so the other 21
+    landmarks are never converted.
+    """
+    if out is None:
+        out = np.empty((len(SUBSET), 4))
+    if not landmarks:
+        out.fill(np.nan)
+        return out
+    for row, i in enumerate(SUBSET):
+        lm = landmarks[i]
+        out[row] = (lm.x, lm.y, lm.z, lm.visibility)
+    return out
+
+def compact(poses):
+    """Compact (..., len(SUBSET), 4) copy of full (..., 33, 4) landmark arrays (compact ones pass through)"""
+    poses = np.asarray(poses)
+    return poses if poses.shape[-2] == len(SUBSET) else poses[..., SUBSET, :]
+
+def expand(poses):
+    """Full (..., 33, 4) landmark arrays from compact ones, NaN outside SUBSET (full ones pass through)"""
+    poses = np.asarray(poses)
+    if poses.shape[-2] == NUM_LANDMARKS:
+        return poses
+    full = np.full(poses.shape[:-2] + (NUM_LANDMARKS, 4), np.nan, dtype=poses.dtype)
+    full[..., SUBSET, :] = poses
+    return full
+
+def landmarks_to_array(landmarks, out=None):
+    """(33, 4) float64 array of x, y, z, visibility; all NaN when there is no pose"""
+    if out is None:
+        out = np.empty((NUM_LANDMARKS, 4))
+    if not landmarks:
+        out.fill(np.nan)
+        return out
+    for i, lm in enumerate(landmarks):
+        out[i] = (lm.x, lm.y, lm.z, lm.visibility)
+    return out
+
+def poses_to_array(frames):
+    """Stack per-frame landmark lists (or None) into an (N, 33, 4) array"""
+    poses = np.empty((len(frames), NUM_LANDMARKS, 4))
+    for i, landmarks in enumerate(frames):
+        landmarks_to_array(landmarks, poses[i])
+    return poses
+
+def array_to_landmarks(pose):
+    """Landmark list indexed like MediaPipe's for one full or compact array (what the form
+    rules take), or None when there is no pose"""
+    if np.isnan(pose[rows(pose, SUBSET[0]), X]):
+        return None
+    return [Landmark(*row) for row in expand(pose).tolist()]
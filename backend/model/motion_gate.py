@@ -0,0 +1,84 @@
+# motion_gate.py
+import threading
+
+import cv2
+import numpy as np
+
+# Thumbnail the gate compares: small enough to be nearly free, big enough to see a person move
+THUMBNAIL_SIZE = (32, 24)
+
+def thumbnail(frame, out=None):
+    """Tiny grayscale version of a BGR frame (area-averaged, so sensor noise mostly cancels)"""
+    small = cv2.resize(frame, THUMBNAIL_SIZE, interpolation=cv2.INTER_AREA)
+    return cv2.cvtColor(small, cv2.COLOR_BGR2GRAY, dst=out)
+
+class MotionGate:
+    """Decides per frame whether anything moved since the last analyzed frame of a session.
+
+    The frame is compared with the thumbnail of the last frame that went
+    through inference (not the previous frame, so slow drift still adds up).
+    When the mean absolute difference is below `threshold` (grey levels), the
+    caller can reuse the last result. At most `max_reused` frames in a row are
+    skipped, so results never go stale for long.
+    """
+
+    def __init__(self, threshold=2.0, max_reused=15):
+        self.threshold = threshold
+        self.max_reused = max_reused
+        self.reference = None
+        self.last_result = None
+        self.key = None
+        self.reused = 0
+        self.last_difference = None
+        self._current = np.empty(THUMBNAIL_SIZE[::-1], dtype=np.uint8)
+
+    def still(self, frame, key=None):
+        """True when the frame can reuse the last result (computed for the same `key`)"""
+        if not self.threshold:
+            return False
+        current = thumbnail(frame, self._current)
+        if self.reference is None or key != self.key or self.reused >= self.max_reused:
+            return False
+        self.last_difference = float(cv2.norm(current, self.reference, cv2.NORM_L1)) / current.size
+        if self.last_difference < self.threshold:
+            self.reused += 1
+            return True
+        return False
+
+    def update(self, result, key=None):
+        """Remember the result of a frame that went through inference, and its thumbnail"""
+        if not self.threshold:
+            return
+        if self.reference is None:
+            self.reference = np.empty_like(self._current)
+        self.reference[:] = self._current
+        self.last_result = result
+        self.key = key
+        self.reused = 0
+
+    def reset(self):
+        self.reference = None
+        self.last_result = None
+        self.key = None
+        self.reused = 0
+
+class GateStats:
+    """Server-wide hit rate of the motion gates"""
+
+    def __init__(self):
+        self.frames = 0
+        self.reused = 0
+        self._lock = threading.Lock()
+
+    def record(self, reused):
+        with self._lock:
+            self.frames += 1
+            self.reused += int(reused)
+
+    def stats(self):
+        with self._lock:
+            return {
+                "frames": self.frames,
+                "reused": self.reused,
+                "hit_rate": round(self.reused / self.frames, 4) if self.frames else 0.0,
+            }
@@ -1,20 +1,109 @@
+import os
+import time
 import cv2
 import mediapipe as mp
+from utils.draw_pose import SkeletonRenderer
+from utils.frame_buffers import FrameBuffers
+
+# PoseLandmarker model bundles used by multi-person mode (not shipped with the repo)
+LANDMARKER_DIR = os.environ.get("POSE_LANDMARKER_DIR", os.path.join(os.path.dirname(__file__), "assets"))
+LANDMARKER_URL = "https://storage.googleapis.com/mediapipe-models/pose_landmarker/"
 
 class PoseDetector:
-    def __init__(self, static_image_mode=False, min_detection_confidence=0.5, min_tracking_confidence=0.5):
+    def __init__(self, static_image_mode=False, min_detection_confidence=0.5, min_tracking_confidence=0.5,
+                 model_complexity=1, smooth_landmarks=True, input_width=None):
+        self.model_complexity = model_complexity
+        self.input_width = input_width  # Downscale to this width before inference (None = full size)
         self.pose = mp.solutions.pose.Pose(
             static_image_mode=static_image_mode,
+            model_complexity=model_complexity,
+            smooth_landmarks=smooth_landmarks,
             min_detection_confidence=min_detection_confidence,
             min_tracking_confidence=min_tracking_confidence
         )
-        self.mp_drawing = mp.solutions.drawing_utils
+        self.renderer = SkeletonRenderer()
+        # Resize / RGB conversion targets, reused across frames of the same size
+        self.buffers = FrameBuffers()
+        # pose_world_landmarks of the last detect_pose call: 3D, in meters, centered between the hips
+        self.world_landmarks = None
+
+    def _inference_image(self, image):
+        """Resize the frame to the inference width, keeping aspect ratio"""
+        height, width = image.shape[:2]
+        if not self.input_width or width <= self.input_width:
+            return image
+        scale = self.input_width / width
+        size = (self.input_width, int(height * scale))
+        resized = self.buffers.get("resized", (size[1], size[0], 3))
+        return cv2.resize(image, size, dst=resized, interpolation=cv2.INTER_AREA)
+
+    def _inference_rgb(self, image):
+        """Downscaled RGB copy of the frame for the model"""
+        # Landmarks are normalized, so they map back onto the full-size image unchanged
+        inference_image = self._inference_image(image)
+        # Convert in place when we own the resized copy; never touch the caller's image
+        rgb = inference_image if inference_image is not image else self.buffers.get("rgb", image.shape)
+        return cv2.cvtColor(inference_image, cv2.COLOR_BGR2RGB, dst=rgb)
 
     def detect_pose(self, image, draw=True):
-        image_rgb = cv2.cvtColor(image, cv2.COLOR_BGR2RGB)
+        """Return (image, pose_landmarks); the frame's world landmarks are kept in self.world_landmarks"""
+        image_rgb = self._inference_rgb(image)
         results = self.pose.process(image_rgb)
+        self.world_landmarks = results.pose_world_landmarks
 
         if draw and results.pose_landmarks:
-            self.mp_drawing.draw_landmarks(image, results.pose_landmarks, mp.solutions.pose.POSE_CONNECTIONS)
+            self.renderer.draw(image, results.pose_landmarks)
+
+        return image, results.pose_landmarks
+
+    def close(self):
+        """Release the MediaPipe graph"""
+        self.pose.close()
+
+class MultiPoseDetector(PoseDetector):
+    """Detects up to `num_poses` people per frame with the MediaPipe Tasks PoseLandmarker.
+
+    The legacy solutions.Pose graph only ever returns one person, so group
+    sessions use the Tasks API in video mode instead. Each pose is a list of
+    33 landmarks with .x/.y/.z/.visibility, like `pose_landmarks.landmark`.
+    """
+
+    def __init__(self, model_path, num_poses=4, min_detection_confidence=0.5, min_tracking_confidence=0.5,
+                 input_width=None, **_):
+        from mediapipe.tasks.python import BaseOptions, vision
+
+        if not os.path.exists(model_path):
+            raise FileNotFoundError(f"Pose landmarker model not found at {model_path} "
+                                    f"(download it from {LANDMARKER_URL} or set POSE_LANDMARKER_DIR)")
+        self.input_width = input_width
+        self.num_poses = num_poses
+        options = vision.PoseLandmarkerOptions(
+            base_options=BaseOptions(model_asset_path=model_path),
+            running_mode=vision.RunningMode.VIDEO,
+            num_poses=num_poses,
+            min_pose_detection_confidence=min_detection_confidence,
+            min_tracking_confidence=min_tracking_confidence
+        )
+        self.landmarker = vision.PoseLandmarker.create_from_options(options)
+        self.renderer = SkeletonRenderer()
+        self.buffers = FrameBuffers()
+        self._timestamp_ms = 0
+
+    def detect_poses(self, image, draw=True):
+        """Return (image, [landmarks of each detected person])"""
+        image_rgb = self._inference_rgb(image)
+        # Video mode needs strictly increasing timestamps
+        self._timestamp_ms = max(self._timestamp_ms + 1, int(time.monotonic() * 1000))
+        result = self.landmarker.detect_for_video(mp.Image(image_format=mp.ImageFormat.SRGB, data=image_rgb),
+                                                  self._timestamp_ms)
+        poses = result.pose_landmarks
+
+        if draw:
+            for pose in poses:
+                self.renderer.draw(image, pose)
+
+        return image, poses
 
-        return image, results.pose_landmarks
\ No newline at end of file
+    def close(self):
+        """Release the landmarker"""
+        self.landmarker.close()
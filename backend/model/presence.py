@@ -0,0 +1,93 @@
+# presence.py
+import logging
+import threading
+import time
+
+import cv2
+
+from .motion_gate import thumbnail
+
+logger = logging.getLogger(__name__)
+
+class PresenceMonitor:
+    """Empty-scene fast path for one session.
+
+    After `miss_limit` consecutive frames without a pose the session goes idle:
+    frames are answered with the last "No pose detected" result, and only a
+    downscaled probe runs, every `probe_interval` seconds or as soon as the
+    scene changes noticeably (someone walking in). A probe that finds a pose
+    wakes the session and that frame gets full inference.
+    """
+
+    def __init__(self, miss_limit=15, probe_interval=1.0, probe_width=192, wake_threshold=8.0):
+        self.miss_limit = miss_limit
+        self.probe_interval = probe_interval
+        self.probe_width = probe_width
+        self.wake_threshold = wake_threshold
+        self.misses = 0
+        self.idle = False
+        self.idle_result = None
+        self.last_probe = 0.0
+        self._reference = None
+
+    def record(self, result):
+        """Update the miss streak with a fully analyzed frame's result"""
+        if not self.miss_limit:
+            return
+        if result.get("has_pose"):
+            self.misses = 0
+            return
+        self.misses += 1
+        self.idle_result = result
+        if self.misses >= self.miss_limit and not self.idle:
+            logger.info(f"💤 No one in view for {self.misses} frames, probing every {self.probe_interval}s")
+            self.idle = True
+            self.last_probe = time.monotonic()
+
+    def should_probe(self, frame):
+        """While idle: True when it is time for a presence probe on this frame"""
+        current = thumbnail(frame)
+        changed = self._reference is not None and \
+            float(cv2.norm(current, self._reference, cv2.NORM_L1)) / current.size > self.wake_threshold
+        self._reference = current
+        return changed or time.monotonic() - self.last_probe >= self.probe_interval
+
+    def probe_frame(self, frame):
+        """Downscaled copy of the frame for the presence probe"""
+        self.last_probe = time.monotonic()
+        height, width = frame.shape[:2]
+        if width <= self.probe_width:
+            return frame
+        size = (self.probe_width, height * self.probe_width // width)
+        return cv2.resize(frame, size, interpolation=cv2.INTER_AREA)
+
+    def wake(self):
+        logger.info("👋 Person detected, resuming full inference")
+        self.idle = False
+        self.misses = 0
+        self._reference = None
+
+    def reset(self):
+        self.misses = 0
+        self.idle = False
+        self.idle_result = None
+        self._reference = None
+
+class PresenceStats:
+    """Server-wide counters for the empty-scene fast path"""
+
+    def __init__(self):
+        self.skipped = 0  # idle frames answered without any inference
+        self.probes = 0
+        self.wakeups = 0
+        self._lock = threading.Lock()
+
+    def record(self, skipped=0, probes=0, wakeups=0):
+        with self._lock:
+            self.skipped += skipped
+            self.probes += probes
+            self.wakeups += wakeups
+
+    def stats(self):
+        with self._lock:
+            return {"skipped": self.skipped, "probes": self.probes, "wakeups": self.wakeups}
@@ -0,0 +1,190 @@
+# quality.py
+import logging
+import os
+import threading
+import time
+import urllib.request
+from collections import deque
+
+import mediapipe as mp
+
+from .pose_detector import PoseDetector, MultiPoseDetector, LANDMARKER_DIR
+
+logger = logging.getLogger(__name__)
+
+# Inference quality tiers, cheapest first.
+# model_complexity: MediaPipe pose model (0 = lite, 1 = full, 2 = heavy)
+# input_width: frames are downscaled to this width before inference (None = native)
+# smooth_landmarks: MediaPipe's temporal filter. It steadies the jittery lite/full models at the
+#   cost of a few frames of lag; heavy's landmarks are steady enough to go without it
+QUALITY_TIERS = {
+    "lite": {"model_complexity": 0, "input_width": 320, "smooth_landmarks": True},
+    "full": {"model_complexity": 1, "input_width": 640, "smooth_landmarks": True},
+    "heavy": {"model_complexity": 2, "input_width": None, "smooth_landmarks": False},
+}
+TIER_ORDER = ["lite", "full", "heavy"]
+# PoseLandmarker bundle for each tier in multi-person mode
+LANDMARKER_MODELS = {
+    "lite": "pose_landmarker_lite.task",
+    "full": "pose_landmarker_full.task",
+    "heavy": "pose_landmarker_heavy.task",
+}
+DEFAULT_TIER = "full"
+# Pose model file of each model_complexity. Only "full" ships with mediapipe; MediaPipe would
+# download the others synchronously the first time a detector needs them
+POSE_MODELS = {0: "pose_landmark_lite.tflite", 1: "pose_landmark_full.tflite", 2: "pose_landmark_heavy.tflite"}
+POSE_MODEL_DIR = os.path.join(os.path.dirname(mp.__file__), "modules", "pose_landmark")
+POSE_MODEL_URL = "https://storage.googleapis.com/mediapipe-assets/"
+
+_available_tiers = None
+
+def normalize_tier(tier, default=DEFAULT_TIER):
+    """Return a known tier name, falling back to the default"""
+    if tier is None:
+        return default
+    tier = str(tier).lower()
+    return tier if tier in QUALITY_TIERS else default
+
+def lower_tier(a, b):
+    """Return the cheaper of two tiers"""
+    return a if TIER_ORDER.index(a) <= TIER_ORDER.index(b) else b
+
+def tier_model_path(tier):
+    return os.path.join(POSE_MODEL_DIR, POSE_MODELS[QUALITY_TIERS[tier]["model_complexity"]])
+
+def fetch_model(path, timeout=10.0):
+    """Download a missing pose model next to the bundled one (written whole or not at all)"""
+    partial = f"{path}.part"
+    with urllib.request.urlopen(POSE_MODEL_URL + os.path.basename(path), timeout=timeout) as response, \
+            open(partial, "wb") as f:
+        f.write(response.read())
+    os.replace(partial, path)
+
+def available_tiers(download=True):
+    """Tiers whose pose model is installed, cheapest first, fetching missing ones once per process.
+
+    Run at startup, so no request ever waits on (or fails in) a model download; tiers
+    whose model can't be fetched are left out of the quality ceiling.
+    """
+    global _available_tiers
+    if _available_tiers is None:
+        tiers = []
+        for tier in TIER_ORDER:
+            path = tier_model_path(tier)
+            if not os.path.exists(path) and download:
+                try:
+                    fetch_model(path)
+                    logger.info(f"📥 Downloaded {os.path.basename(path)} for the '{tier}' quality tier")
+                except OSError as e:  # includes URLError
+                    logger.warning(f"⚠️ Quality tier '{tier}' disabled: {os.path.basename(path)} is not "
+                                   f"installed and could not be downloaded ({e})")
+            if os.path.exists(path):
+                tiers.append(tier)
+        _available_tiers = tiers
+    return list(_available_tiers)
+
+def create_detector(tier=DEFAULT_TIER, **kwargs):
+    """Build a PoseDetector configured for a quality tier"""
+    settings = dict(QUALITY_TIERS[normalize_tier(tier)])
+    settings.update(kwargs)
+    return PoseDetector(**settings)
+
+def landmarker_path(tier):
+    return os.path.join(LANDMARKER_DIR, LANDMARKER_MODELS[tier])
+
+def multi_person_tiers():
+    """Tiers whose PoseLandmarker bundle (multi-person mode) is installed, cheapest first"""
+    return [tier for tier in TIER_ORDER if os.path.exists(landmarker_path(tier))]
+
+def create_multi_detector(tier=DEFAULT_TIER, **kwargs):
+    """Build a MultiPoseDetector for a quality tier, on the nearest installed bundle
+    when the tier's own is missing (the cheaper one on a tie)"""
+    tier = normalize_tier(tier)
+    installed = multi_person_tiers()
+    bundle = min(installed, key=lambda t: abs(TIER_ORDER.index(t) - TIER_ORDER.index(tier))) if installed else tier
+    settings = {"model_path": landmarker_path(bundle),
+                "input_width": QUALITY_TIERS[tier]["input_width"]}
+    settings.update(kwargs)
+    return MultiPoseDetector(**settings)
+
+class QualityController:
+    """Server-wide quality ceiling driven by inference latency and queue depth.
+
+    Every session runs at min(requested tier, ceiling). When p95 latency or the
+    number of frames in flight crosses its threshold the ceiling drops one tier;
+    it climbs back one tier at a time once load has stayed low for `cooldown` seconds.
+    Only `tiers` (default: all) are ever used, e.g. those whose model is installed.
+    """
+
+    def __init__(self, p95_threshold_ms=150.0, max_queue_depth=8, window=200,
+                 cooldown=10.0, recover_ratio=0.5, min_samples=20, tiers=None):
+        self.p95_threshold_ms = p95_threshold_ms
+        self.max_queue_depth = max_queue_depth
+        self.cooldown = cooldown
+        self.recover_ratio = recover_ratio
+        self.min_samples = min_samples
+        self.tiers = [tier for tier in TIER_ORDER if tiers is None or tier in tiers] or [DEFAULT_TIER]
+        self.ceiling = self.tiers[-1]
+        self.in_flight = 0
+        self._latencies = deque(maxlen=window)
+        self._last_change = 0.0
+        self._lock = threading.Lock()
+
+    def begin(self):
+        """Mark a frame as entering inference"""
+        with self._lock:
+            self.in_flight += 1
+
+    def end(self, latency_ms=None):
+        """Record a finished frame and re-evaluate the ceiling (None = frame was dropped)"""
+        with self._lock:
+            self.in_flight = max(0, self.in_flight - 1)
+            if latency_ms is not None:
+                self._latencies.append(latency_ms)
+            self._adjust(time.monotonic())
+
+    def p95(self):
+        """95th percentile latency (ms) over the recent window"""
+        with self._lock:
+            return self._p95()
+
+    def _p95(self):
+        if not self._latencies:
+            return 0.0
+        ordered = sorted(self._latencies)
+        return ordered[min(len(ordered) - 1, int(0.95 * len(ordered)))]
+
+    def _adjust(self, now):
+        if len(self._latencies) < self.min_samples or now - self._last_change < self.cooldown:
+            return
+        p95 = self._p95()
+        level = self.tiers.index(self.ceiling)
+
+        if (p95 > self.p95_threshold_ms or self.in_flight > self.max_queue_depth) and level > 0:
+            self._set_ceiling(self.tiers[level - 1], now)
+        elif (p95 < self.p95_threshold_ms * self.recover_ratio and self.in_flight <= 1
+              and level < len(self.tiers) - 1):
+            self._set_ceiling(self.tiers[level + 1], now)
+
+    def _set_ceiling(self, tier, now):
+        logger.info(f"⚖️ Quality ceiling {self.ceiling} -> {tier} (p95={self._p95():.0f}ms, in_flight={self.in_flight})")
+        self.ceiling = tier
+        self._last_change = now
+        # Latencies measured at the old tier no longer describe the new one
+        self._latencies.clear()
+
+    def effective_tier(self, requested):
+        """Tier a session should run at right now: the best available one up to the request and ceiling"""
+        limit = lower_tier(normalize_tier(requested), self.ceiling)
+        allowed = [tier for tier in self.tiers if lower_tier(tier, limit) == tier]
+        return allowed[-1] if allowed else self.tiers[0]
+
+    def stats(self):
+        with self._lock:
+            return {
+                "ceiling": self.ceiling,
+                "tiers": list(self.tiers),
+                "p95_ms": round(self._p95(), 1),
+                "in_flight": self.in_flight,
+                "samples": len(self._latencies),
+            }
@@ -1,97 +1,109 @@
-from .feedback_rules import calculate_angle  # Use relative import
+import json
+import logging
+import os
+
+from .features import angles_between
+from .landmarks import rows
+from .feedback_rules import has_landmarks, joint_angle  # Use relative import
+
+logger = logging.getLogger(__name__)
+
+# Rep definition per exercise: the joint angle to watch (a, vertex, c landmark
+# indices) and a hysteresis band. Crossing `enter` sets the first stage; crossing
+# `exit` while in that stage sets the second stage and counts a rep.
+# "world": measure angles in 3D on MediaPipe's world landmarks (meters) instead of
+# in the image plane, so they hold when the athlete isn't side-on. Frames without
+# world landmarks fall back to the 2D angle.
+EXERCISES = {
+    # Armpit (elbow-shoulder-hip) angle closes going up, opens going down
+    "pullup": {"joints": (14, 12, 24), "enter": ("<", 90), "exit": (">", 160), "stages": ("up", "down"), "world": False},
+    # Knee (hip-knee-ankle) angle closes going down, opens standing up
+    "squat": {"joints": (24, 26, 28), "enter": ("<", 120), "exit": (">", 160), "stages": ("down", "up"), "world": False},
+    # Arm (hip-shoulder-elbow) angle opens raising the arm, closes lowering it
+    "shoulderabduction": {"joints": (24, 12, 14), "enter": (">", 120), "exit": ("<", 60), "stages": ("up", "down"),
+                          "world": False},
+}
+
+def load_thresholds(path):
+    """Override EXERCISES thresholds from a JSON file written by tools/tune_thresholds.py.
+
+    The file maps exercise -> {"enter": ["<", 115], "exit": [">", 165]}, optionally
+    with "world": true to switch the exercise to 3D angles; other keys (e.g. tuning
+    scores) are ignored.
+    """
+    with open(path) as f:
+        tuned = json.load(f)
+    for exercise, values in tuned.items():
+        if exercise not in EXERCISES:
+            logger.warning(f"⚠️ Ignoring thresholds for unknown exercise '{exercise}'")
+            continue
+        for key in ("enter", "exit"):
+            if key in values:
+                op, value = values[key]
+                EXERCISES[exercise][key] = (op, float(value))
+        if "world" in values:
+            EXERCISES[exercise]["world"] = bool(values["world"])
+    logger.info(f"📐 Loaded rep thresholds from {path}")
+
+def crosses(angle, threshold):
+    """True when angle is past a ("<" | ">", value) threshold"""
+    op, value = threshold
+    return angle < value if op == "<" else angle > value
+
+def uses_world(exercise=None):
+    """True when the exercise (or, without one, any exercise) counts on 3D world-landmark angles"""
+    if exercise is None:
+        return any(config.get("world") for config in EXERCISES.values())
+    return bool(EXERCISES.get(exercise, {}).get("world"))
+
+# Tuned thresholds for the server, e.g. REP_THRESHOLDS=model/thresholds.json
+if os.environ.get("REP_THRESHOLDS"):
+    load_thresholds(os.environ["REP_THRESHOLDS"])
 
 class RepCounter:
     def __init__(self, exercise="pullup"):
         self.exercise = exercise
+        self.config = EXERCISES.get(exercise)
         self.count = 0
         self.stage = None  # "up" or "down"
-    
+        self.angle = None  # angle of the latest frame with a pose
+
     @property
     def reps(self):
         """Property to access count as reps"""
         return self.count
 
-    def update(self, landmarks):
-        """Update repetition count based on exercise and pose landmarks"""
-        if not landmarks:
-            return self.count, 0  # Return 0 when no angle
-
-        if self.exercise == "pullup":
-            return self._count_pullup(landmarks)
-        elif self.exercise == "squat":
-            return self._count_squat(landmarks)
-        elif self.exercise == "shoulderabduction":
-            return self._count_shoulder_abduction(landmarks)
-
-        return self.count, 0
-
-    def _count_pullup(self, landmarks):
-        """Count pull-up repetitions based on armpit (shoulder-elbow-hip) angle"""
-        if landmarks is None:
-            return self.count, 0
-
-        shoulder = landmarks[12]  # right shoulder
-        elbow = landmarks[14]     # right elbow
-        hip = landmarks[24]       # right hip
-
-        armpit_angle = calculate_angle(elbow, shoulder, hip)
-
-        # Going up: armpit angle closes
-        if armpit_angle < 90:
-            self.stage = "up"
-
-        # Going down: armpit angle opens → count
-        if armpit_angle > 160 and self.stage == "up":
-            self.stage = "down"
-            self.count += 1
+    def update(self, landmarks, world=None):
+        """Update repetition count based on exercise and pose landmarks.
 
-        return self.count, armpit_angle
-    
-    def _count_squat(self, landmarks):
-        """Count squat repetitions based on knee angle"""
-        if landmarks is None:
-            return self.count, 0
-
-        hip = landmarks[24]       # right hip
-        knee = landmarks[26]      # right knee
-        ankle = landmarks[28]     # right ankle
-
-        knee_angle = calculate_angle(hip, knee, ankle)
-
-        # Going down: knee angle decreases
-        if knee_angle < 120:
-            self.stage = "down"
+        `landmarks` is a landmark list or a full or compact landmark array;
+        `world` is the frame's full or compact world-landmark array, used for
+        exercises with "world" angles.
+        """
+        if not has_landmarks(landmarks) or self.config is None:
+            return self.count, 0  # Return 0 when no angle
 
-        # Going up: knee angle increases → count
-        if knee_angle > 160 and self.stage == "down":
-            self.stage = "up"
+        a, b, c = self.config["joints"]
+        if world is not None and self.config.get("world"):
+            a3, b3, c3 = world[rows(world, (a, b, c)), :3]
+            angle = float(angles_between(a3, b3, c3))
+        else:
+            angle = joint_angle(landmarks, a, b, c)
+        self.angle = angle
+        enter_stage, exit_stage = self.config["stages"]
+
+        if crosses(angle, self.config["enter"]):
+            self.stage = enter_stage
+
+        # Completing the movement from the first stage → count
+        if crosses(angle, self.config["exit"]) and self.stage == enter_stage:
+            self.stage = exit_stage
             self.count += 1
 
-        return self.count, knee_angle
-    
-    def _count_shoulder_abduction(self, landmarks):
-        """Count shoulder abduction repetitions based on arm angle"""
-        if landmarks is None:
-            return self.count, 0
-
-        shoulder = landmarks[12]  # right shoulder
-        elbow = landmarks[14]     # right elbow
-        hip = landmarks[24]       # right hip
-
-        arm_angle = calculate_angle(hip, shoulder, elbow)
-
-        # Arms up: angle increases
-        if arm_angle > 120:
-            self.stage = "up"
-
-        # Arms down: angle decreases → count
-        if arm_angle < 60 and self.stage == "up":
-            self.stage = "down"
-            self.count += 1
+        return self.count, angle
 
-        return self.count, arm_angle
-    
     def reset(self):
         """Reset the rep counter to initial state"""
         self.count = 0
-        self.stage = None
\ No newline at end of file
+        self.stage = None
+        self.angle = None
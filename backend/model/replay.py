@@ -0,0 +1,80 @@
+# replay.py
+"""
+Batch replay of RepCounter over recorded landmark arrays.
+
+Computes the same per-frame stage, cumulative rep count and angle as feeding
+the frames one by one to RepCounter.update, but with whole-array NumPy
+operations, for threshold tuning over large session archives. There is no
+per-frame Python loop; on 20k frames replay takes about 1.5-2 ms against
+65 ms streaming, 30-40x (python tests/test_replay.py). The streaming
+counter is only ~3 µs a frame, so the gap can't grow much further.
+"""
+import numpy as np
+
+from .features import angles_between
+from .landmarks import rows
+from .rep_counter import EXERCISES, crosses
+
+# Per-frame event codes
+NONE, ENTER, EXIT = 0, 1, 2
+
+def joint_angles(poses, joints, use_z=False):
+    """Angle at the vertex joint for every frame of a full or compact (N, joints, 4) array
+    (NaN where no pose).
+
+    With `use_z` the angle is measured in 3D (for world-landmark arrays).
+    """
+    poses = np.asarray(poses, dtype=np.float64)
+    joints = rows(poses, joints)
+    if use_z:
+        with np.errstate(invalid="ignore"):
+            return angles_between(*(poses[:, j, :3] for j in joints))
+    a, b, c = (poses[:, j, :2] for j in joints)
+    # Same formula as feedback_rules.calculate_angle
+    angle = np.abs(np.degrees(np.arctan2(c[:, 1] - b[:, 1], c[:, 0] - b[:, 0]) -
+                              np.arctan2(a[:, 1] - b[:, 1], a[:, 0] - b[:, 0])))
+    return np.where(angle <= 180, angle, 360 - angle)
+
+def hysteresis(angles, config):
+    """(stage codes, cumulative counts) for an angle series under one exercise config.
+
+    RepCounter's state only changes on frames past a threshold, so the stage
+    is the most recent event carried forward, and a rep is counted on an exit
+    frame whose previous state was the enter stage (or that is also an enter frame).
+    """
+    with np.errstate(invalid="ignore"):  # NaN (no pose) never crosses a threshold
+        entering = crosses(angles, config["enter"])
+        exiting = crosses(angles, config["exit"])
+    events = np.where(exiting, EXIT, np.where(entering, ENTER, NONE))
+
+    # Forward-fill the last event
+    last = np.maximum.accumulate(np.where(events != NONE, np.arange(len(events)), 0))
+    state = events[last] if len(events) else events
+    previous = np.concatenate(([NONE], state[:-1]))
+
+    counted = exiting & (entering | (previous == ENTER))
+    # An exit before the first enter leaves the stage unset
+    stage = np.where(np.logical_or.accumulate(entering), state, NONE)
+    return stage, np.cumsum(counted)
+
+def exercise_angles(poses, config, world=None):
+    """The exercise's joint angle per frame: 3D from the world-landmark array when
+    the exercise uses world angles and the session has one, else 2D"""
+    if world is not None and config.get("world"):
+        angles = joint_angles(world, config["joints"], use_z=True)
+        return np.where(np.isnan(angles), joint_angles(poses, config["joints"]), angles)
+    return joint_angles(poses, config["joints"])
+
+def replay(poses, exercise, config=None, world=None):
+    """Replay a full or compact (N, joints, 4) landmark array through the exercise's rep counter.
+
+    Returns {"stage": (N,) object array of stage names or None,
+             "reps": (N,) cumulative count, "angle": (N,) angle, 0 where no pose}.
+    `config` overrides the EXERCISES entry (used when tuning thresholds).
+    `world` is the matching world-landmark array, for exercises with 3D angles.
+    """
+    config = config or EXERCISES[exercise]
+    angles = exercise_angles(poses, config, world)
+    stage, reps = hysteresis(angles, config)
+    names = np.array([None, *config["stages"]], dtype=object)
+    return {"stage": names[stage], "reps": reps, "angle": np.nan_to_num(angles, nan=0.0)}
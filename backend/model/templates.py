@@ -0,0 +1,203 @@
+# templates.py
+"""
+Per-rep form scoring against reference movement templates.
+
+A template is the joint angle over one clean rep, resampled to TEMPLATE_LENGTH
+points. Each completed rep is resampled the same way and compared with every
+template of its exercise by dynamic time warping restricted to a Sakoe-Chiba
+band, which absorbs tempo differences inside the rep but not a different
+movement. The DTW recurrence runs one anti-diagonal at a time, vectorized
+across the diagonal and across templates, so a rep costs about 2 * LENGTH
+small NumPy steps whatever its duration.
+
+A rep's angles run from the previous rep's count to this one's, so any rest
+in between is cut off first: scoring starts at the last frame still past the
+`exit` threshold before the `enter` crossing.
+
+Built-in templates are half-cosine sweeps between each exercise's rest and
+peak angle; recorded reps replace them (tools/build_templates.py, REP_TEMPLATES).
+"""
+import functools
+import logging
+import os
+import time
+
+import numpy as np
+
+from .rep_counter import EXERCISES, crosses
+
+logger = logging.getLogger(__name__)
+
+TEMPLATE_LENGTH = 64
+# Warping allowed, as a fraction of the rep length
+BAND = 0.15
+# Mean angle error (degrees) along the warping path that scores 0
+TOLERANCE = 30.0
+# Reps shorter than this many samples are not scored (tracking glitches)
+MIN_REP_SAMPLES = 5
+# Nor are longer ones (10 s at 30 fps): that is a rest or another movement, not one rep
+MAX_REP_SAMPLES = 300
+
+# (rest angle, peak angle) of a clean rep, for the built-in templates
+REFERENCE_SWEEPS = {"pullup": (170.0, 50.0), "squat": (170.0, 85.0), "shoulderabduction": (20.0, 160.0)}
+
+def resample(angles, length=TEMPLATE_LENGTH):
+    """Angle series linearly resampled to `length` points (NaN samples dropped)"""
+    angles = np.asarray(angles, dtype=np.float64)
+    angles = angles[~np.isnan(angles)]
+    if len(angles) < 2:
+        return None
+    return np.interp(np.linspace(0, len(angles) - 1, length), np.arange(len(angles)), angles)
+
+def trim_rest(angles, config):
+    """The movement part of one rep's angles: from the last sample at rest (past the
+    exit threshold) before the enter crossing; unchanged when there is no crossing"""
+    with np.errstate(invalid="ignore"):  # NaN (no pose) is never past a threshold
+        entered = np.flatnonzero(crosses(angles, config["enter"]))
+        if not len(entered):
+            return angles
+        resting = np.flatnonzero(crosses(angles[:entered[0]], config["exit"]))
+    return angles[resting[-1]:] if len(resting) else angles
+
+def reference_sweep(rest, peak, length=TEMPLATE_LENGTH):
+    """rest -> peak -> rest with a cosine profile"""
+    return rest + (peak - rest) * (1 - np.cos(np.linspace(0, 2 * np.pi, length))) / 2
+
+@functools.lru_cache(maxsize=8)
+def _diagonals(length, width):
+    """Rows of each anti-diagonal k = i + j inside the band, as (first, last + 1) ranges, plus
+    the flat (rows, cols) of all their cells, so the cost matrix is gathered in one step"""
+    plan, rows, cols, start = [], [], [], 0
+    for k in range(2 * length - 1):
+        first = max(0, k - length + 1, (k - width + 1) // 2)
+        last = min(k, length - 1, (k + width) // 2)
+        plan.append((first, last + 1, start, start + last + 1 - first))
+        rows.append(np.arange(first, last + 1))
+        cols.append(k - rows[-1])
+        start += last + 1 - first
+    return plan, np.concatenate(rows), np.concatenate(cols)
+
+def band_dtw(series, templates, band=BAND):
+    """DTW distance of `series` (L,) to each of `templates` (T, L), as the mean
+    absolute difference along the best path inside the |i - j| <= band * L band"""
+    templates = np.atleast_2d(templates)
+    count, length = templates.shape
+    plan, rows, cols = _diagonals(length, max(1, int(round(band * length))))
+    cost = np.abs(series[rows] - templates[:, cols])  # (T, cells in the band), diagonal by diagonal
+
+    # diagonals[k + 2, :, i + 1] = D[i, k - i]; the two leading diagonals and column 0 are the border
+    diagonals = np.full((len(plan) + 2, count, length + 1), np.inf)
+    diagonals[0, :, 0] = 0.0  # D[-1, -1]
+    best = np.empty((count, length))
+    for k, (first, end, start, stop) in enumerate(plan):
+        before, previous = diagonals[k], diagonals[k + 1]
+        out = best[:, :end - first]
+        np.minimum(before[:, first:end], previous[:, first:end], out=out)
+        np.minimum(out, previous[:, first + 1:end + 1], out=out)
+        np.add(cost[:, start:stop], out, out=diagonals[k + 2, :, first + 1:end + 1])
+    return diagonals[-1, :, length] / length
+
+def score_from_distance(distance):
+    return float(max(0.0, 1.0 - distance / TOLERANCE) * 100.0)
+
+class TemplateStore:
+    """Resampled reference trajectories per exercise, prepared once and shared by all sessions"""
+
+    def __init__(self):
+        self._templates = {}
+        self._builtin = {}
+
+    def get(self, exercise):
+        """(T, TEMPLATE_LENGTH) array of the exercise's templates (built-in sweep if none recorded), or None"""
+        if exercise in self._templates:
+            return self._templates[exercise]
+        if exercise not in self._builtin and exercise in REFERENCE_SWEEPS:
+            self._builtin[exercise] = reference_sweep(*REFERENCE_SWEEPS[exercise])[None]
+        return self._builtin.get(exercise)
+
+    def add(self, exercise, angles, replace=False):
+        """Add a recorded rep (raw angle series) as a template"""
+        trajectory = resample(angles)
+        if trajectory is None:
+            return
+        if replace or exercise not in self._templates:
+            self._templates[exercise] = trajectory[None]
+        else:
+            self._templates[exercise] = np.vstack([self._templates[exercise], trajectory])
+
+    def load(self, path):
+        """Replace templates with the ones in a .npz written by tools/build_templates.py"""
+        with np.load(path) as data:
+            for exercise in data.files:
+                self._templates[exercise] = np.asarray(data[exercise], dtype=np.float64).reshape(-1, TEMPLATE_LENGTH)
+        logger.info(f"📐 Loaded rep templates from {path}")
+
+    def save(self, path):
+        np.savez(path, **self._templates)
+
+STORE = TemplateStore()
+# Recorded templates for the server, e.g. REP_TEMPLATES=model/templates.npz
+if os.environ.get("REP_TEMPLATES"):
+    STORE.load(os.environ["REP_TEMPLATES"])
+
+class RepScorer:
+    """Collects the angles of the rep in progress and scores it when RepCounter counts it.
+
+    The angles go into a fixed array of `max_samples`; a rep that outgrows it
+    is not scored, so a long rest never grows memory or bends the next score.
+    """
+
+    def __init__(self, exercise, store=STORE, budget_ms=5.0, max_samples=MAX_REP_SAMPLES):
+        self.exercise = exercise
+        self.config = EXERCISES.get(exercise)
+        self.store = store
+        self.budget_ms = budget_ms
+        self.count = 0
+        self._angles = np.empty(max_samples)
+        self._size = 0
+        self._overflowed = False
+        self.last_score = None
+
+    @property
+    def angles(self):
+        """Angles of the rep in progress (a view, oldest first)"""
+        return self._angles[:self._size]
+
+    def movement(self):
+        """Angles of the rep in progress without the rest before it"""
+        return self.angles if self.config is None else trim_rest(self.angles, self.config)
+
+    def update(self, count, angle):
+        """Feed every analyzed frame's rep count and angle; returns the score of the latest completed rep"""
+        if self._size < len(self._angles):
+            self._angles[self._size] = angle
+            self._size += 1
+        else:
+            self._overflowed = True
+        if count != self.count:
+            if count > self.count:
+                self.last_score = None if self._overflowed else self.score(self.movement())
+            self.count = count
+            # The rep boundary starts the next rep
+            self._angles[0] = angle
+            self._size = 1
+            self._overflowed = False
+        return self.last_score
+
+    def score(self, angles):
+        """0-100 similarity of one rep to the closest template, or None when it can't be scored"""
+        templates = self.store.get(self.exercise)
+        if templates is None or len(angles) < MIN_REP_SAMPLES:
+            return None
+        started = time.perf_counter()
+        distance = float(band_dtw(resample(angles), templates).min())
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        if elapsed_ms > self.budget_ms:
+            logger.warning(f"⏱️ Rep scoring took {elapsed_ms:.1f} ms (budget {self.budget_ms} ms)")
+        return round(score_from_distance(distance), 1)
+
+    def reset(self):
+        self.count = 0
+        self._size = 0
+        self._overflowed = False
+        self.last_score = None
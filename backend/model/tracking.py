@@ -0,0 +1,112 @@
+# tracking.py
+import numpy as np
+
+from .rep_counter import RepCounter
+
+# Shoulders and hips: the torso is the most stable part of the body to track
+TORSO = [11, 12, 23, 24]
+
+def torso_center(landmarks):
+    """(center x, center y, torso length) of a pose in normalized coordinates"""
+    points = np.array([(landmarks[i].x, landmarks[i].y) for i in TORSO])
+    shoulders = points[:2].mean(axis=0)
+    hips = points[2:].mean(axis=0)
+    center = (shoulders + hips) / 2
+    return center[0], center[1], float(np.hypot(*(shoulders - hips)))
+
+class Track:
+    """One person followed across frames, with their own rep counter and feedback"""
+
+    def __init__(self, track_id, exercise, center):
+        self.track_id = track_id
+        # RepCounter per exercise, kept across switches so no count is lost
+        self.counters = {}
+        self.rep_counter = self.counter(exercise)
+        self.center = np.array(center[:2])
+        self.velocity = np.zeros(2)
+        self.size = center[2]
+        self.missed = 0  # consecutive frames without a matching detection
+        self.angle = 0.0
+        self.feedback = None
+        self.features = None  # latest feature vector (model/features.py)
+
+    def counter(self, exercise):
+        if exercise not in self.counters:
+            self.counters[exercise] = RepCounter(exercise)
+        return self.counters[exercise]
+
+    def predicted(self):
+        return self.center + self.velocity * (self.missed + 1)
+
+    def update(self, center):
+        new_center = np.array(center[:2])
+        self.velocity = 0.5 * self.velocity + 0.5 * (new_center - self.center) / (self.missed + 1)
+        self.center = new_center
+        self.size = 0.8 * self.size + 0.2 * center[2]
+        self.missed = 0
+
+class PoseTracker:
+    """Assigns stable track IDs to the people detected in a stream.
+
+    Detections are matched greedily to the nearest predicted track position,
+    measured in torso lengths so the gate works for near and far people alike.
+    Unmatched detections start new tracks; a track is dropped after it goes
+    unseen for `max_missed` frames, so someone briefly occluded keeps their count.
+    """
+
+    def __init__(self, exercise="pullup", max_distance=1.0, max_missed=15):
+        self.exercise = exercise
+        self.max_distance = max_distance
+        self.max_missed = max_missed
+        self.tracks = {}
+        self._next_id = 1
+
+    def update(self, poses):
+        """Match this frame's poses to tracks; returns [(track, landmarks)] for the people seen"""
+        centers = [torso_center(pose) for pose in poses]
+        tracks = list(self.tracks.values())
+        matched = {}
+
+        if tracks and centers:
+            predicted = np.array([track.predicted() for track in tracks])
+            detected = np.array([c[:2] for c in centers])
+            scale = np.array([max(track.size, 1e-3) for track in tracks])
+            cost = np.linalg.norm(predicted[:, None] - detected[None], axis=2) / scale[:, None]
+            # Cheapest pairs first; each track and detection is used at most once
+            used_tracks = set()
+            for t, d in zip(*np.unravel_index(np.argsort(cost, axis=None), cost.shape)):
+                if cost[t, d] > self.max_distance:
+                    break
+                if t in used_tracks or d in matched:
+                    continue
+                used_tracks.add(t)
+                matched[d] = tracks[t]
+
+        seen = []
+        for d, (pose, center) in enumerate(zip(poses, centers)):
+            track = matched.get(d)
+            if track is None:
+                track = Track(self._next_id, self.exercise, center)
+                self.tracks[track.track_id] = track
+                self._next_id += 1
+            else:
+                track.update(center)
+            seen.append((track, pose))
+
+        seen_ids = {track.track_id for track, _ in seen}
+        for track in tracks:
+            if track.track_id not in seen_ids:
+                track.missed += 1
+                if track.missed > self.max_missed:
+                    del self.tracks[track.track_id]
+        return seen
+
+    def set_exercise(self, exercise):
+        """Switch exercise; every track resumes its counter for it where it left off"""
+        self.exercise = exercise
+        for track in self.tracks.values():
+            track.rep_counter = track.counter(exercise)
+
+    def reset(self):
+        self.tracks.clear()
+        self._next_id = 1
@@ -0,0 +1,209 @@
+import math
+import threading
+import time
+from collections import deque
+
+class Rejected(Exception):
+    """A frame refused by admission control, carrying an HTTP status and retry hint"""
+
+    def __init__(self, status, message, retry_after_ms):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+        self.retry_after_ms = int(retry_after_ms)
+
+    def to_dict(self):
+        return {"error": self.message, "retry_after_ms": self.retry_after_ms}
+
+    def headers(self):
+        # Retry-After only takes whole seconds
+        return {"Retry-After": str(max(1, math.ceil(self.retry_after_ms / 1000)))}
+
+def now_ms():
+    return time.time() * 1000
+
+class ClockOffset:
+    """Offset (ms) from one client's clock to the server's.
+
+    Every frame with `client_ts` gives arrival - client_ts: the clock skew plus
+    that frame's transit time. The smallest value over the last `window` frames
+    is the skew plus the fastest transit, so a frame is only as old as its delay
+    beyond that. A window rather than an all-time minimum follows clock adjustments.
+    """
+
+    def __init__(self, window=100):
+        self._samples = deque(maxlen=window)
+        self._lock = threading.Lock()
+
+    def estimate(self, sample=None):
+        """Current offset, counting `sample` (arrival - client_ts) without recording it"""
+        with self._lock:
+            samples = list(self._samples) + ([] if sample is None else [sample])
+        return min(samples) if samples else None
+
+    def observe(self, sample):
+        """Record a frame's arrival - client_ts and return the updated offset"""
+        with self._lock:
+            self._samples.append(sample)
+            return min(self._samples)
+
+def _epoch_ms(data, key):
+    """A timing field as float epoch ms, None when absent; ValueError (400) when malformed"""
+    value = data.get(key)
+    if value is None:
+        return None
+    if isinstance(value, (int, float, str)) and not isinstance(value, bool):
+        try:
+            value = float(value)
+        except ValueError:
+            value = math.nan
+        if math.isfinite(value):
+            return value
+    raise ValueError(f"{key} must be epoch milliseconds")
+
+def frame_deadline_ms(data, max_frame_age_ms, arrival_ms=None, clock=None, record=False):
+    """Deadline (server epoch ms) for a request, or None if it carries no timing.
+
+    Clients send `client_ts` (epoch ms on their clock when the frame was
+    captured) and optionally `deadline_ms` (epoch ms on their clock after which
+    the result is useless; default client_ts + max_frame_age_ms). Client clocks
+    are never compared with the server's directly: both values are moved onto
+    the server clock with the session's ClockOffset `clock`, which learns
+    from the frame's `arrival_ms` when `record` is set. Without a `clock` the
+    frame's own age is counted from its arrival. A `deadline_ms` without
+    `client_ts` can only be shifted by what earlier frames taught the clock.
+    """
+    client_ts = _epoch_ms(data, 'client_ts')
+    deadline = _epoch_ms(data, 'deadline_ms')
+    if client_ts is None and deadline is None:
+        return None
+    arrival_ms = now_ms() if arrival_ms is None else arrival_ms
+    offset = 0.0
+    if client_ts is not None:
+        sample = arrival_ms - client_ts
+        if clock is None:
+            offset = sample
+        else:
+            offset = clock.observe(sample) if record else clock.estimate(sample)
+    elif clock is not None:
+        offset = clock.estimate() or 0.0
+    if deadline is not None:
+        return deadline + offset
+    return client_ts + offset + max_frame_age_ms
+
+class AdmissionController:
+    """Drops late frames, keeps one queued frame per session and caps concurrent inference.
+
+    - frames past their deadline are rejected before decode (503)
+    - a frame still waiting when a newer one for the same session arrives is superseded (429)
+    - at most `max_concurrent` frames run inference at once; at most `max_waiting`
+      more may wait for a slot, for no longer than `max_wait_ms` (503)
+    """
+
+    def __init__(self, max_concurrent=4, max_waiting=16, max_wait_ms=500, max_frame_age_ms=1000):
+        self.max_concurrent = max_concurrent
+        self.max_waiting = max_waiting
+        self.max_wait_ms = max_wait_ms
+        self.max_frame_age_ms = max_frame_age_ms
+        self._slots = threading.BoundedSemaphore(max_concurrent)
+        self._lock = threading.Lock()
+        self._tickets = 0
+        self.waiting = 0
+        self.counters = {"admitted": 0, "expired": 0, "superseded": 0, "overloaded": 0}
+
+    def retry_hint_ms(self, p95_ms):
+        """Rough time until a slot frees up, from current latency and backlog"""
+        backlog = (self.waiting + self.max_concurrent) / self.max_concurrent
+        return max(50.0, p95_ms * backlog)
+
+    def _reject(self, kind, status, message, p95_ms):
+        with self._lock:
+            self.counters[kind] += 1
+        raise Rejected(status, message, self.retry_hint_ms(p95_ms))
+
+    def check_deadline(self, deadline, p95_ms=0.0):
+        if deadline is not None and now_ms() > deadline:
+            self._reject("expired", 503, "Frame deadline expired", p95_ms)
+
+    def _wait_budget(self, deadline):
+        budget = self.max_wait_ms
+        if deadline is not None:
+            budget = min(budget, deadline - now_ms())
+        return max(0.0, budget) / 1000
+
+    def frame_deadline(self, data, arrival_ms=None, clock=None, record=False):
+        return frame_deadline_ms(data, self.max_frame_age_ms, arrival_ms, clock, record)
+
+    def admit(self, session, data, p95_ms=0.0, arrival_ms=None):
+        """Context manager holding the session and a global inference slot"""
+        deadline = self.frame_deadline(data, arrival_ms, session.clock, record=True)
+        return _Admission(self, session, deadline, p95_ms)
+
+    def _enter(self, session, deadline, p95_ms):
+        self.check_deadline(deadline, p95_ms)
+
+        with self._lock:
+            self._tickets += 1
+            ticket = self._tickets
+            session.latest_ticket = ticket
+
+        # Newest wins: wait for the session, then give up if a newer frame arrived meanwhile
+        if not session.lock.acquire(timeout=self._wait_budget(deadline)):
+            self._reject("overloaded", 503, "Session busy", p95_ms)
+        try:
+            self._check_current(session, ticket, p95_ms)
+
+            with self._lock:
+                full = self.waiting >= self.max_waiting
+                if not full:
+                    self.waiting += 1
+            if full:
+                self._reject("overloaded", 503, "Server overloaded", p95_ms)
+            try:
+                acquired = self._slots.acquire(timeout=self._wait_budget(deadline))
+            finally:
+                with self._lock:
+                    self.waiting -= 1
+            if not acquired:
+                self._reject("overloaded", 503, "Server overloaded", p95_ms)
+            try:
+                self._check_current(session, ticket, p95_ms)
+                self.check_deadline(deadline, p95_ms)
+            except Rejected:
+                self._slots.release()
+                raise
+        except Rejected:
+            session.lock.release()
+            raise
+
+        with self._lock:
+            self.counters["admitted"] += 1
+
+    def _check_current(self, session, ticket, p95_ms):
+        with self._lock:
+            superseded = session.latest_ticket != ticket
+        if superseded:
+            self._reject("superseded", 429, "Superseded by a newer frame", p95_ms)
+
+    def _exit(self, session):
+        self._slots.release()
+        session.lock.release()
+
+    def stats(self):
+        with self._lock:
+            return dict(self.counters, waiting=self.waiting, max_concurrent=self.max_concurrent)
+
+class _Admission:
+    def __init__(self, controller, session, deadline, p95_ms):
+        self.controller = controller
+        self.session = session
+        self.deadline = deadline
+        self.p95_ms = p95_ms
+
+    def __enter__(self):
+        self.controller._enter(self.session, self.deadline, self.p95_ms)
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.controller._exit(self.session)
+        return False
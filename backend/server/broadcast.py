@@ -0,0 +1,201 @@
+"""
+Server-sent event fan-out of live session metrics.
+
+The analysis path only records the latest update per watched session (a dict
+store, whatever the number of viewers). A single broadcaster thread turns it
+into one serialized SSE message at most `max_rate` times a second per session
+and offers that same bytes object to every subscriber. Subscribers have a
+small bounded queue; one that falls behind is disconnected instead of slowing
+anyone else down, and its EventSource simply reconnects to the latest state.
+"""
+import json
+import logging
+import queue
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+# Result fields worth streaming to dashboards (no frames, no timings)
+UPDATE_FIELDS = ("reps", "stage", "armpit_angle", "feedback", "rep_score", "has_pose", "quality", "people")
+
+KEEPALIVE = b": keepalive\n\n"
+
+def sse_message(data, event="update"):
+    return f"event: {event}\ndata: {json.dumps(data, separators=(',', ':'))}\n\n".encode("utf-8")
+
+class QueueSubscriber:
+    """Subscriber for threaded servers (Flask): iterate events() inside a streaming response"""
+
+    def __init__(self, queue_size=16):
+        self._queue = queue.Queue(maxsize=queue_size)
+        self.closed = False
+
+    def offer(self, message):
+        """Queue a message; False when the subscriber is too far behind"""
+        try:
+            self._queue.put_nowait(message)
+            return True
+        except queue.Full:
+            return False
+
+    def close(self):
+        self.closed = True
+        try:
+            self._queue.put_nowait(None)
+        except queue.Full:
+            pass  # the reader sees `closed` at its next timeout
+
+    def events(self, keepalive=15.0):
+        while not self.closed:
+            try:
+                message = self._queue.get(timeout=keepalive)
+            except queue.Empty:
+                yield KEEPALIVE
+                continue
+            if message is None:
+                break
+            yield message
+
+class AsyncSubscriber:
+    """Subscriber for asyncio servers: messages cross into the event loop thread-safely"""
+
+    def __init__(self, loop, queue_size=16):
+        import asyncio
+
+        self._asyncio = asyncio
+        self._loop = loop
+        self._queue = asyncio.Queue(maxsize=queue_size)
+        self.closed = False
+
+    def offer(self, message):
+        # qsize() read from another thread is approximate, which is fine for a drop policy
+        if self._queue.full():
+            return False
+        self._loop.call_soon_threadsafe(self._put, message)
+        return True
+
+    def _put(self, message):
+        try:
+            self._queue.put_nowait(message)
+        except self._asyncio.QueueFull:
+            self.closed = True
+
+    def close(self):
+        self.closed = True
+        self._loop.call_soon_threadsafe(self._put, None)
+
+    async def events(self, keepalive=15.0):
+        while not self.closed:
+            try:
+                message = await self._asyncio.wait_for(self._queue.get(), keepalive)
+            except self._asyncio.TimeoutError:
+                yield KEEPALIVE
+                continue
+            if message is None:
+                break
+            yield message
+
+class MetricsBroadcaster:
+    """Coalescing fan-out of per-session updates to any number of SSE subscribers"""
+
+    def __init__(self, max_rate=10.0, queue_size=16):
+        self.interval = 1.0 / max_rate
+        self.queue_size = queue_size
+        self._subscribers = {}  # session id -> set of subscribers
+        self._pending = {}      # session id -> newest update not yet sent
+        self._latest = {}       # session id -> last message sent, replayed to new subscribers
+        self._last_sent = {}
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._thread = None
+        self.published = 0
+        self.sent = 0
+        self.coalesced = 0
+        self.dropped_subscribers = 0
+
+    def publish(self, session_id, result):
+        """Record a session's latest result; a no-op when nobody is watching it"""
+        if session_id not in self._subscribers:
+            return
+        update = {key: result[key] for key in UPDATE_FIELDS if key in result}
+        update["session_id"] = session_id
+        update["ts"] = round(time.time() * 1000)
+        with self._lock:
+            if session_id in self._pending:
+                self.coalesced += 1
+            self._pending[session_id] = update
+            self.published += 1
+        self._wake.set()
+
+    def subscribe(self, session_id, subscriber):
+        with self._lock:
+            self._subscribers.setdefault(session_id, set()).add(subscriber)
+            watching = len(self._subscribers[session_id])
+            latest = self._latest.get(session_id)
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="metrics-broadcast", daemon=True)
+                self._thread.start()
+        if latest is not None:
+            subscriber.offer(latest)
+        logger.info(f"📡 Observer joined session '{session_id}' ({watching} watching)")
+        return subscriber
+
+    def unsubscribe(self, session_id, subscriber):
+        with self._lock:
+            subscribers = self._subscribers.get(session_id)
+            if subscribers is None:
+                return
+            subscribers.discard(subscriber)
+            if not subscribers:
+                # Nobody watching: stop collecting updates for this session
+                del self._subscribers[session_id]
+                self._pending.pop(session_id, None)
+                self._latest.pop(session_id, None)
+                self._last_sent.pop(session_id, None)
+
+    def _run(self):
+        while True:
+            self._wake.wait()
+            now = time.monotonic()
+            due, next_due = [], None
+            with self._lock:
+                for session_id in list(self._pending):
+                    ready_at = self._last_sent.get(session_id, 0.0) + self.interval
+                    if ready_at <= now:
+                        due.append((session_id, self._pending.pop(session_id),
+                                    list(self._subscribers.get(session_id, ()))))
+                        self._last_sent[session_id] = now
+                    else:
+                        next_due = ready_at if next_due is None else min(next_due, ready_at)
+                if not self._pending:
+                    self._wake.clear()
+
+            for session_id, update, subscribers in due:
+                # Serialized once, the same bytes go to every subscriber
+                message = sse_message(update)
+                with self._lock:
+                    if session_id in self._subscribers:
+                        self._latest[session_id] = message
+                for subscriber in subscribers:
+                    if subscriber.offer(message):
+                        self.sent += 1
+                    else:
+                        logger.info(f"🐢 Dropping slow observer of session '{session_id}'")
+                        self.dropped_subscribers += 1
+                        self.unsubscribe(session_id, subscriber)
+                        subscriber.close()
+
+            if next_due is not None:
+                time.sleep(max(0.0, next_due - time.monotonic()))
+
+    def stats(self):
+        with self._lock:
+            observers = sum(len(s) for s in self._subscribers.values())
+        return {
+            "observers": observers,
+            "published": self.published,
+            "coalesced": self.coalesced,
+            "sent": self.sent,
+            "dropped_observers": self.dropped_subscribers,
+        }
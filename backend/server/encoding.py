@@ -0,0 +1,235 @@
+"""
+Response encodings for /api/analyze-frame.
+
+JSON stays the default. Clients that send `Accept: application/x-formfeedback`
+get a compact little-endian binary layout instead:
+
+    u8 version, u8 flags (HAS_POSE, LANDMARKS, ..., IDLE, REP_SCORE), u8 quality code, u8 stage code,
+    u8 exercise code (the detected exercise in auto mode, 0 otherwise),
+    u8 phase code (the classifier's movement phase, a stage code; 0 when there is none)
+    varint reps, f32 angle, feedback
+    [flags & REP_SCORE]  f32 score of the last completed rep
+    [flags & LANDMARKS]  u8 count, count x u8 MediaPipe landmark index, zero padding to a
+                         4-byte offset, then count x (x, y, z, visibility) f32
+    [flags & PEOPLE]     varint count, then per person: varint track_id, varint reps,
+                         u8 stage, f32 angle, feedback, f32 center x, f32 center y
+    [flags & TIMINGS]    u8 count, then per stage: u8 timing code, f32 ms
+    [flags & FRAME]      varint length, raw JPEG bytes (no base64)
+
+feedback = varint part count, then per " | "-separated part a varint code from
+FEEDBACK_MESSAGES; code 0 is followed by varint length + UTF-8 text for
+messages not in the table. The frontend parser lives in
+frontend/src/lib/adapters/binary-response.ts and must be kept in step.
+"""
+import base64
+import struct
+
+import numpy as np
+
+from model.landmarks import LANDMARK_NAMES, landmark_indices
+
+BINARY_MEDIA_TYPE = "application/x-formfeedback"
+VERSION = 4
+
+HAS_POSE, LANDMARKS, PEOPLE, TIMINGS, FRAME, REUSED, IDLE, REP_SCORE = 1, 2, 4, 8, 16, 32, 64, 128
+
+QUALITY_CODES = {None: 0, "lite": 1, "full": 2, "heavy": 3}
+STAGE_CODES = {None: 0, "up": 1, "down": 2}
+# Append only, like the feedback messages
+EXERCISE_CODES = {None: 0, "pullup": 1, "squat": 2, "shoulderabduction": 3}
+TIMING_CODES = {"decode": 1, "inference": 2, "analysis": 3, "encode": 4, "gate": 5, "presence": 6}
+# Every message the rules can produce; append only, codes are part of the wire format
+FEEDBACK_MESSAGES = [
+    None,
+    "No pose detected",
+    "No person detected.",
+    "Unknown exercise type",
+    "Pull-up form is good!",
+    "Pull higher, arms not bending enough.",
+    "Lower fully, arms not straight enough.",
+    "Body is swinging, keep stable.",
+    "Squat form is good!",
+    "Go deeper, knees not bending enough.",
+    "Stand up fully, incomplete extension.",
+    "Keep torso upright, avoid leaning forward.",
+    "Shoulder abduction form is good!",
+    "Raise arms higher, not enough elevation.",
+    "Lower arms fully to sides.",
+    "Keep arms straight, avoid bending elbows.",
+    "Slow down, control the movement.",
+]
+FEEDBACK_CODES = {message: code for code, message in enumerate(FEEDBACK_MESSAGES) if message}
+
+_F32 = struct.Struct("<f")
+
+def wants_binary(accept):
+    """True when the Accept header asks for the binary encoding"""
+    return bool(accept) and BINARY_MEDIA_TYPE in accept
+
+def to_json(result):
+    """JSON-safe copy of an analysis result: base64 frame, named landmark objects"""
+    frame = result.get("processed_frame")
+    landmarks = result.get("landmarks")
+    if not isinstance(frame, (bytes, bytearray, memoryview)) and landmarks is None:
+        return result
+    result = dict(result)
+    if isinstance(frame, (bytes, bytearray, memoryview)):
+        result["processed_frame"] = base64.b64encode(frame).decode("utf-8")
+    if landmarks is not None:
+        del result["landmarks"]
+        landmarks = np.asarray(landmarks)
+        result["pose_landmarks"] = [
+            {"name": LANDMARK_NAMES[i], "x": x, "y": y, "z": z, "score": v}
+            for i, (x, y, z, v) in zip(landmark_indices(landmarks), landmarks.tolist())
+        ]
+    return result
+
+def _varint(out, value):
+    value = int(value)
+    while value >= 0x80:
+        out.append((value & 0x7F) | 0x80)
+        value >>= 7
+    out.append(value)
+
+def _text(out, text):
+    data = text.encode("utf-8")
+    _varint(out, len(data))
+    out += data
+
+def _feedback(out, feedback):
+    parts = feedback.split(" | ") if feedback else []
+    _varint(out, len(parts))
+    for part in parts:
+        code = FEEDBACK_CODES.get(part, 0)
+        _varint(out, code)
+        if code == 0:
+            _text(out, part)
+
+def encode_binary(result):
+    """Pack an analysis result into the binary layout described above"""
+    landmarks = result.get("landmarks")
+    people = result.get("people")
+    timings = result.get("timings_ms")
+    frame = result.get("processed_frame")
+    flags = ((HAS_POSE if result.get("has_pose") else 0) | (LANDMARKS if landmarks is not None else 0) |
+             (PEOPLE if people is not None else 0) | (TIMINGS if timings else 0) | (FRAME if frame else 0) |
+             (REUSED if result.get("reused") else 0) | (IDLE if result.get("idle") else 0) |
+             (REP_SCORE if result.get("rep_score") is not None else 0))
+
+    out = bytearray((VERSION, flags, QUALITY_CODES.get(result.get("quality"), 0),
+                     STAGE_CODES.get(result.get("stage"), 0), EXERCISE_CODES.get(result.get("exercise"), 0),
+                     STAGE_CODES.get(result.get("phase"), 0)))
+    _varint(out, result.get("reps") or 0)
+    out += _F32.pack(result.get("armpit_angle") or 0.0)
+    _feedback(out, result.get("feedback"))
+    if flags & REP_SCORE:
+        out += _F32.pack(result["rep_score"])
+
+    if landmarks is not None:
+        landmarks = np.asarray(landmarks, dtype="<f4")
+        indices = landmark_indices(landmarks)
+        out.append(len(indices))
+        out += bytes(indices)
+        # Aligned so browsers can view the block as a Float32Array without copying
+        out += bytes(-len(out) % 4)
+        out += landmarks.reshape(len(indices), 4).tobytes()
+    if people is not None:
+        _varint(out, len(people))
+        for person in people:
+            _varint(out, person["track_id"])
+            _varint(out, person["reps"])
+            out.append(STAGE_CODES.get(person["stage"], 0))
+            out += _F32.pack(person["armpit_angle"] or 0.0)
+            _feedback(out, person["feedback"])
+            out += struct.pack("<ff", *person["center"])
+    if timings:
+        out.append(len(timings))
+        for stage, ms in timings.items():
+            out.append(TIMING_CODES.get(stage, 0))
+            out += _F32.pack(ms)
+    if frame:
+        if isinstance(frame, str):
+            frame = base64.b64decode(frame)
+        _varint(out, len(frame))
+        out += frame
+    return bytes(out)
+
+class _Reader:
+    def __init__(self, data):
+        self.data = memoryview(data)
+        self.pos = 0
+
+    def u8(self):
+        self.pos += 1
+        return self.data[self.pos - 1]
+
+    def varint(self):
+        value = shift = 0
+        while True:
+            byte = self.u8()
+            value |= (byte & 0x7F) << shift
+            if byte < 0x80:
+                return value
+            shift += 7
+
+    def f32(self):
+        self.pos += 4
+        return _F32.unpack_from(self.data, self.pos - 4)[0]
+
+    def raw(self, size):
+        self.pos += size
+        return self.data[self.pos - size:self.pos]
+
+    def feedback(self):
+        parts = []
+        for _ in range(self.varint()):
+            code = self.varint()
+            parts.append(FEEDBACK_MESSAGES[code] if code else bytes(self.raw(self.varint())).decode("utf-8"))
+        return " | ".join(parts) if parts else None
+
+_QUALITY_NAMES = {code: name for name, code in QUALITY_CODES.items()}
+_STAGE_NAMES = {code: name for name, code in STAGE_CODES.items()}
+_EXERCISE_NAMES = {code: name for name, code in EXERCISE_CODES.items()}
+_TIMING_NAMES = {code: name for name, code in TIMING_CODES.items()}
+
+def decode_binary(data):
+    """Inverse of encode_binary (for Python clients and tests); frames come back as raw JPEG bytes"""
+    reader = _Reader(data)
+    version, flags = reader.u8(), reader.u8()
+    if version != VERSION:
+        raise ValueError(f"Unsupported binary response version {version}")
+    quality, stage, exercise, phase = reader.u8(), reader.u8(), reader.u8(), reader.u8()
+    result = {"quality": _QUALITY_NAMES.get(quality), "stage": _STAGE_NAMES.get(stage),
+              "reps": reader.varint(), "armpit_angle": reader.f32(), "feedback": reader.feedback(),
+              "has_pose": bool(flags & HAS_POSE)}
+    if exercise:
+        result["exercise"] = _EXERCISE_NAMES.get(exercise)
+    if phase:
+        result["phase"] = _STAGE_NAMES.get(phase)
+    if flags & REP_SCORE:
+        result["rep_score"] = reader.f32()
+    if flags & REUSED:
+        result["reused"] = True
+    if flags & IDLE:
+        result["idle"] = True
+    if flags & LANDMARKS:
+        indices = list(reader.raw(reader.u8()))
+        reader.pos += -reader.pos % 4
+        result["landmark_indices"] = indices
+        result["landmarks"] = np.frombuffer(reader.raw(len(indices) * 16), dtype="<f4").reshape(len(indices), 4)
+    if flags & PEOPLE:
+        for key in ("reps", "stage", "armpit_angle", "feedback"):
+            del result[key]
+        result["people"] = [
+            {"track_id": reader.varint(), "reps": reader.varint(), "stage": _STAGE_NAMES.get(reader.u8()),
+             "armpit_angle": reader.f32(), "feedback": reader.feedback(), "center": [reader.f32(), reader.f32()]}
+            for _ in range(reader.varint())
+        ]
+    if flags & TIMINGS:
+        result["timings_ms"] = {}
+        for _ in range(reader.u8()):
+            code = reader.u8()
+            result["timings_ms"][_TIMING_NAMES.get(code, str(code))] = reader.f32()
+    if flags & FRAME:
+        result["processed_frame"] = bytes(reader.raw(reader.varint()))
+    return result
@@ -0,0 +1,91 @@
+from flask import Flask, Response, request, jsonify
+from flask_cors import CORS
+from server.broadcast import QueueSubscriber
+from server.encoding import BINARY_MEDIA_TYPE, encode_binary, to_json, wants_binary
+from server.pipeline import AnalysisService
+from server.profiles import get_profile, configure_logging
+
+def create_app(profile=None, service=None):
+    """Build the Flask API for a profile (dev/prod/bench, default $SERVER_PROFILE or prod)"""
+    profile = get_profile(profile)
+    configure_logging(profile)
+
+    app = Flask(__name__)
+    app.config["PROFILE"] = profile
+    CORS(app)  # Enable CORS for all routes
+
+    # Sessions, load tracking and admission control shared by all endpoints
+    service = service or AnalysisService(profile)
+    app.extensions["analysis_service"] = service
+
+    def respond(result, accept=None):
+        body, status, headers = result
+        # Successful analyses go out in the compact binary layout when the client asks for it
+        if status == 200 and wants_binary(accept):
+            return Response(encode_binary(body), status, headers, mimetype=BINARY_MEDIA_TYPE)
+        return jsonify(to_json(body)), status, headers
+
+    @app.route('/api/health', methods=['GET'])
+    def health_check():
+        """Health check endpoint"""
+        return respond(service.health())
+
+    @app.route('/api/metrics', methods=['GET'])
+    def metrics():
+        """Load and quality metrics"""
+        return respond(service.metrics())
+
+    @app.route('/api/reset-counter', methods=['POST'])
+    def reset_counter():
+        """Reset the rep counter"""
+        return respond(service.reset_counter(request.get_json(silent=True)))
+
+    @app.route('/api/analyze-frame', methods=['POST'])
+    def analyze_frame():
+        """Simple frame analysis - just rep counting and angle like app.py"""
+        return respond(service.analyze_frame(request.get_json(silent=True)), request.headers.get('Accept'))
+
+    @app.route('/api/sessions/<session_id>/events', methods=['GET'])
+    def session_events(session_id):
+        """Live reps/stage/angle/feedback of a session as server-sent events"""
+        broadcaster = service.broadcaster
+        subscriber = broadcaster.subscribe(session_id, QueueSubscriber(broadcaster.queue_size))
+
+        def stream():
+            try:
+                yield from subscriber.events()
+            finally:
+                broadcaster.unsubscribe(session_id, subscriber)
+
+        return Response(stream(), mimetype='text/event-stream', headers=SSE_HEADERS)
+
+    return app
+
+# No caching or proxy buffering for event streams
+SSE_HEADERS = {"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+
+def print_banner(title, profile, port=5000):
+    print(f"🚀 Starting {title} ({profile['name']} profile)")
+    print("📋 Available endpoints:")
+    print("- POST /api/analyze-frame (main endpoint for rep counting & angles)")
+    print("- POST /api/reset-counter")
+    print("- GET /api/health")
+    print("- GET /api/metrics")
+    print("- GET /api/sessions/<session_id>/events (live metrics, server-sent events)")
+    print(f"🌐 Server running on http://localhost:{port}")
+
+def start_local_transport(service, address=None):
+    """Serve co-located capture clients over shared memory (see utils/shm_transport.py)"""
+    from utils.shm_transport import LocalFrameServer
+    return LocalFrameServer(service, address).start()
+
+def parse_args(description):
+    import argparse
+    parser = argparse.ArgumentParser(description=description)
+    parser.add_argument("--profile", default=None, help="dev, prod or bench (default: $SERVER_PROFILE or prod)")
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=5000)
+    parser.add_argument("--local-transport", nargs="?", const="", default=None, metavar="ADDRESS",
+                        help="also accept frames from same-host clients over shared memory "
+                             "(Unix socket path or pipe name; default /tmp/formfeedback.sock)")
+    return parser.parse_args()
@@ -0,0 +1,440 @@
+import base64
+import logging
+import time
+import cv2
+import numpy as np
+from model.features import frame_features
+from model.feedback_rules import check_pullup_form, check_squat_form, check_shoulder_abduction_form, check_tempo
+from model.landmarks import landmarks_to_subset
+from model.motion_gate import GateStats
+from model.pose_detector import LANDMARKER_DIR, LANDMARKER_URL
+from model.presence import PresenceStats
+from model.quality import QualityController, QUALITY_TIERS, LANDMARKER_MODELS, available_tiers, multi_person_tiers
+from model.rep_counter import uses_world
+from server.admission import AdmissionController, Rejected, now_ms
+from server.broadcast import MetricsBroadcaster
+from server.profiles import get_profile
+from server.sessions import SessionStore
+from utils.codec import get_codec, decode_scaled
+from utils.result_cache import LRUCache, content_key
+
+logger = logging.getLogger(__name__)
+
+# Seconds of angle history the tempo check looks at
+TEMPO_WINDOW = 1.0
+
+_MISS = object()
+
+def get_exercise_feedback(landmarks_list, stage, exercise_type="pullup", motion=None, world=None):
+    """Get feedback based on exercise type, plus a tempo cue when `motion` stats are given.
+
+    `landmarks_list` is a landmark list or a full or compact landmark array. With a
+    `world` landmark array the rules measure their angles in 3D.
+    """
+    if exercise_type.lower() == "pullup":
+        feedback = check_pullup_form(landmarks_list, stage, world)
+    elif exercise_type.lower() == "squat":
+        feedback = check_squat_form(landmarks_list, stage, world)
+    elif exercise_type.lower() == "shoulderabduction":
+        feedback = check_shoulder_abduction_form(landmarks_list, stage, world)
+    else:
+        return "Unknown exercise type"
+
+    tempo = check_tempo(exercise_type.lower(), motion)
+    if tempo:
+        return tempo if feedback.endswith("form is good!") else f"{feedback} | {tempo}"
+    return feedback
+
+def frame_timestamp(data):
+    """Capture time of a frame in seconds: the client's clock when it sent one"""
+    client_ts = data.get('client_ts')
+    if isinstance(client_ts, (int, float)) and not isinstance(client_ts, bool):
+        return client_ts / 1000.0
+    return time.time()
+
+def decode_base64_to_frame(base64_string, codec=None, target_width=None, buffers=None):
+    """Convert base64 string back to cv2 frame
+
+    With a codec and target_width, JPEGs are decoded at the smallest 1/2^n
+    scale that still covers target_width, into `buffers` when given.
+    """
+    try:
+        # Remove data URL prefix if present
+        if base64_string.startswith('data:image'):
+            base64_string = base64_string[base64_string.index(',') + 1:]
+
+        # Decode base64
+        frame_data = base64.b64decode(base64_string)
+        if codec is not None:
+            return decode_scaled(codec, frame_data, target_width, buffers)
+        frame_array = np.frombuffer(frame_data, dtype=np.uint8)
+        frame = cv2.imdecode(frame_array, cv2.IMREAD_COLOR)
+        return frame
+    except Exception as e:
+        logger.warning(f"Error decoding base64 frame: {e}")
+        return None
+
+class AnalysisService:
+    """Framework-independent implementation of the API endpoints.
+
+    Each handler takes the parsed JSON body and returns (body, status, headers),
+    so the Flask and ASGI servers share one code path.
+    """
+
+    def __init__(self, profile=None, sessions=None, quality=None, admission=None, broadcaster=None):
+        # Drawing and response shape come from the server profile (dev/prod/bench)
+        self.profile = get_profile(profile)
+        self.codec = get_codec(self.profile["codec"], self.profile["jpeg_quality"])
+        # Per-client sessions (detector, rep counter, quality tier) and server-wide load tracking
+        self.sessions = sessions or SessionStore(motion_threshold=self.profile["motion_threshold"],
+                                                 idle_after_misses=self.profile["idle_after_misses"],
+                                                 idle_probe_interval=self.profile["idle_probe_interval"],
+                                                 exercise_switch_frames=self.profile["exercise_switch_frames"],
+                                                 auto_exercise=self.profile["auto_exercise"])
+        # Tiers whose pose model is missing (and can't be fetched now) are never used
+        self.quality = quality or QualityController(tiers=available_tiers())
+        # Multi-person mode needs a PoseLandmarker bundle, which isn't shipped: without one it answers 501
+        self.multi_person_tiers = multi_person_tiers()
+        if not self.multi_person_tiers:
+            logger.warning(f"⚠️ Multi-person mode disabled: none of {', '.join(LANDMARKER_MODELS.values())} "
+                           f"in {LANDMARKER_DIR} (download from {LANDMARKER_URL} or set POSE_LANDMARKER_DIR)")
+        # Deadline checks, newest-frame-wins per session and a global inference limit
+        self.admission = admission or AdmissionController()
+        # Live metrics for read-only observers (coach / clinician dashboards)
+        self.broadcaster = broadcaster or MetricsBroadcaster(self.profile["events_max_rate"])
+        # How often the per-session motion gates let a frame skip inference
+        self.motion_stats = GateStats()
+        # Frames of empty scenes answered without full inference
+        self.presence_stats = PresenceStats()
+        # Detector output of recent uploads, keyed by payload hash, so byte-identical frames skip inference
+        self.result_cache = LRUCache(self.profile["result_cache_size"]) if self.profile["result_cache_size"] else None
+
+    def health(self):
+        return {"status": "healthy", "message": "Flask server is running"}, 200, {}
+
+    def metrics(self):
+        return {
+            "sessions": len(self.sessions),
+            "quality": self.quality.stats(),
+            "admission": self.admission.stats(),
+            "events": self.broadcaster.stats(),
+            "motion_gate": self.motion_stats.stats(),
+            "presence": self.presence_stats.stats(),
+            "result_cache": self.result_cache.stats() if self.result_cache is not None else None,
+        }, 200, {}
+
+    def reset_counter(self, data):
+        """Reset the rep counter"""
+        try:
+            session = self.sessions.find((data or {}).get('session_id'))
+            if session is not None:
+                session.reset_counters()
+            return {"message": "Counter reset", "reps": 0}, 200, {}
+        except Exception as e:
+            return {"error": str(e)}, 500, {}
+
+    def precheck_frame(self, data, frame=None, arrival_ms=None):
+        """Cheap validation that can run before handing the frame to a worker"""
+        if not data:
+            return {"error": "No data provided"}, 400, {}
+        if not isinstance(data, dict):
+            return {"error": "Request body must be a JSON object"}, 400, {}
+        if frame is None and not data.get('frame', ''):
+            return {"error": "No frame provided"}, 400, {}
+        if data.get('multi_person') and not self.multi_person_tiers:
+            return {"error": "Multi-person model not installed"}, 501, {}
+        session = self.sessions.find(data.get('session_id'))
+        try:
+            self.admission.check_deadline(
+                self.admission.frame_deadline(data, arrival_ms, session.clock if session else None),
+                self.quality.p95())
+        except Rejected as e:
+            return e.to_dict(), e.status, e.headers()
+        except ValueError as e:
+            # Malformed client_ts / deadline_ms: same 400 from every server
+            return {"error": str(e)}, 400, {}
+        return None
+
+    def analyze_frame(self, data, frame=None, arrival_ms=None):
+        """Simple frame analysis - just rep counting and angle like app.py
+
+        `frame` is an already-decoded BGR image from the local shared-memory
+        transport; the skeleton is drawn into it in place and nothing is encoded.
+        Otherwise the frame is the base64 JPEG in data['frame']. `arrival_ms`
+        (server epoch ms the request came in, default now) anchors the frame's deadline.
+        """
+        try:
+            arrival_ms = now_ms() if arrival_ms is None else arrival_ms
+            rejected = self.precheck_frame(data, frame, arrival_ms)
+            if rejected is not None:
+                return rejected
+
+            exercise_type = data.get('exercise_type', 'pullup')
+            session = self.sessions.get(data.get('session_id'), exercise_type, data.get('quality'))
+            session.set_requested_tier(data.get('quality'))
+
+            self.quality.begin()
+            started = time.perf_counter()
+            inferred = False
+            try:
+                with self.admission.admit(session, data, self.quality.p95(), arrival_ms):
+                    admitted_at = time.perf_counter()
+                    encode = frame is None and self.profile["processed_frame"]
+                    cache_key = None
+                    if frame is None and self.result_cache is not None:
+                        cache_key = content_key(data['frame'])
+                    if frame is None:
+                        # Decode only once admitted, so dropped frames cost nothing
+                        frame = decode_base64_to_frame(data['frame'], self.codec, self._decode_width(session),
+                                                       session.buffers)
+                        if frame is None:
+                            raise ValueError("Invalid frame data")
+                    result = self.analyze_session_frame(session, frame, exercise_type, encode, admitted_at,
+                                                        multi_person=bool(data.get('multi_person')),
+                                                        timestamp=frame_timestamp(data),
+                                                        include_landmarks=bool(data.get('landmarks')),
+                                                        cache_key=cache_key)
+                    inferred = session.inferred
+                    self.broadcaster.publish(session.session_id, result)
+                    return result, 200, {}
+            finally:
+                # Only frames that ran the detector say anything about inference latency: rejected,
+                # motion-gated, idle and cached frames would pull p95 down and keep the tier too high
+                self.quality.end((time.perf_counter() - started) * 1000 if inferred else None)
+
+        except Rejected as e:
+            return e.to_dict(), e.status, e.headers()
+        except ValueError as e:
+            return {"error": str(e)}, 400, {}
+        except Exception as e:
+            logger.exception(f"Error in analyze_frame: {e}")
+            return {"error": str(e)}, 500, {}
+
+    def _decode_width(self, session):
+        """Smallest width worth decoding to: the inference width of the session's tier"""
+        if not self.profile["reduced_decode"]:
+            return None
+        return QUALITY_TIERS[self.quality.effective_tier(session.requested_tier)]["input_width"]
+
+    def analyze_session_frame(self, session, frame, exercise_type, encode=True, started=None, multi_person=False,
+                              timestamp=None, include_landmarks=False, cache_key=None):
+        """Run detection, rep counting and feedback for one decoded frame of a session.
+
+        A frame that barely differs from the last analyzed one gets that
+        frame's result back ("reused": true) without running inference, and
+        while nobody is in view only a cheap presence probe runs ("idle": true).
+        `cache_key` (hash of the uploaded bytes) lets a repeated upload reuse
+        the detector output of the first one.
+        """
+        timings = {"decode": time.perf_counter()}
+        started = started or timings["decode"]
+        session.inferred = False
+
+        # Requested exercise (debounced) or "auto"; everything below uses the session's current one
+        session.update_exercise_type(exercise_type)
+        exercise_type = session.exercise
+
+        gate = session.motion_gate
+        variant = (multi_person, include_landmarks, encode)
+        reused = gate.still(frame, variant)
+        self.motion_stats.record(reused)
+        timings["gate"] = time.perf_counter()
+        if reused:
+            return self._add_timings(dict(gate.last_result, reused=True), timings, started)
+
+        presence = session.presence
+        if presence.idle:
+            probed = presence.should_probe(frame)
+            if not probed or not self._probe(session, frame, multi_person):
+                self.presence_stats.record(skipped=int(not probed), probes=int(probed))
+                timings["presence"] = time.perf_counter()
+                return self._add_timings(dict(presence.idle_result, idle=True), timings, started)
+            self.presence_stats.record(probes=1, wakeups=1)
+            presence.wake()
+
+        result = self._analyze_fresh(session, frame, exercise_type, encode, started, timings, multi_person,
+                                     timestamp, include_landmarks, cache_key)
+        presence.record(result)
+        gate.update(result, variant)
+        return result
+
+    def _probe(self, session, frame, multi_person):
+        """Presence check for an idle session: its detector on a small copy of the frame"""
+        tier = self.quality.effective_tier(session.requested_tier)
+        detector = session.ensure_detector(tier, multi_person)
+        probe = session.presence.probe_frame(frame)
+        if multi_person:
+            return bool(detector.detect_poses(probe, draw=False)[1])
+        return detector.detect_pose(probe, draw=False)[1] is not None
+
+    def _detect(self, session, frame, tier, multi_person, cache_key):
+        """(frame, landmarks, world landmarks) from the session's detector, or from the result
+        cache for a repeated upload. Multi-person mode has no world landmarks (None).
+
+        Only detector output is cached: reps, stage and feedback still come
+        from the session's own state, so they are never stale.
+        """
+        draw = self.profile["draw"]
+        key = None if cache_key is None else (cache_key, tier, multi_person)
+        cached = _MISS if key is None else self.result_cache.get(key, _MISS)
+        detector = session.detector
+        if cached is _MISS:
+            session.inferred = True
+            if multi_person:
+                frame, landmarks = detector.detect_poses(frame, draw=draw)
+                world = None
+            else:
+                frame, landmarks = detector.detect_pose(frame, draw=draw)
+                world = detector.world_landmarks
+            if key is not None:
+                self.result_cache.put(key, (landmarks, world))
+            return frame, landmarks, world
+        landmarks, world = cached
+        if draw:
+            for pose in (landmarks if multi_person else [landmarks]):
+                detector.renderer.draw(frame, pose)
+        return frame, landmarks, world
+
+    def _analyze_fresh(self, session, frame, exercise_type, encode, started, timings, multi_person, timestamp,
+                       include_landmarks, cache_key=None):
+        rep_counter = session.rep_counter
+
+        # Pick the detector for this session's tier, capped by current server load
+        tier = self.quality.effective_tier(session.requested_tier)
+        session.ensure_detector(tier, multi_person)
+
+        if multi_person:
+            result = self._analyze_people(session, frame, exercise_type, encode, timings, tier, cache_key)
+            result["quality"] = tier
+            return self._add_timings(result, timings, started)
+
+        # Simple pose detection like app.py
+        processed_frame, landmarks, world_landmarks = self._detect(session, frame, tier, False, cache_key)
+        timings["inference"] = time.perf_counter()
+
+        logger.debug(f"🔍 Frame shape: {frame.shape}, type: {frame.dtype}")
+        logger.debug(f"🔍 Pose detector result: processed_frame={processed_frame is not None}, landmarks={landmarks is not None}")
+
+        if landmarks:
+            landmarks_list = landmarks.landmark
+            logger.debug(f"✅ Pose detected with {len(landmarks_list)} landmarks")
+
+            # One compact array (only the SUBSET joints) and one feature vector per frame, shared by
+            # everything downstream: features, detection, rep counting and the form rules
+            pose = landmarks_to_subset(landmarks_list)
+            height, width = frame.shape[:2]
+            session.features = frame_features(pose, self._features_use_z(session), width / height)
+            # Metric 3D landmarks, converted only when some exercise measures its angles on them
+            world = None
+            if world_landmarks is not None and uses_world(None if session.auto else exercise_type):
+                world = landmarks_to_subset(world_landmarks.landmark)
+            if session.auto:
+                # May switch the session to another exercise, whose counter then continues
+                session.detect_exercise(pose, session.features, world)
+                rep_counter, exercise_type = session.rep_counter, session.exercise
+
+            # Core functionality: Rep counting and angle calculation
+            reps, angle_value = rep_counter.update(pose, world)
+            rep_score = session.rep_scorer.update(reps, angle_value)
+            logger.debug(f"📊 Rep counter update: reps={reps}, angle={angle_value:.1f}°, stage={rep_counter.stage}")
+
+            # Recent angles give the rules tempo, not just the current frame
+            session.history.append(timestamp or time.time(), angle_value)
+            motion = session.history.channel_stats(seconds=TEMPO_WINDOW)
+
+            # Simple feedback based on exercise type
+            feedback = get_exercise_feedback(pose, rep_counter.stage, exercise_type, motion,
+                                             world if uses_world(exercise_type) else None)
+            logger.debug(f"💬 Feedback: {feedback}")
+            timings["analysis"] = time.perf_counter()
+
+            result = {
+                "reps": reps,
+                "armpit_angle": angle_value,  # Main angle for the exercise
+                "stage": rep_counter.stage,
+                "feedback": feedback,
+                "rep_score": rep_score,  # 0-100 match of the last completed rep to the template
+                "has_pose": True,
+                "quality": tier
+            }
+            if session.auto and session.exercise_detector.phase is not None:
+                result["phase"] = session.exercise_detector.phase  # the classifier's, frame by frame
+            if include_landmarks:
+                result["landmarks"] = pose
+
+            if encode:
+                # Encode processed frame with MediaPipe skeleton (like app.py)
+                # Raw JPEG; the response encoding base64s it for JSON clients only
+                result["processed_frame"] = self.codec.encode(processed_frame)  # Frame with skeleton like app.py
+                timings["encode"] = time.perf_counter()
+                logger.debug(f"🖼️ Encoded processed frame: {len(result['processed_frame'])} bytes")
+        else:
+            logger.debug(f"❌ No pose detected - frame analyzed but no landmarks found")
+            if logger.isEnabledFor(logging.DEBUG):
+                # Full-frame scans are only worth paying for when someone reads them
+                logger.debug(f"🔍 Frame stats: min={frame.min()}, max={frame.max()}, shape={frame.shape}")
+            session.features = None
+            result = {
+                "reps": rep_counter.reps,
+                "armpit_angle": 0.0,
+                "stage": rep_counter.stage,
+                "feedback": "No pose detected",
+                "rep_score": session.rep_scorer.last_score,
+                "has_pose": False,
+                "quality": tier
+            }
+        if session.auto:
+            result["exercise"] = exercise_type  # the detected (or still default) exercise
+
+        return self._add_timings(result, timings, started)
+
+    def _features_use_z(self, session):
+        """Feature layout for a session: the exercise classifier's own in auto mode, else the profile's"""
+        classifier = session.exercise_detector.classifier
+        if session.auto and classifier is not None:
+            return classifier.use_z
+        return self.profile["features_use_z"]
+
+    def _analyze_people(self, session, frame, exercise_type, encode, timings, tier=None, cache_key=None):
+        """Multi-person variant: every tracked person gets their own reps, stage and feedback"""
+        processed_frame, poses, _ = self._detect(session, frame, tier, True, cache_key)
+        timings["inference"] = time.perf_counter()
+
+        people = []
+        height, width = processed_frame.shape[:2]
+        for track, landmarks in session.tracker.update(poses):
+            pose = landmarks_to_subset(landmarks)
+            track.features = frame_features(pose, self.profile["features_use_z"], width / height)
+            reps, track.angle = track.rep_counter.update(pose)
+            track.feedback = get_exercise_feedback(pose, track.rep_counter.stage, exercise_type)
+            people.append({
+                "track_id": track.track_id,
+                "reps": reps,
+                "armpit_angle": track.angle,
+                "stage": track.rep_counter.stage,
+                "feedback": track.feedback,
+                "center": [round(float(v), 4) for v in track.center],
+            })
+            if self.profile["draw"]:
+                # Label each skeleton with its track ID and count
+                x, y = int(track.center[0] * width), int(landmarks[0].y * height) - 20
+                cv2.putText(processed_frame, f"#{track.track_id}: {reps}", (x, max(y, 20)),
+                            cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 255, 255), 2)
+        timings["analysis"] = time.perf_counter()
+        logger.debug(f"👥 {len(people)} people tracked: {[p['track_id'] for p in people]}")
+
+        result = {"people": people, "has_pose": bool(people)}
+        if encode:
+            result["processed_frame"] = self.codec.encode(processed_frame)
+            timings["encode"] = time.perf_counter()
+        return result
+
+    def _add_timings(self, result, timings, started):
+        if self.profile["timings"]:
+            # Milliseconds spent in each stage, in pipeline order
+            previous = started
+            result["timings_ms"] = {}
+            for stage, mark in timings.items():
+                result["timings_ms"][stage] = round((mark - previous) * 1000, 2)
+                previous = mark
+        return result
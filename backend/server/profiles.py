@@ -0,0 +1,49 @@
+import logging
+import os
+
+# Server profiles. "prod" is the default so every deployment gets the fast path;
+# select another with SERVER_PROFILE=dev|bench or --profile.
+# debug: Flask debug mode / reloader
+# log_level: per-frame detail is logged at DEBUG, so only "dev" pays for it
+# draw: draw the skeleton onto the frame
+# processed_frame: return the annotated frame as base64 JPEG
+# timings: add per-stage "timings_ms" to each response
+# codec: JPEG codec ("auto" = libjpeg-turbo when simplejpeg is installed, else OpenCV)
+# jpeg_quality: quality of the returned processed_frame
+# reduced_decode: decode at 1/2, 1/4 or 1/8 scale when the quality tier's inference width allows
+# events_max_rate: most live-metric (SSE) updates per second sent for one session
+# motion_threshold: mean grey-level change below which a frame reuses the last result (0 = always infer)
+# idle_after_misses / idle_probe_interval: after this many frames without a pose, only probe for a
+#   person every N seconds (0 misses = never go idle)
+# result_cache_size: detector outputs of recent uploads kept by payload hash (0 = no cache)
+# features_use_z: include MediaPipe's depth estimate in the per-frame feature vector (auto-exercise
+#   sessions with a classifier use the layout it was trained on)
+# exercise_switch_frames: consecutive requests for another exercise_type before a session switches to it
+# auto_exercise: detect the exercise server-side for every session, as if clients sent "auto"
+_CODEC = {"codec": "auto", "jpeg_quality": 80, "reduced_decode": True}
+_EVENTS = {"events_max_rate": 10.0}
+_GATE = {"motion_threshold": 2.0, "idle_after_misses": 15, "idle_probe_interval": 1.0, "result_cache_size": 256,
+         "features_use_z": False, "exercise_switch_frames": 5, "auto_exercise": False}
+PROFILES = {
+    "dev": dict(_CODEC, **_EVENTS, **_GATE, debug=True, log_level="DEBUG", draw=True, processed_frame=True, timings=True),
+    "prod": dict(_CODEC, **_EVENTS, **_GATE, debug=False, log_level="WARNING", draw=True, processed_frame=True, timings=False),
+    # bench always runs full inference so timings stay comparable
+    "bench": dict(_CODEC, **_EVENTS, **dict(_GATE, motion_threshold=0.0, idle_after_misses=0, result_cache_size=0),
+                  debug=False, log_level="WARNING", draw=False, processed_frame=False, timings=True),
+}
+DEFAULT_PROFILE = "prod"
+PROFILE_ENV_VAR = "SERVER_PROFILE"
+
+def get_profile(profile=None):
+    """Resolve a profile name (or dict) to its settings, defaulting to $SERVER_PROFILE or prod"""
+    if isinstance(profile, dict):
+        return profile
+    name = (profile or os.environ.get(PROFILE_ENV_VAR) or DEFAULT_PROFILE).lower()
+    if name not in PROFILES:
+        raise ValueError(f"Unknown server profile '{name}', expected one of {sorted(PROFILES)}")
+    return dict(PROFILES[name], name=name)
+
+def configure_logging(profile):
+    """Apply the profile's log level to the root logger"""
+    logging.basicConfig(format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+    logging.getLogger().setLevel(profile["log_level"])
@@ -0,0 +1,186 @@
+import logging
+import threading
+import time
+
+from model.angle_history import AngleHistory
+from model.exercise_detector import AUTO, ExerciseDetector
+from model.motion_gate import MotionGate
+from model.presence import PresenceMonitor
+from model.quality import create_detector, create_multi_detector, normalize_tier, DEFAULT_TIER
+from model.rep_counter import EXERCISES, RepCounter
+from model.templates import RepScorer
+from model.tracking import PoseTracker
+from server.admission import ClockOffset
+from utils.frame_buffers import FrameBuffers
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SESSION_ID = "default"
+# Exercise counted in "auto" mode until one is detected
+DEFAULT_EXERCISE = "pullup"
+
+class Session:
+    """Per-client analysis state: detector, rep counter(s) and quality tier"""
+
+    def __init__(self, session_id, exercise="pullup", tier=DEFAULT_TIER, motion_threshold=2.0,
+                 idle_after_misses=15, idle_probe_interval=1.0, exercise_switch_frames=5, auto_exercise=False):
+        self.session_id = session_id
+        # "auto" (or the auto_exercise profile setting): the server detects the exercise itself
+        self.auto_exercise = auto_exercise
+        self.auto = auto_exercise or exercise == AUTO
+        self.exercise = DEFAULT_EXERCISE if exercise == AUTO else exercise
+        # RepCounter and RepScorer per exercise, kept across switches so no count is lost
+        self.counters = {}
+        # The scorer rates each completed rep against the exercise's reference templates
+        self.rep_counter, self.rep_scorer = self._counters(self.exercise)
+        self.exercise_detector = ExerciseDetector()
+        # A different requested exercise must be asked for this many frames in a row before switching
+        self.exercise_switch_frames = exercise_switch_frames
+        self._requested = (None, 0)
+        # Multi-person mode: one track (with its own rep counter) per person in view
+        self.tracker = PoseTracker(self.exercise)
+        # Camera-invariant feature vector of the latest pose (model/features.py), None without one
+        self.features = None
+        # Last few seconds of the exercise angle, for tempo feedback
+        self.history = AngleHistory()
+        # Skips inference for frames where nothing moved
+        self.motion_gate = MotionGate(motion_threshold)
+        # Stops full inference while nobody is in view
+        self.presence = PresenceMonitor(idle_after_misses, idle_probe_interval)
+        self.multi_person = False
+        self.requested_tier = normalize_tier(tier)
+        self.tier = None
+        self.detector = None
+        self.last_seen = time.monotonic()
+        self.latest_ticket = 0  # newest frame admitted for this session
+        self.inferred = False  # whether the latest frame ran the detector (not reused, idle or cached)
+        # Client-to-server clock offset, so frame deadlines don't depend on the client's clock
+        self.clock = ClockOffset()
+        # Decode target reused frame after frame (frames are processed one at a time)
+        self.buffers = FrameBuffers()
+        # MediaPipe graphs are not thread-safe; one frame per session at a time
+        self.lock = threading.Lock()
+
+    def set_requested_tier(self, tier):
+        if tier is not None:
+            self.requested_tier = normalize_tier(tier, self.requested_tier)
+
+    def ensure_detector(self, tier, multi_person=False):
+        """Return a detector for the tier and mode, rebuilding it if either changed"""
+        if self.detector is None or tier != self.tier or multi_person != self.multi_person:
+            if self.detector is not None:
+                logger.info(f"🎚️ Session '{self.session_id}' quality {self.tier} -> {tier}"
+                            f"{' (multi-person)' if multi_person else ''}")
+                self.detector.close()
+                self.detector = None
+            self.detector = create_multi_detector(tier) if multi_person else create_detector(tier)
+            self.tier = tier
+            self.multi_person = multi_person
+        return self.detector
+
+    def _counters(self, exercise):
+        if exercise not in self.counters:
+            self.counters[exercise] = (RepCounter(exercise), RepScorer(exercise))
+        return self.counters[exercise]
+
+    def reset_counters(self):
+        for rep_counter, rep_scorer in self.counters.values():
+            rep_counter.reset()
+            rep_scorer.reset()
+        self.exercise_detector.reset()
+        self.tracker.reset()
+        self.history.clear()
+        self.motion_gate.reset()
+        self.presence.reset()
+        self.features = None
+
+    def update_exercise_type(self, exercise_type):
+        """Apply a request's exercise_type.
+
+        "auto" hands the choice to detect_exercise(). Otherwise a different
+        exercise only takes over once requested `exercise_switch_frames` times
+        in a row, so clients that disagree can't flip the counter every frame.
+        """
+        exercise_type = exercise_type.lower()
+        self.auto = self.auto_exercise or exercise_type == AUTO
+        if self.auto or exercise_type == self.exercise:
+            self._requested = (None, 0)
+            return
+        requested, frames = self._requested
+        frames = frames + 1 if requested == exercise_type else 1
+        self._requested = (exercise_type, frames)
+        if frames >= self.exercise_switch_frames:
+            self._requested = (None, 0)
+            self.switch_exercise(exercise_type)
+
+    def detect_exercise(self, pose, features, world=None):
+        """Auto mode, once per frame with a pose: update the exercise detector and, until
+        the exercise is settled, the counters of the other candidate exercises. `pose` is
+        the frame's compact landmark array (or a landmark list)"""
+        counters = {exercise: self._counters(exercise)[0] for exercise in EXERCISES}
+        exercise = self.exercise_detector.update(features, counters)
+        if exercise is not None and exercise != self.exercise:
+            self.switch_exercise(exercise)
+        if not self.exercise_detector.settled:
+            for exercise in EXERCISES:
+                rep_counter = self._counters(exercise)[0]
+                if rep_counter is not self.rep_counter:  # the pipeline updates the active one
+                    rep_counter.update(pose, world)
+
+    def switch_exercise(self, exercise):
+        """Make `exercise` the counted one, resuming its counter where it left off"""
+        old_exercise = self.exercise
+        self.exercise = exercise
+        self.rep_counter, self.rep_scorer = self._counters(exercise)
+        self.tracker.set_exercise(exercise)
+        self.history.clear()
+        self.motion_gate.reset()
+        self.presence.reset()
+        logger.info(f"🔄 Session '{self.session_id}' exercise '{old_exercise}' -> '{exercise}' "
+                    f"({self.rep_counter.count} reps so far)")
+
+    def close(self):
+        if self.detector is not None:
+            self.detector.close()
+            self.detector = None
+
+class SessionStore:
+    """Thread-safe registry of sessions, expiring ones idle for `ttl` seconds"""
+
+    def __init__(self, ttl=300.0, **session_options):
+        self.ttl = ttl
+        self.session_options = session_options  # passed to every new Session
+        self._sessions = {}
+        self._lock = threading.Lock()
+
+    def get(self, session_id=None, exercise="pullup", tier=None):
+        session_id = session_id or DEFAULT_SESSION_ID
+        with self._lock:
+            self._expire(time.monotonic())
+            session = self._sessions.get(session_id)
+            if session is None:
+                session = Session(session_id, exercise.lower(), tier or DEFAULT_TIER, **self.session_options)
+                self._sessions[session_id] = session
+            session.last_seen = time.monotonic()
+            return session
+
+    def find(self, session_id=None):
+        """Return an existing session without creating one"""
+        with self._lock:
+            return self._sessions.get(session_id or DEFAULT_SESSION_ID)
+
+    def _expire(self, now):
+        for session_id in [sid for sid, s in self._sessions.items() if now - s.last_seen > self.ttl]:
+            session = self._sessions[session_id]
+            # A session still analyzing a frame keeps its detector; it expires on a later pass
+            if not session.lock.acquire(blocking=False):
+                continue
+            try:
+                del self._sessions[session_id]
+                session.close()
+            finally:
+                session.lock.release()
+
+    def __len__(self):
+        with self._lock:
+            return len(self._sessions)
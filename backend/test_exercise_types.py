@@ -6,11 +6,14 @@ import requests
 import json
 import cv2
 import base64
+from utils.codec import get_codec
 
-def encode_frame_to_base64(frame):
+# Same upload codec and quality as the clients
+CODEC = get_codec()
+
+def encode_frame_to_base64(frame, quality=None):
     """Convert frame to base64 string for API transmission"""
-    _, buffer = cv2.imencode('.jpg', frame)
-    frame_base64 = base64.b64encode(buffer).decode('utf-8')
+    frame_base64 = base64.b64encode(CODEC.encode(frame, quality)).decode('utf-8')
     return frame_base64
 
 def test_exercise_switching():
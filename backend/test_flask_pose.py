@@ -9,11 +9,14 @@ import json
 import time
 import numpy as np
 from model.pose_detector import PoseDetector
+from utils.codec import get_codec
 
-def encode_frame_to_base64(frame):
+# Same upload codec and quality as the clients
+CODEC = get_codec()
+
+def encode_frame_to_base64(frame, quality=None):
     """Convert frame to base64 string for API transmission"""
-    _, buffer = cv2.imencode('.jpg', frame)
-    frame_base64 = base64.b64encode(buffer).decode('utf-8')
+    frame_base64 = base64.b64encode(CODEC.encode(frame, quality)).decode('utf-8')
     return frame_base64
 
 def decode_base64_to_frame(base64_string):
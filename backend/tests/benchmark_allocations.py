@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+Allocation benchmark for the per-frame detection path.
+
+Reports the heap allocated per frame (tracemalloc peak above the steady state,
+which covers NumPy/OpenCV arrays and the base64 bytes) for the old
+allocate-every-time path and the buffered path, plus how often the buffered
+path had to (re)allocate a buffer. Run from the backend directory:
+    python tests/benchmark_allocations.py
+"""
+import base64
+import os
+import sys
+import tracemalloc
+
+import cv2
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.codec import get_codec, decode_scaled
+from utils.frame_buffers import FrameBuffers
+
+RESOLUTIONS = [(480, 640), (720, 1280)]
+FRAMES = 100
+INFERENCE_WIDTH = 640
+
+def make_payload(height, width):
+    rng = np.random.default_rng(0)
+    frame = rng.integers(0, 255, (height, width, 3), dtype=np.uint8)
+    frame = cv2.GaussianBlur(frame, (9, 9), 0)
+    return base64.b64encode(cv2.imencode('.jpg', frame)[1]).decode('utf-8')
+
+def fresh_path(payload):
+    """Decode, resize and convert with a new array at every step"""
+    frame = cv2.imdecode(np.frombuffer(base64.b64decode(payload), dtype=np.uint8), cv2.IMREAD_COLOR)
+    height, width = frame.shape[:2]
+    if width > INFERENCE_WIDTH:
+        frame = cv2.resize(frame, (INFERENCE_WIDTH, height * INFERENCE_WIDTH // width), interpolation=cv2.INTER_AREA)
+    return cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+
+def make_buffered_path(codec, buffers):
+    def buffered_path(payload):
+        """Decode into a reused buffer at reduced scale, convert in place"""
+        frame = decode_scaled(codec, base64.b64decode(payload), INFERENCE_WIDTH, buffers)
+        height, width = frame.shape[:2]
+        if width > INFERENCE_WIDTH:
+            size = (INFERENCE_WIDTH, height * INFERENCE_WIDTH // width)
+            frame = cv2.resize(frame, size, dst=buffers.get("resized", (size[1], size[0], 3)),
+                               interpolation=cv2.INTER_AREA)
+        return cv2.cvtColor(frame, cv2.COLOR_BGR2RGB, dst=frame)
+    return buffered_path
+
+def measure(path, payload):
+    """Mean KB allocated on top of the steady state while processing one frame"""
+    path(payload)  # warm up: first-frame buffer allocations don't count
+    tracemalloc.start()
+    peaks = []
+    for _ in range(FRAMES):
+        tracemalloc.reset_peak()
+        base, _ = tracemalloc.get_traced_memory()
+        result = path(payload)
+        _, peak = tracemalloc.get_traced_memory()
+        peaks.append(peak - base)
+        del result
+    tracemalloc.stop()
+    return np.mean(peaks) / 1024
+
+def main():
+    codec = get_codec("auto")
+    print(f"=== Allocation benchmark ({FRAMES} frames, codec {codec.name}, inference width {INFERENCE_WIDTH}) ===")
+    print(f"{'path':<10} {'resolution':<11} {'KB allocated/frame':>19} {'buffer reallocations':>21}")
+    for height, width in RESOLUTIONS:
+        payload = make_payload(height, width)
+        buffers = FrameBuffers()
+        for name, path in [("fresh", fresh_path), ("buffered", make_buffered_path(codec, buffers))]:
+            allocated_kb = measure(path, payload)
+            reallocations = buffers.allocations if name == "buffered" else "-"
+            print(f"{name:<10} {width}x{height:<6} {allocated_kb:>19.1f} {reallocations:>21}")
+
+if __name__ == "__main__":
+    main()
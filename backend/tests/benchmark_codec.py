@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+"""
+Codec benchmark: decode + encode time per frame at common client resolutions.
+
+Compares OpenCV and libjpeg-turbo (simplejpeg, if installed) at full and
+reduced DCT-scale decode. Run from the backend directory:
+    python tests/benchmark_codec.py
+"""
+import os
+import sys
+import time
+
+import cv2
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.codec import CODECS, DEFAULT_QUALITY, simplejpeg
+
+RESOLUTIONS = [(480, 640), (720, 1280), (1080, 1920)]
+SCALES = [1, 2, 4]
+ITERATIONS = 50
+
+def make_frame(height, width):
+    """Smooth gradients plus noise, roughly as compressible as a webcam frame"""
+    rng = np.random.default_rng(0)
+    y, x = np.mgrid[0:height, 0:width]
+    frame = np.stack([(x * 255 // width), (y * 255 // height), ((x + y) * 255 // (width + height))], axis=-1)
+    frame = frame + rng.normal(0, 8, frame.shape)
+    cv2.circle(frame, (width // 2, height // 2), height // 4, (40, 200, 90), -1)
+    return np.clip(frame, 0, 255).astype(np.uint8)
+
+def time_per_frame(fn, iterations=ITERATIONS):
+    fn()  # warm up
+    started = time.perf_counter()
+    for _ in range(iterations):
+        fn()
+    return (time.perf_counter() - started) * 1000 / iterations
+
+def main():
+    codecs = [name for name in CODECS if name != "turbojpeg" or simplejpeg is not None]
+    if simplejpeg is None:
+        print("simplejpeg not installed - skipping turbojpeg codec")
+
+    print(f"=== Codec benchmark (quality {DEFAULT_QUALITY}, {ITERATIONS} iterations) ===")
+    print(f"{'codec':<10} {'resolution':<11} {'scale':>5} {'decoded':>10} {'decode ms':>10} {'encode ms':>10} {'total ms':>9} {'KB':>6}")
+    for height, width in RESOLUTIONS:
+        frame = make_frame(height, width)
+        for name in codecs:
+            codec = CODECS[name]()
+            data = codec.encode(frame)
+            encode_ms = time_per_frame(lambda: codec.encode(frame))
+            for scale in SCALES:
+                decoded = codec.decode(data, scale)
+                # Reuse one output buffer across iterations where the codec supports it
+                out = np.empty_like(decoded)
+                decode_ms = time_per_frame(lambda: codec.decode(data, scale, out))
+                print(f"{name:<10} {width}x{height:<6} {scale:>5} {decoded.shape[1]:>5}x{decoded.shape[0]:<4} "
+                      f"{decode_ms:>10.2f} {encode_ms:>10.2f} {decode_ms + encode_ms:>9.2f} {len(data) / 1024:>6.1f}")
+
+if __name__ == "__main__":
+    main()
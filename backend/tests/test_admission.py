@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+"""
+Admission control tests: deadlines are measured on the server's clock whatever
+the client's clock says, a newer frame supersedes a waiting one, the
+inference semaphore caps concurrent frames, and malformed requests get 400 from
+both servers. Run from the backend directory:
+    python tests/test_admission.py
+"""
+import os
+import sys
+import threading
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from server.admission import AdmissionController, ClockOffset, Rejected, frame_deadline_ms, now_ms
+from server.pipeline import AnalysisService
+from server.sessions import Session
+
+def status(controller, session, data, arrival_ms=None):
+    """HTTP status admission gives a frame (200 = admitted)"""
+    try:
+        with controller.admit(session, data, arrival_ms=arrival_ms):
+            return 200
+    except Rejected as e:
+        return e.status
+
+def test_clock_skew_is_ignored():
+    controller = AdmissionController(max_frame_age_ms=1000)
+    for skew_ms in (-5000, -1500, 0, 1500, 60000):
+        session = Session(f"skew{skew_ms}")
+        # Frames arrive 30-80 ms after capture, stamped by a clock `skew_ms` off the server's
+        statuses = []
+        for delay_ms in (50, 30, 80, 40):
+            arrival = now_ms()
+            statuses.append(status(controller, session, {"client_ts": arrival - delay_ms + skew_ms}, arrival))
+        assert statuses == [200] * 4, (skew_ms, statuses)
+    # A fresh session behind a 1.5 s slow clock passes the pre-decode check too
+    service = AnalysisService("bench")
+    assert service.precheck_frame({"frame": "x", "client_ts": now_ms() - 1500, "session_id": "new"}) is None
+    print("✅ Client clocks from 5 s behind to 60 s ahead of the server are never rejected as late")
+
+def test_late_frames_expire():
+    controller = AdmissionController(max_frame_age_ms=1000)
+    session = Session("late")
+    skew_ms = -1500
+    arrival = now_ms()
+    assert status(controller, session, {"client_ts": arrival - 40 + skew_ms}, arrival) == 200
+    # Captured 1.2 s before it arrived, compared with the 40 ms transit of the first frame
+    arrival = now_ms()
+    assert status(controller, session, {"client_ts": arrival - 1200 + skew_ms}, arrival) == 503
+    arrival = now_ms()
+    assert status(controller, session, {"client_ts": arrival + skew_ms, "deadline_ms": arrival + skew_ms - 100},
+                  arrival) == 503
+    assert status(controller, session, {}) == 200  # no timing: never expires
+    assert controller.stats()["expired"] == 2
+    print("✅ Frames delayed past max_frame_age_ms, or past their own deadline_ms, are rejected with 503")
+
+def test_clock_offset_window():
+    clock = ClockOffset(window=3)
+    for sample in (100, 40, 90):
+        clock.observe(sample)
+    assert clock.estimate() == 40 and clock.estimate(10) == 10 and clock.estimate() == 40
+    # The client's clock was stepped: after a window of frames the old minimum is gone
+    for sample in (500, 520, 510):
+        clock.observe(sample)
+    assert clock.estimate() == 500
+    assert frame_deadline_ms({"client_ts": 1000}, 1000, arrival_ms=5000, clock=clock) == 1000 + 500 + 1000
+    assert frame_deadline_ms({"client_ts": 1000}, 1000, arrival_ms=5000) == 6000
+    print("✅ The clock offset is the smallest recent transit and follows clock adjustments")
+
+def test_malformed_timing_is_400():
+    service = AnalysisService("bench")
+    for field, value in (("client_ts", "soon"), ("client_ts", True), ("deadline_ms", [1]), ("client_ts", "nan")):
+        body, code, _ = service.precheck_frame({"frame": "x", field: value})
+        assert code == 400 and field in body["error"], (field, value, code, body)
+        # The full handler (Flask, local transport) answers the same
+        assert service.analyze_frame({"frame": "x", field: value})[1] == 400
+    assert service.precheck_frame({"frame": "x", "client_ts": str(now_ms())}) is None
+    print("✅ Non-numeric client_ts / deadline_ms get 400 from the pre-decode check and the handler alike")
+
+def test_non_object_body_is_400():
+    from starlette.testclient import TestClient
+    import asgi_server
+    from server.factory import create_app
+    flask_client = create_app("bench", AnalysisService("bench")).test_client()
+    with TestClient(asgi_server.app) as asgi_client:
+        for body in ([1], "frame", 3):
+            for client in (flask_client, asgi_client):
+                response = client.post("/api/analyze-frame", json=body)
+                assert response.status_code == 400, (client, body, response.status_code)
+                error = (response.get_json() if hasattr(response, "get_json") else response.json())["error"]
+                assert "JSON object" in error
+    print("✅ JSON bodies that aren't objects get 400 from Flask and ASGI alike")
+
+def test_newest_frame_wins():
+    controller = AdmissionController(max_concurrent=1, max_wait_ms=2000)
+    session = Session("newest")
+    results = {}
+    in_frame, release = threading.Event(), threading.Event()
+
+    def first():
+        with controller.admit(session, {}):
+            in_frame.set()
+            release.wait(2)
+        results["first"] = 200
+
+    def frame(name):
+        results[name] = status(controller, session, {})
+
+    threads = [threading.Thread(target=first)]
+    threads[0].start()
+    in_frame.wait(2)
+    for name in ("second", "third"):
+        threads.append(threading.Thread(target=frame, args=(name,)))
+        threads[-1].start()
+        time.sleep(0.05)
+    release.set()
+    for thread in threads:
+        thread.join(3)
+    assert results == {"first": 200, "second": 429, "third": 200}, results
+    assert controller.stats()["superseded"] == 1
+    print("✅ A frame waiting behind its session is superseded (429) by a newer one")
+
+def test_inference_slots():
+    controller = AdmissionController(max_concurrent=2, max_waiting=1, max_wait_ms=100)
+    sessions = [Session(f"slot{i}") for i in range(4)]
+    holding, release = threading.Barrier(3), threading.Event()
+    peak, running, lock = [0], [0], threading.Lock()
+
+    def hold(session):
+        with controller.admit(session, {}):
+            with lock:
+                running[0] += 1
+                peak[0] = max(peak[0], running[0])
+            holding.wait(2)
+            release.wait(2)
+            with lock:
+                running[0] -= 1
+
+    holders = [threading.Thread(target=hold, args=(session,)) for session in sessions[:2]]
+    for thread in holders:
+        thread.start()
+    holding.wait(2)
+    # Both slots busy: the next frame waits its 100 ms budget and is refused
+    started = time.perf_counter()
+    assert status(controller, sessions[2], {}) == 503
+    assert time.perf_counter() - started >= 0.09
+    release.set()
+    for thread in holders:
+        thread.join(3)
+    assert peak[0] == 2 and status(controller, sessions[3], {}) == 200
+    stats = controller.stats()
+    assert stats["overloaded"] == 1 and stats["admitted"] == 3 and stats["waiting"] == 0
+    print("✅ At most max_concurrent frames run at once; a frame that can't get a slot in time gets 503")
+
+if __name__ == "__main__":
+    print("🧪 Testing admission control...\n")
+    test_clock_skew_is_ignored()
+    test_late_frames_expire()
+    test_clock_offset_window()
+    test_malformed_timing_is_400()
+    test_non_object_body_is_400()
+    test_newest_frame_wins()
+    test_inference_slots()
+    print("\n🎉 All admission control tests passed!")
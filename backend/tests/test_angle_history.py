@@ -0,0 +1,51 @@
+#!/usr/bin/env python3
+"""
+AngleHistory ring buffer tests. Run from the backend directory:
+    python tests/test_angle_history.py
+"""
+import os
+import sys
+
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from model.angle_history import AngleHistory
+from model.feedback_rules import check_tempo
+
+def test_window_wraps_in_order():
+    history = AngleHistory(seconds=1.25, max_fps=8)  # 10 slots
+    for i in range(25):
+        history.append(i / 8, float(i))
+    timestamps, values = history.window()
+    assert len(history) == 10
+    assert np.all(np.diff(timestamps) > 0)
+    assert values[:, 0].tolist() == list(range(15, 25)), values[:, 0]
+    _, recent = history.window(seconds=3 / 8)
+    assert recent[:, 0].tolist() == [21.0, 22.0, 23.0, 24.0]
+    print("✅ Window returns the newest samples, oldest first, after wrapping")
+
+def test_stats():
+    history = AngleHistory(seconds=2.0, max_fps=30)
+    t = np.arange(60) / 30
+    for ts, angle in zip(t, 90 + 60 * np.sin(2 * np.pi * t)):
+        history.append(ts, angle)
+    stats = history.channel_stats()
+    assert abs(stats["range"] - 120) < 1
+    # Peak speed of 60·sin(2πt) is 120π ≈ 377 °/s
+    assert 340 < stats["peak_velocity"] < 380, stats["peak_velocity"]
+    assert check_tempo("squat", stats) is not None
+    print(f"✅ Stats: range {stats['range']:.0f}°, peak velocity {stats['peak_velocity']:.0f}°/s -> tempo cue")
+
+def test_append_does_not_allocate():
+    history = AngleHistory()
+    before = (history.timestamps.ctypes.data, history.values.ctypes.data)
+    for i in range(5000):
+        history.append(i / 30, 1.0)
+    assert (history.timestamps.ctypes.data, history.values.ctypes.data) == before
+    print(f"✅ {len(history)} samples kept in fixed buffers")
+
+if __name__ == "__main__":
+    test_window_wraps_in_order()
+    test_stats()
+    test_append_does_not_allocate()
@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+"""
+Live-metrics fan-out tests (no server needed). Run from the backend directory:
+    python tests/test_broadcast.py
+"""
+import os
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from server.broadcast import MetricsBroadcaster, QueueSubscriber
+
+def drain(subscriber):
+    messages = []
+    while not subscriber._queue.empty():
+        messages.append(subscriber._queue.get_nowait())
+    return messages
+
+def test_coalesces_to_max_rate():
+    broadcaster = MetricsBroadcaster(max_rate=10)
+    viewers = [broadcaster.subscribe("s1", QueueSubscriber(queue_size=100)) for _ in range(3)]
+    for rep in range(60):  # 30 fps for 2 seconds
+        broadcaster.publish("s1", {"reps": rep, "stage": "up", "processed_frame": "..."})
+        time.sleep(1 / 30)
+    time.sleep(0.2)
+    received = [drain(viewer) for viewer in viewers]
+    # Every viewer gets the same bytes objects, at no more than ~10 per second
+    assert all(r == received[0] for r in received)
+    assert all(a is b for a, b in zip(received[0], received[1]))
+    assert 10 <= len(received[0]) <= 25, len(received[0])
+    assert b'"reps":59' in received[0][-1] and b"processed_frame" not in received[0][-1]
+    print(f"✅ 60 updates coalesced to {len(received[0])} messages, shared by {len(viewers)} viewers")
+
+def test_drops_slow_consumer():
+    broadcaster = MetricsBroadcaster(max_rate=100)
+    slow = broadcaster.subscribe("s2", QueueSubscriber(queue_size=2))
+    fast = broadcaster.subscribe("s2", QueueSubscriber(queue_size=100))
+    for rep in range(10):
+        broadcaster.publish("s2", {"reps": rep})
+        time.sleep(0.02)
+    time.sleep(0.05)
+    assert slow.closed and not fast.closed
+    assert broadcaster.stats()["observers"] == 1
+    assert len(drain(fast)) == 10
+    print(f"✅ Slow observer dropped, fast one unaffected: {broadcaster.stats()}")
+
+def test_unwatched_sessions_cost_nothing():
+    broadcaster = MetricsBroadcaster()
+    broadcaster.publish("nobody", {"reps": 1})
+    assert broadcaster.published == 0 and broadcaster._thread is None
+    print("✅ Sessions without observers are not collected")
+
+if __name__ == "__main__":
+    test_coalesces_to_max_rate()
+    test_drops_slow_consumer()
+    test_unwatched_sessions_cost_nothing()
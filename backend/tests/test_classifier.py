@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""
+Exercise / phase classifier tests: accuracy on held-out synthetic athletes,
+per-frame latency, and the training script's save / load round trip. Run
+from the backend directory:
+    python tests/test_classifier.py
+"""
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from model.classifier import PoseClassifier
+from model.features import frame_features
+from tools.train_classifier import collect, evaluate, session_examples
+from utils.recording import load_sessions, save_session
+
+# (shoulder angle, elbow bend, hip flexion, knee bend) in degrees at rest and at the peak of a rep
+MOVEMENTS = {
+    "pullup": ((170, 0, 0, 0), (60, 100, 0, 0)),
+    "squat": ((30, 0, 0, 0), (30, 0, 90, 110)),
+    "shoulderabduction": ((20, 0, 0, 0), (160, 0, 0, 0)),
+}
+
+def exercise_session(exercise, frames, seed=0):
+    """(frames, 33, 4) stick figure doing `exercise` with a random size, position, tempo and depth"""
+    rng = np.random.default_rng(seed)
+    rest, peak = (np.radians(v) for v in MOVEMENTS[exercise])
+    depth = rng.uniform(0.85, 1.1)
+    phase = (1 - np.cos(np.arange(frames) * 2 * np.pi / rng.uniform(25, 60))) / 2 * depth
+    alpha, beta, phi, kappa = (rest[:, None] + (peak - rest)[:, None] * phase).clip(0, np.pi)
+    scale, cx, cy = rng.uniform(0.6, 1.2), rng.uniform(0.35, 0.65), rng.uniform(0.45, 0.6)
+
+    poses = np.full((frames, 33, 4), np.nan)
+    poses[..., 2], poses[..., 3] = 0.0, 1.0
+    for side, (shoulder, elbow, wrist, hip, knee, ankle) in ((-1, (11, 13, 15, 23, 25, 27)), (1, (12, 14, 16, 24, 26, 28))):
+        poses[:, shoulder, 0], poses[:, shoulder, 1] = cx + side * 0.12 * scale, cy - 0.3 * scale
+        poses[:, hip, 0], poses[:, hip, 1] = cx + side * 0.08 * scale, cy
+        poses[:, elbow, :2] = poses[:, shoulder, :2] + 0.15 * scale * np.stack([side * np.sin(alpha), np.cos(alpha)], 1)
+        poses[:, wrist, :2] = poses[:, elbow, :2] + 0.14 * scale * np.stack([side * np.sin(alpha + beta), np.cos(alpha + beta)], 1)
+        poses[:, knee, :2] = poses[:, hip, :2] + 0.22 * scale * np.stack([np.sin(phi), np.cos(phi)], 1)
+        poses[:, ankle, :2] = poses[:, knee, :2] + 0.22 * scale * np.stack([np.sin(phi - kappa), np.cos(phi - kappa)], 1)
+    poses[..., :2] += rng.normal(0, 0.004, (frames, 33, 2))
+    return poses
+
+def make_sessions(directory, seeds, frames=300, frame_size=None):
+    """Sessions of every exercise; with a (width, height) frame size the figures are filmed by that
+    camera (x squeezed by the aspect ratio, as MediaPipe normalizes x by the width)"""
+    for exercise in MOVEMENTS:
+        for seed in seeds:
+            poses = exercise_session(exercise, frames, seed)
+            if frame_size is not None:
+                poses[..., 0] = 0.5 + (poses[..., 0] - 0.5) * frame_size[1] / frame_size[0]
+            save_session(os.path.join(directory, f"{exercise}_{seed}.npz"), poses, exercise, frame_size=frame_size)
+    return load_sessions(directory)
+
+def test_held_out_accuracy():
+    training = make_sessions(tempfile.mkdtemp(), range(6))
+    held_out = make_sessions(tempfile.mkdtemp(), range(100, 103))
+    classifier = PoseClassifier.train(*collect(training))
+    scores = evaluate(classifier, *collect(held_out))
+    assert scores["exercise_accuracy"] > 0.95, scores
+    # Frames between the two thresholds are told apart by their motion alone, which is noisy
+    assert scores["phase_accuracy"] > 0.85, scores
+    print(f"✅ Held-out accuracy: exercise {scores['exercise_accuracy']:.1%}, phase {scores['phase_accuracy']:.1%}")
+
+def test_widescreen_sessions():
+    size = (1280, 720)
+    training = make_sessions(tempfile.mkdtemp(), range(6), frame_size=size)
+    held_out = make_sessions(tempfile.mkdtemp(), range(100, 103), frame_size=size)
+    # Held-out features as the server computes them for a 1280x720 camera (aspect = width / height)
+    served = collect(held_out)
+    assert held_out[0]["frame_size"] == size
+    assert np.array_equal(session_examples(held_out[0])[0], session_examples(held_out[0], aspect=16 / 9)[0])
+    matched = evaluate(PoseClassifier.train(*collect(training)), *served)
+    # What training saw before frame sizes were recorded: aspect 1
+    squared = [dict(session, frame_size=None) for session in training]
+    mismatched = evaluate(PoseClassifier.train(*collect(squared)), *served)
+    assert matched["exercise_accuracy"] > 0.95, matched
+    print(f"✅ 16:9 sessions train on the recorded aspect: exercise {matched['exercise_accuracy']:.1%} "
+          f"(vs {mismatched['exercise_accuracy']:.1%} when training assumed square frames)")
+
+def test_per_frame_latency():
+    classifier = PoseClassifier.train(*collect(make_sessions(tempfile.mkdtemp(), range(2))), epochs=5)
+    features = [frame_features(pose) for pose in exercise_session("squat", 200, seed=7)]
+    started = time.perf_counter()
+    previous = None
+    for vector in features:
+        result = classifier.classify(vector, previous)
+        previous = vector
+    per_frame_us = (time.perf_counter() - started) / len(features) * 1e6
+    assert result["exercise"] in MOVEMENTS and 0 <= result["confidence"] <= 1
+    assert classifier.classify(np.full_like(features[0], np.nan)) is None
+    assert per_frame_us < 500, per_frame_us
+    print(f"✅ One frame classified in {per_frame_us:.1f} µs")
+
+def test_save_load():
+    directory = tempfile.mkdtemp()
+    classifier = PoseClassifier.train(*collect(make_sessions(directory, range(2))), epochs=5)
+    path = os.path.join(tempfile.mkdtemp(), "classifier.npz")
+    classifier.save(path)
+    loaded = PoseClassifier.load(path)
+    features, deltas, _, _ = session_examples(load_sessions(directory)[0])
+    original, loaded_result = classifier.classify_batch(features, deltas), loaded.classify_batch(features, deltas)
+    assert np.allclose(original[0], loaded_result[0]) and original[1] == loaded_result[1]
+    assert loaded.exercises == classifier.exercises and loaded.use_z == classifier.use_z
+
+    # A model whose inputs don't match its feature layout is refused at load, not on every frame
+    deep = PoseClassifier.train(*collect(load_sessions(directory), use_z=True), use_z=True, epochs=1)
+    deep.use_z = False
+    deep.save(path)
+    try:
+        PoseClassifier.load(path)
+        raise AssertionError("mismatched classifier loaded")
+    except ValueError as e:
+        assert "45 features" in str(e), e
+    print(f"✅ Saved and reloaded classifier gives identical predictions ({', '.join(loaded.exercises)}); "
+          f"mismatched feature layouts are refused")
+
+if __name__ == "__main__":
+    print("🧪 Testing pose classifier...\n")
+    test_held_out_accuracy()
+    test_widescreen_sessions()
+    test_per_frame_latency()
+    test_save_load()
+    print("\n🎉 All classifier tests passed!")
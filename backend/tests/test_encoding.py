@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Binary response encoding: round trips, and size / serialize / parse time against
+JSON. Run from the backend directory:
+    python tests/test_encoding.py
+"""
+import json
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from model.landmarks import SUBSET
+from model.rep_counter import EXERCISES
+from server.encoding import EXERCISE_CODES, decode_binary, encode_binary, to_json
+
+def sample_result(frame_bytes=20000):
+    rng = np.random.default_rng(0)
+    return {
+        "reps": 12,
+        "armpit_angle": 47.25,
+        "stage": "up",
+        "feedback": "Pull higher, arms not bending enough. | Body is swinging, keep stable.",
+        "has_pose": True,
+        "quality": "full",
+        "landmarks": rng.random((len(SUBSET), 4)),  # compact, as the pipeline sends them
+        "timings_ms": {"decode": 1.5, "inference": 14.25, "analysis": 0.5, "encode": 2.0},
+        "processed_frame": rng.integers(0, 255, frame_bytes, dtype=np.uint8).tobytes(),
+    }
+
+def rng_landmarks(count):
+    return np.random.default_rng(1).random((count, 4))
+
+def test_round_trip():
+    result = sample_result()
+    decoded = decode_binary(encode_binary(result))
+    for key in ("reps", "stage", "feedback", "has_pose", "quality", "processed_frame"):
+        assert decoded[key] == result[key], key
+    assert abs(decoded["armpit_angle"] - result["armpit_angle"]) < 1e-4
+    assert np.allclose(decoded["landmarks"], result["landmarks"], atol=1e-6)
+    assert decoded["landmark_indices"] == list(SUBSET)
+    assert [lm["name"] for lm in to_json(result)["pose_landmarks"]][:2] == ["left_shoulder", "right_shoulder"]
+    full = decode_binary(encode_binary(dict(result, landmarks=rng_landmarks(33))))
+    assert full["landmark_indices"] == list(range(33)) and full["landmarks"].shape == (33, 4)
+    assert decoded["timings_ms"].keys() == result["timings_ms"].keys()
+
+    # Messages outside the table and multi-person results survive too
+    people = {"has_pose": True, "quality": "lite", "people": [
+        {"track_id": 3, "reps": 300, "stage": "down", "armpit_angle": 150.0,
+         "feedback": "Something new | Squat form is good!", "center": [0.25, 0.5]}]}
+    decoded = decode_binary(encode_binary(people))
+    assert decoded["people"] == people["people"], decoded
+
+    # Auto mode: the detected exercise and the classifier's phase reach binary clients too
+    assert set(EXERCISES) <= set(EXERCISE_CODES)
+    assert "exercise" not in decode_binary(encode_binary(result))
+    for exercise in EXERCISES:
+        assert decode_binary(encode_binary(dict(result, exercise=exercise)))["exercise"] == exercise
+    for phase in ("up", "down"):
+        assert decode_binary(encode_binary(dict(result, exercise="squat", phase=phase)))["phase"] == phase
+    assert "phase" not in decode_binary(encode_binary(dict(result, exercise="squat")))
+    print("✅ Binary round trip preserves single- and multi-person results")
+
+def time_it(fn, iterations=2000):
+    started = time.perf_counter()
+    for _ in range(iterations):
+        fn()
+    return (time.perf_counter() - started) * 1e6 / iterations
+
+def benchmark():
+    print(f"{'payload':<28} {'JSON bytes':>10} {'binary':>7} {'JSON ser µs':>12} {'bin ser µs':>11} "
+          f"{'JSON parse µs':>14} {'bin parse µs':>13}")
+    for name, frame_bytes, keep_landmarks in [("counts only", 0, False), ("with landmarks", 0, True),
+                                              ("landmarks + 20 KB frame", 20000, True)]:
+        result = sample_result(frame_bytes)
+        if not frame_bytes:
+            del result["processed_frame"]
+        if not keep_landmarks:
+            del result["landmarks"]
+        text = json.dumps(to_json(result))
+        binary = encode_binary(result)
+        print(f"{name:<28} {len(text):>10} {len(binary):>7} "
+              f"{time_it(lambda: json.dumps(to_json(result))):>12.1f} {time_it(lambda: encode_binary(result)):>11.1f} "
+              f"{time_it(lambda: json.loads(text)):>14.1f} {time_it(lambda: decode_binary(binary)):>13.1f}")
+
+if __name__ == "__main__":
+    test_round_trip()
+    benchmark()
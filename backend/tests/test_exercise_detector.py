@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+"""
+Exercise switching tests: disagreeing clients don't flip the counter,
+switching back resumes the old count, and "auto" sessions detect the
+exercise without losing reps. Run from the backend directory:
+    python tests/test_exercise_detector.py
+"""
+import os
+import sys
+import tempfile
+
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from model.classifier import PoseClassifier
+from model.exercise_detector import ExerciseDetector
+from model.features import frame_features
+from model.replay import replay
+from server.pipeline import AnalysisService
+from server.sessions import Session
+from tests.test_classifier import exercise_session, make_sessions
+from tests.test_replay import as_landmarks
+from tools.train_classifier import collect
+
+def run(session, poses):
+    """Feed frames the way the pipeline does for a session with a pose"""
+    for pose in poses:
+        landmarks = as_landmarks(pose)
+        session.features = frame_features(pose)
+        if session.auto:
+            session.detect_exercise(landmarks, session.features)
+        session.rep_counter.update(landmarks)
+
+def test_requested_switch_hysteresis():
+    session = Session("mixed", "pullup", exercise_switch_frames=3)
+    counter = session.rep_counter
+    counter.count = 4
+    for exercise in ["squat", "pullup"] * 10:
+        session.update_exercise_type(exercise)
+    assert session.exercise == "pullup" and session.rep_counter is counter
+    for _ in range(3):
+        session.update_exercise_type("Squat")
+    assert session.exercise == "squat" and session.rep_counter.count == 0
+    for _ in range(3):
+        session.update_exercise_type("pullup")
+    assert session.rep_counter is counter and counter.count == 4
+    print("✅ Alternating clients never switched the counter; a deliberate switch back resumed at 4 reps")
+
+def test_auto_with_classifier():
+    classifier = PoseClassifier.train(*collect(make_sessions(tempfile.mkdtemp(), range(4))))
+    session = Session("auto", "auto")
+    session.exercise_detector = ExerciseDetector(classifier)
+    squats = exercise_session("squat", 400, seed=50)
+    run(session, squats)
+    assert session.exercise == "squat" and session.exercise_detector.settled
+    expected = int(replay(squats, "squat")["reps"][-1])
+    assert session.rep_counter.count == expected, (session.rep_counter.count, expected)
+
+    raises = exercise_session("shoulderabduction", 400, seed=51)
+    run(session, raises)
+    assert session.exercise == "shoulderabduction"
+    # Every rep of either exercise is counted, as if its counter had seen the whole stream
+    both = np.concatenate([squats, raises])
+    for exercise in ("squat", "shoulderabduction"):
+        assert session.counters[exercise][0].count == replay(both, exercise)["reps"][-1], exercise
+    print(f"✅ Auto mode confirmed squat with all {expected} reps kept, then followed the switch to "
+          f"shoulder abduction ({session.rep_counter.count} reps)")
+
+def test_phase_follows_the_movement():
+    classifier = PoseClassifier.train(*collect(make_sessions(tempfile.mkdtemp(), range(4))))
+    session = Session("auto-phase", "auto")
+    session.exercise_detector = ExerciseDetector(classifier)
+    agree = frames = 0
+    for pose in exercise_session("squat", 400, seed=52):
+        run(session, [pose])
+        if session.exercise == "squat" and session.rep_counter.stage:
+            frames += 1
+            agree += session.exercise_detector.phase == session.rep_counter.stage
+    assert agree / frames > 0.85, (agree, frames)
+    session.reset_counters()
+    assert session.exercise_detector.phase is None
+    print(f"✅ The classifier's per-frame phase matched the rep counter's stage on {agree / frames:.0%} of frames")
+
+def test_auto_without_classifier():
+    session = Session("auto-reps", "auto")
+    session.exercise_detector = ExerciseDetector(classifier=None)
+    raises = exercise_session("shoulderabduction", 300, seed=60)
+    run(session, raises)
+    expected = int(replay(raises, "shoulderabduction")["reps"][-1])
+    assert session.exercise == "shoulderabduction" and session.rep_counter.count == expected
+    print(f"✅ Without a classifier the candidate counters picked shoulder abduction ({expected} reps)")
+
+def test_shared_angle_without_classifier():
+    # Pull-ups and shoulder abduction count the same armpit angle in opposite directions
+    for seed in (4, 9, 10):
+        session = Session("auto-shared", "auto")
+        session.exercise_detector = ExerciseDetector(classifier=None)
+        pullups = exercise_session("pullup", 300, seed=seed)
+        run(session, pullups)
+        assert session.exercise == "pullup", (seed, session.exercise)
+        assert session.rep_counter.count == replay(pullups, "pullup")["reps"][-1]
+
+    # Confirmation is not final: a switch to squats is followed
+    squats = exercise_session("squat", 300, seed=62)
+    run(session, squats)
+    assert session.exercise == "squat", session.exercise
+    both = np.concatenate([pullups, squats])
+    assert session.rep_counter.count == replay(both, "squat")["reps"][-1]
+    print(f"✅ Without a classifier pull-ups were not taken for shoulder abduction, and the switch to "
+          f"squats was followed ({session.rep_counter.count} reps)")
+
+def test_features_follow_classifier_layout():
+    directory = tempfile.mkdtemp()
+    classifier = PoseClassifier.train(*collect(make_sessions(directory, range(2)), use_z=True), use_z=True, epochs=5)
+    service = AnalysisService("bench")  # features_use_z: False
+    session = service.sessions.get("layout", "auto")
+    session.exercise_detector = ExerciseDetector(classifier)
+    assert service._features_use_z(session)
+    for pose in exercise_session("squat", 40, seed=70):
+        # What the pipeline feeds the detector for this session
+        session.detect_exercise(as_landmarks(pose), frame_features(pose, service._features_use_z(session)))
+    session.update_exercise_type("squat")
+    assert not service._features_use_z(session)  # no longer auto: the profile's layout
+    print("✅ Auto sessions build features in their classifier's layout (3D here), whatever the profile says")
+
+def test_reset_keeps_session_usable():
+    session = Session("auto-reset", "auto")
+    session.exercise_detector = ExerciseDetector(classifier=None)
+    run(session, exercise_session("squat", 200, seed=61))
+    session.reset_counters()
+    assert session.exercise_detector.exercise is None
+    assert all(counter.count == 0 for counter, _ in session.counters.values())
+    print("✅ Reset clears every candidate counter and the detection")
+
+if __name__ == "__main__":
+    print("🧪 Testing exercise switching and detection...\n")
+    test_requested_switch_hysteresis()
+    test_auto_with_classifier()
+    test_phase_follows_the_movement()
+    test_auto_without_classifier()
+    test_shared_angle_without_classifier()
+    test_features_follow_classifier_layout()
+    test_reset_keeps_session_usable()
+    print("\n🎉 All exercise detection tests passed!")
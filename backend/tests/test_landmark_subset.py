@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+Landmark subset tests: compact arrays give the same angles, features, replay,
+streaming counts and feedback as full ones, and sessions are stored compact.
+Run from the backend directory:
+    python tests/test_landmark_subset.py
+"""
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from model.features import FEATURE_ANGLES, pose_features
+from model.feedback_rules import check_pullup_form, check_shoulder_abduction_form, check_squat_form
+from model.landmarks import (SUBSET, array_to_landmarks, compact, expand, landmarks_to_array, landmarks_to_subset,
+                             rows)
+from model.rep_counter import EXERCISES, RepCounter
+from model.replay import replay
+from tests.test_replay import as_landmarks, synthetic_session
+from utils.recording import load_session, save_session
+
+def mirror(joint):
+    """Left/right counterpart of a limb joint (MediaPipe pairs them as odd left, even right)"""
+    return joint - 1 if joint % 2 == 0 else joint + 1
+
+def test_subset_covers_exercises():
+    used = {j for config in EXERCISES.values() for j in config["joints"]}
+    used |= {j for triple in FEATURE_ANGLES.values() for j in triple}
+    assert used <= set(SUBSET) and {mirror(j) for j in SUBSET} == set(SUBSET)
+    print(f"✅ SUBSET ({len(SUBSET)} of 33 landmarks) holds every counted joint and its mirror")
+
+def test_compact_matches_full():
+    poses = synthetic_session(400, EXERCISES["pullup"]["joints"], missing=0.05)
+    small = compact(poses)
+    assert small.shape == (400, len(SUBSET), 4)
+    assert np.allclose(pose_features(small), pose_features(poses), equal_nan=True)
+    for exercise in EXERCISES:
+        full, sliced = replay(poses, exercise), replay(small, exercise)
+        assert list(full["stage"]) == list(sliced["stage"]) and np.allclose(full["angle"], sliced["angle"])
+    pose = poses[~np.isnan(poses[:, 0, 0])][0]
+    assert check_pullup_form(array_to_landmarks(compact(pose)), "up") == check_pullup_form(as_landmarks(pose), "up")
+    assert np.allclose(expand(compact(pose))[list(SUBSET)], pose[list(SUBSET)])
+    print("✅ Features, replay and form rules agree on compact and full arrays")
+
+def test_streaming_on_compact_arrays():
+    # What the server does per frame: count and check form on the compact array, not the 33-landmark list
+    poses = synthetic_session(400, EXERCISES["squat"]["joints"], missing=0.05)
+    rules = (check_pullup_form, check_squat_form, check_shoulder_abduction_form)
+    for exercise in EXERCISES:
+        from_list, from_array = RepCounter(exercise), RepCounter(exercise)
+        for pose in poses:
+            landmarks = None if np.isnan(pose[0, 0]) else as_landmarks(pose)
+            small = None if landmarks is None else landmarks_to_subset(landmarks)
+            assert from_list.update(landmarks) == from_array.update(small)
+            assert from_list.stage == from_array.stage
+            if landmarks is not None:
+                assert [rule(landmarks, from_list.stage) for rule in rules] == \
+                       [rule(small, from_array.stage) for rule in rules]
+        assert from_array.count == replay(poses, exercise)["reps"][-1]
+    print("✅ Streaming counts and form rules agree on compact arrays and landmark lists")
+
+def test_boundary_conversion():
+    landmarks = as_landmarks(synthetic_session(1, missing=0.0)[0])
+    assert np.allclose(landmarks_to_subset(landmarks), landmarks_to_array(landmarks)[list(SUBSET)])
+    assert np.isnan(landmarks_to_subset(None)).all()
+    iterations = 2000
+    started = time.perf_counter()
+    for _ in range(iterations):
+        landmarks_to_array(landmarks)
+    full_us = (time.perf_counter() - started) / iterations * 1e6
+    started = time.perf_counter()
+    for _ in range(iterations):
+        landmarks_to_subset(landmarks)
+    subset_us = (time.perf_counter() - started) / iterations * 1e6
+    print(f"✅ Detector output to array: {full_us:.1f} µs for 33 landmarks, {subset_us:.1f} µs for the subset")
+
+def test_joints_outside_subset_raise():
+    pose = synthetic_session(1, missing=0.0)[0]
+    assert list(rows(compact(pose), (12, 14, 16))) == [1, 3, 5] and list(rows(pose, (0, 12))) == [0, 12]
+    for joints in (0, (12, 14, 20), [[11, 13], [31, 32]]):
+        try:
+            rows(compact(pose), joints)
+        except KeyError as e:
+            assert "not in the compact landmark SUBSET" in str(e)
+        else:
+            raise AssertionError(f"{joints} read from a compact array")
+    print("✅ Reading a joint outside SUBSET from a compact array raises instead of returning another row")
+
+def test_sessions_stored_compact():
+    directory = tempfile.mkdtemp()
+    poses = synthetic_session(300)
+    save_session(os.path.join(directory, "new.npz"), poses, "squat")
+    stored = load_session(os.path.join(directory, "new.npz"))["poses"]
+    assert stored.shape == (300, len(SUBSET), 4)
+    # A session written before subsets (all 33 landmarks) replays the same
+    np.savez_compressed(os.path.join(directory, "old.npz"), poses=poses.astype(np.float32),
+                        timestamps=np.arange(300.0), exercise="squat", reps=-1)
+    legacy = load_session(os.path.join(directory, "old.npz"))["poses"]
+    assert legacy.shape == (300, 33, 4)
+    assert replay(stored, "squat")["reps"][-1] == replay(legacy, "squat")["reps"][-1]
+    sizes = [os.path.getsize(os.path.join(directory, name)) for name in ("old.npz", "new.npz")]
+    print(f"✅ Sessions stored compact: {sizes[0]} -> {sizes[1]} bytes for 300 frames; old files still replay")
+
+if __name__ == "__main__":
+    print("🧪 Testing landmark subsets...\n")
+    test_subset_covers_exercises()
+    test_compact_matches_full()
+    test_streaming_on_compact_arrays()
+    test_boundary_conversion()
+    test_joints_outside_subset_raise()
+    test_sessions_stored_compact()
+    print("\n🎉 All landmark subset tests passed!")
@@ -0,0 +1,52 @@
+#!/usr/bin/env python3
+"""
+Motion gate tests on synthetic frames. Run from the backend directory:
+    python tests/test_motion_gate.py
+"""
+import os
+import sys
+
+import cv2
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from model.motion_gate import MotionGate
+
+def scene(x, noise_seed=None):
+    """A grey room with a 'person' (bright box) at horizontal position x, plus sensor noise"""
+    frame = np.full((480, 640, 3), 90, dtype=np.uint8)
+    cv2.rectangle(frame, (x, 100), (x + 120, 420), (200, 180, 160), -1)
+    if noise_seed is not None:
+        noise = np.random.default_rng(noise_seed).integers(-6, 7, frame.shape)
+        frame = np.clip(frame.astype(np.int16) + noise, 0, 255).astype(np.uint8)
+    return frame
+
+def test_still_frames_reuse():
+    gate = MotionGate(threshold=2.0, max_reused=100)
+    assert not gate.still(scene(200, 0))
+    gate.update({"reps": 1})
+    hits = sum(gate.still(scene(200, seed)) for seed in range(1, 31))
+    assert hits == 30, hits
+    print(f"✅ Noisy still frames reuse the last result ({hits}/30, diff {gate.last_difference:.2f})")
+
+def test_motion_runs_inference():
+    gate = MotionGate(threshold=2.0)
+    gate.still(scene(200, 0))
+    gate.update({"reps": 1})
+    assert not gate.still(scene(240, 1))
+    print(f"✅ A 40 px move triggers inference (diff {gate.last_difference:.2f})")
+
+def test_refresh_and_key():
+    gate = MotionGate(threshold=2.0, max_reused=3)
+    gate.still(scene(200))
+    gate.update({"reps": 1}, key="a")
+    assert [gate.still(scene(200), key="a") for _ in range(4)] == [True, True, True, False]
+    assert not gate.still(scene(200), key="b")
+    assert not MotionGate(threshold=0).still(scene(200))
+    print("✅ Reuse is capped at max_reused, tied to the request variant, and off at threshold 0")
+
+if __name__ == "__main__":
+    test_still_frames_reuse()
+    test_motion_runs_inference()
+    test_refresh_and_key()
@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+Empty-scene fast path tests on synthetic frames. Run from the backend directory:
+    python tests/test_presence.py
+"""
+import os
+import sys
+import time
+
+import cv2
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from model.presence import PresenceMonitor
+from server.pipeline import AnalysisService
+from server.sessions import SessionStore
+
+NO_POSE = {"reps": 0, "has_pose": False, "feedback": "No pose detected"}
+
+def room(seed=0, person=False):
+    """An empty grey room with sensor noise; `person` adds a big bright block walking in"""
+    noise = np.random.default_rng(seed).integers(-6, 7, (480, 640, 3))
+    frame = np.clip(90 + noise, 0, 255).astype(np.uint8)
+    if person:
+        cv2.rectangle(frame, (200, 60), (440, 470), (220, 200, 180), -1)
+    return frame
+
+def test_goes_idle_after_misses():
+    presence = PresenceMonitor(miss_limit=5, probe_interval=60.0)
+    for _ in range(4):
+        presence.record(NO_POSE)
+    assert not presence.idle
+    presence.record(NO_POSE)
+    assert presence.idle and presence.idle_result is NO_POSE
+    presence.reset()
+    presence.record({"has_pose": True})
+    assert not presence.idle and presence.misses == 0
+    disabled = PresenceMonitor(miss_limit=0)
+    for _ in range(100):
+        disabled.record(NO_POSE)
+    assert not disabled.idle
+    print("✅ Sessions go idle after miss_limit empty frames (never with miss_limit 0)")
+
+def test_probe_schedule():
+    presence = PresenceMonitor(miss_limit=1, probe_interval=0.2)
+    presence.record(NO_POSE)
+    probes = [presence.should_probe(room(seed)) for seed in range(5)]
+    assert probes == [False] * 5, probes
+    assert presence.should_probe(room(5, person=True))
+    time.sleep(0.25)
+    assert presence.should_probe(room(6, person=True))
+    small = presence.probe_frame(room())
+    assert small.shape[1] == presence.probe_width and not presence.should_probe(room(7, person=True))
+    print(f"✅ Probes run on scene changes and every probe_interval, on {small.shape[1]}x{small.shape[0]} frames")
+
+def test_pipeline_skips_empty_scene():
+    # Motion gate off so every frame would otherwise run full inference
+    sessions = SessionStore(motion_threshold=0.0, idle_after_misses=3, idle_probe_interval=60.0)
+    service = AnalysisService(profile="bench", sessions=sessions)
+    session = sessions.get("empty-room", "pullup")
+    results = [service.analyze_session_frame(session, room(seed), "pullup", encode=False) for seed in range(20)]
+    idle = [bool(result.get("idle")) for result in results]
+    assert idle == [False] * 3 + [True] * 17, idle
+    assert results[-1]["feedback"] == "No pose detected"
+    stats = service.metrics()[0]["presence"]
+    assert stats["skipped"] == 17 and stats["wakeups"] == 0, stats
+    # A big scene change triggers a downscaled probe; a block is not a person, so it stays idle
+    result = service.analyze_session_frame(session, room(20, person=True), "pullup", encode=False)
+    assert result.get("idle") and service.presence_stats.probes == 1
+    session.reset_counters()
+    assert not session.presence.idle
+    print(f"✅ 17 of 20 empty frames skipped full inference, scene changes probe")
+
+if __name__ == "__main__":
+    test_goes_idle_after_misses()
+    test_probe_schedule()
+    test_pipeline_skips_empty_scene()
@@ -0,0 +1,174 @@
+#!/usr/bin/env python3
+"""
+Quality ceiling tests: the ceiling steps down one tier under load, waits out
+the cooldown, and only climbs back once p95 is well below the threshold; tiers
+whose pose model is missing are never used, and multi-person requests without
+a PoseLandmarker bundle get a 501.
+Run from the backend directory:
+    python tests/test_quality.py
+"""
+import base64
+import io
+import os
+import sys
+import tempfile
+import urllib.error
+from unittest import mock
+
+import cv2
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from model import quality
+from model.quality import QualityController, available_tiers
+from server.pipeline import AnalysisService
+
+class Clock:
+    """Stand-in for time.monotonic the test moves by hand"""
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+def feed(controller, latency_ms, frames):
+    for _ in range(frames):
+        controller.begin()
+        controller.end(latency_ms)
+
+def test_steps_one_tier_at_a_time():
+    clock = Clock()
+    controller = QualityController(p95_threshold_ms=100, cooldown=5.0, min_samples=10)
+    with mock.patch("model.quality.time.monotonic", clock):
+        feed(controller, 300, 10)
+        assert controller.ceiling == "full"
+        # Still slow, but inside the cooldown: no second step yet
+        feed(controller, 300, 10)
+        assert controller.ceiling == "full"
+        clock.now += 6
+        feed(controller, 300, 10)
+        assert controller.ceiling == "lite"
+        clock.now += 6
+        feed(controller, 300, 10)
+        assert controller.ceiling == "lite"  # nothing below lite
+    assert controller.effective_tier("heavy") == "lite" and controller.effective_tier("bogus") == "lite"
+    print("✅ Slow frames step the ceiling heavy -> full -> lite, one tier per cooldown")
+
+def test_recovery_hysteresis():
+    clock = Clock()
+    controller = QualityController(p95_threshold_ms=100, cooldown=5.0, min_samples=10, recover_ratio=0.5)
+    with mock.patch("model.quality.time.monotonic", clock):
+        feed(controller, 300, 10)
+        assert controller.ceiling == "full"
+        clock.now += 6
+        # Under the threshold but above threshold * recover_ratio: the ceiling holds
+        feed(controller, 80, 10)
+        assert controller.ceiling == "full", controller.stats()
+        clock.now += 6
+        # Once the 80 ms samples have left the window
+        feed(controller, 20, 250)
+        assert controller.ceiling == "heavy"
+    print("✅ The ceiling holds at 80 ms (threshold 100) and climbs back at 20 ms")
+
+def test_queue_depth_and_dropped_frames():
+    controller = QualityController(max_queue_depth=2, cooldown=0.0, min_samples=5)
+    feed(controller, 10, 5)
+    for _ in range(4):
+        controller.begin()
+    controller.end(None)  # a dropped frame adds no latency sample
+    assert controller.ceiling == "full" and controller.in_flight == 3
+    # Samples from the old tier are dropped with the change
+    assert controller.stats()["samples"] == 0
+    print("✅ A deep queue steps the ceiling down even with fast frames; dropped frames add no samples")
+
+def test_p95():
+    controller = QualityController()
+    assert controller.p95() == 0.0
+    for latency in range(1, 101):
+        controller.end(float(latency))
+    assert controller.p95() == 96.0
+    print(f"✅ p95 over 1..100 ms is {controller.p95():.0f} ms")
+
+def test_only_inference_latency_counts():
+    service = AnalysisService(profile="prod")
+    frame = np.full((240, 320, 3), 90, dtype=np.uint8)
+    payload = {"frame": base64.b64encode(cv2.imencode(".jpg", frame)[1]).decode("utf-8"),
+               "session_id": "latency", "exercise_type": "squat"}
+    service.analyze_frame(payload)
+    assert service.quality.stats()["samples"] == 1
+    session = service.sessions.find("latency")
+    # Still frames (motion gate), then repeated uploads with the gate off (result cache)
+    for _ in range(5):
+        assert service.analyze_frame(payload)[0]["reused"]
+    session.motion_gate.threshold = 0
+    for _ in range(5):
+        service.analyze_frame(payload)
+    assert service.result_cache.stats()["hits"] == 5
+    # Nobody in view for long enough: idle frames only probe
+    service.result_cache = None
+    for seed in range(40):
+        noisy = np.clip(frame + np.random.default_rng(seed).integers(-6, 7, frame.shape), 0, 255).astype(np.uint8)
+        service.analyze_frame(dict(payload, frame=base64.b64encode(cv2.imencode(".jpg", noisy)[1]).decode("utf-8")))
+    inferred = 41 - service.presence_stats.stats()["skipped"] - service.presence_stats.stats()["probes"]
+    assert session.presence.idle and service.quality.stats()["samples"] == inferred, service.metrics()[0]
+    print(f"✅ Only the {inferred} of 51 frames that ran the detector fed the p95 latency")
+
+def test_missing_models_are_skipped():
+    directory = tempfile.mkdtemp()
+    open(os.path.join(directory, "pose_landmark_full.tflite"), "wb").close()  # the bundled model
+    offline = mock.patch("urllib.request.urlopen", side_effect=urllib.error.URLError("offline"))
+    with mock.patch.object(quality, "POSE_MODEL_DIR", directory), mock.patch.object(quality, "_available_tiers", None):
+        with offline as urlopen:
+            assert available_tiers() == ["full"]
+            assert available_tiers() == ["full"] and urlopen.call_count == 2  # checked once per process
+        assert sorted(os.listdir(directory)) == ["pose_landmark_full.tflite"]  # nothing half-written
+
+        controller = QualityController(tiers=available_tiers(), cooldown=0.0, min_samples=5)
+        assert controller.ceiling == "full"
+        assert [controller.effective_tier(t) for t in ("lite", "full", "heavy")] == ["full"] * 3
+        feed(controller, 500.0, 10)
+        assert controller.ceiling == "full"  # nothing to drop to
+
+        # A model that can be fetched is installed at startup
+        quality._available_tiers = None
+        with mock.patch("urllib.request.urlopen", side_effect=lambda *args, **kwargs: io.BytesIO(b"model")):
+            assert available_tiers() == ["lite", "full", "heavy"]
+        assert os.path.getsize(os.path.join(directory, "pose_landmark_heavy.tflite")) == 5
+
+    controller = QualityController(tiers=["lite", "full"])
+    assert controller.effective_tier("heavy") == "full" and controller.effective_tier("lite") == "lite"
+    print("✅ Tiers without their pose model are dropped at startup instead of downloading mid-request")
+
+def test_missing_landmarker_is_501():
+    directory = tempfile.mkdtemp()
+    frame = base64.b64encode(cv2.imencode(".jpg", np.zeros((48, 64, 3), dtype=np.uint8))[1]).decode("utf-8")
+    payload = {"frame": frame, "session_id": "group", "multi_person": True}
+    with mock.patch.object(quality, "LANDMARKER_DIR", directory):
+        service = AnalysisService(profile="prod")
+        assert service.multi_person_tiers == []
+        body, status, _ = service.analyze_frame(payload)
+        assert status == 501 and body["error"] == "Multi-person model not installed", body
+        assert service.sessions.find("group") is None  # refused before a session or detector is made
+        assert service.analyze_frame(dict(payload, multi_person=False))[1] == 200
+
+        # One bundle installed: every tier runs on it
+        open(os.path.join(directory, "pose_landmarker_lite.task"), "wb").close()
+        assert AnalysisService(profile="prod").multi_person_tiers == ["lite"]
+        with mock.patch.object(quality, "MultiPoseDetector") as detector:
+            quality.create_multi_detector("heavy")
+        assert detector.call_args.kwargs["model_path"] == os.path.join(directory, "pose_landmarker_lite.task")
+        assert detector.call_args.kwargs["input_width"] is None  # still the heavy tier's input size
+    print("✅ Multi-person frames without a landmarker bundle get a 501, not a 500 per frame")
+
+if __name__ == "__main__":
+    print("🧪 Testing quality tiers...\n")
+    test_steps_one_tier_at_a_time()
+    test_recovery_hysteresis()
+    test_queue_depth_and_dropped_frames()
+    test_p95()
+    test_only_inference_latency_counts()
+    test_missing_models_are_skipped()
+    test_missing_landmarker_is_501()
+    print("\n🎉 All quality tier tests passed!")
@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+Checks that the vectorized replay matches the streaming RepCounter frame for
+frame, and times both. Run from the backend directory:
+    python tests/test_replay.py
+"""
+import os
+import sys
+import time
+from types import SimpleNamespace
+
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from model.rep_counter import EXERCISES, RepCounter
+from model.replay import replay
+
+def synthetic_session(frames, joints=EXERCISES["squat"]["joints"], seed=0, missing=0.05):
+    """Jittery poses whose tracked joint angle swings between ~20° and ~180°,
+    with some frames dropped (no pose)"""
+    rng = np.random.default_rng(seed)
+    poses = 0.5 + rng.normal(0, 0.01, (frames, 33, 4))
+    poses[..., 3] = 1.0
+    a, b, c = joints
+    period = rng.uniform(20, 60)
+    theta = np.radians(100 + 80 * np.sin(np.arange(frames) * 2 * np.pi / period) + rng.normal(0, 8, frames))
+    poses[:, a, :2] = poses[:, b, :2] + 0.2 * np.stack([np.ones(frames), np.zeros(frames)], axis=1)
+    poses[:, c, :2] = poses[:, b, :2] + 0.2 * np.stack([np.cos(theta), np.sin(theta)], axis=1)
+    poses[rng.random(frames) < missing] = np.nan
+    return poses
+
+def as_landmarks(pose):
+    if np.isnan(pose).all():
+        return None
+    return [SimpleNamespace(x=x, y=y, z=z, visibility=v) for x, y, z, v in pose.tolist()]
+
+def stream(frames, exercise):
+    counter = RepCounter(exercise)
+    stages, reps, angles = [], [], []
+    for landmarks in frames:
+        count, angle = counter.update(landmarks)
+        stages.append(counter.stage)
+        reps.append(count)
+        angles.append(angle)
+    return stages, reps, angles
+
+def test_matches_streaming():
+    for exercise in EXERCISES:
+        for seed in range(5):
+            poses = synthetic_session(2000, EXERCISES[exercise]["joints"], seed)
+            stages, reps, angles = stream([as_landmarks(pose) for pose in poses], exercise)
+            result = replay(poses, exercise)
+            assert list(result["stage"]) == stages, exercise
+            assert result["reps"].tolist() == reps, exercise
+            assert np.allclose(result["angle"], angles), exercise
+        print(f"✅ {exercise}: replay matches streaming ({reps[-1]} reps in the last session)")
+
+def test_overlapping_thresholds():
+    # Enter and exit on the same frame still counts, as in RepCounter
+    config = dict(EXERCISES["squat"], enter=("<", 170), exit=(">", 100))
+    poses = synthetic_session(2000, seed=7)
+    EXERCISES["_overlap"] = config
+    try:
+        stages, reps, _ = stream([as_landmarks(pose) for pose in poses], "_overlap")
+    finally:
+        del EXERCISES["_overlap"]
+    result = replay(poses, "squat", config)
+    assert list(result["stage"]) == stages and result["reps"].tolist() == reps
+    print("✅ Overlapping thresholds match streaming")
+
+def benchmark(frames=20000):
+    poses = synthetic_session(frames)
+    landmarks = [as_landmarks(pose) for pose in poses]
+    replay(poses, "squat")  # warm up
+    started = time.perf_counter()
+    stream(landmarks, "squat")
+    streaming = time.perf_counter() - started
+    started = time.perf_counter()
+    for _ in range(10):
+        replay(poses, "squat")
+    vectorized = (time.perf_counter() - started) / 10
+    print(f"⏱️ {frames} frames: streaming {streaming * 1000:.1f} ms, replay {vectorized * 1000:.2f} ms "
+          f"({streaming / vectorized:.0f}x)")
+
+if __name__ == "__main__":
+    test_matches_streaming()
+    test_overlapping_thresholds()
+    benchmark()
@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+"""
+Result cache tests: LRU eviction, disk cache eviction, and repeated uploads
+skipping inference. Run from the backend directory:
+    python tests/test_result_cache.py
+"""
+import base64
+import os
+import sys
+import tempfile
+import time
+
+import cv2
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from server.pipeline import AnalysisService
+from utils.result_cache import DiskCache, LRUCache, content_key
+
+def test_lru_eviction():
+    cache = LRUCache(max_entries=2)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    assert cache.get("a") == 1  # "b" is now the least recently used
+    cache.put("c", 3)
+    assert cache.get("b") is None and cache.get("a") == 1 and cache.get("c") == 3
+    assert cache.stats() == {"entries": 2, "hits": 3, "misses": 1, "evictions": 1, "hit_rate": 0.75}
+    assert content_key("frame") == content_key(b"frame") != content_key("frame", "squat")
+    print("✅ LRU keeps recently used entries and counts hits, misses and evictions")
+
+def test_disk_eviction():
+    directory = tempfile.mkdtemp()
+    cache = DiskCache(directory, max_bytes=2500)
+    save = lambda payload: (lambda path: np.savez(path, data=payload))
+    load = lambda path: np.load(path)["data"]
+    for i, key in enumerate(("old", "used", "new")):
+        cache.put(key, save(np.full(100, i)))
+        time.sleep(0.02)
+    assert cache.get("missing", load) is None
+    assert cache.get("used", load)[0] == 1  # refreshes its access time
+    time.sleep(0.02)
+    cache.put("newest", save(np.full(100, 3)))
+    assert cache.get("old", load) is None and cache.get("used", load) is not None
+    assert cache.evictions >= 1 and not any(".partial" in name for name in os.listdir(directory))
+    print(f"✅ Disk cache stays under its size limit, evicting the least recently used ({cache.stats()})")
+
+def test_repeated_upload_skips_inference():
+    service = AnalysisService(profile="prod")
+    frame = np.full((240, 320, 3), 90, dtype=np.uint8)
+    payload = {"frame": base64.b64encode(cv2.imencode(".jpg", frame)[1]).decode("utf-8"),
+               "session_id": "cache-test", "exercise_type": "squat"}
+    service.analyze_frame(payload)
+    session = service.sessions.find("cache-test")
+    session.motion_gate.threshold = 0  # compare with the cache alone
+    calls = []
+    detect = session.detector.detect_pose
+    session.detector.detect_pose = lambda *a, **k: calls.append(1) or detect(*a, **k)
+    for _ in range(5):
+        body, status, _ = service.analyze_frame(payload)
+        assert status == 200 and body["feedback"] == "No pose detected"
+    assert calls == [], calls
+    stats = service.metrics()[0]["result_cache"]
+    assert stats["hits"] == 5 and stats["misses"] == 1, stats
+    print(f"✅ 5 repeated uploads reused the detector output ({stats})")
+
+if __name__ == "__main__":
+    test_lru_eviction()
+    test_disk_eviction()
+    test_repeated_upload_skips_inference()
@@ -0,0 +1,41 @@
+#!/usr/bin/env python3
+"""
+Session store tests: idle sessions expire and release their detector, but
+never while a frame is still being analyzed. Run from the backend directory:
+    python tests/test_sessions.py
+"""
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from server.sessions import SessionStore
+
+class FakeDetector:
+    def __init__(self):
+        self.closed = False
+
+    def close(self):
+        self.closed = True
+
+def test_expiry_closes_detectors():
+    store = SessionStore(ttl=60.0)
+    idle, busy = store.get("idle"), store.get("busy")
+    for session in (idle, busy):
+        session.detector = FakeDetector()
+        session.last_seen -= 120
+    detectors = (idle.detector, busy.detector)
+    busy.lock.acquire()
+    store.get("other")
+    assert store.find("idle") is None and detectors[0].closed
+    # Mid-frame: kept, detector untouched
+    assert store.find("busy") is busy and not detectors[1].closed
+    busy.lock.release()
+    store.get("other")  # the frame finished without a newer one: now it expires
+    assert store.find("busy") is None and detectors[1].closed
+    print("✅ Expired sessions close their detector; a busy one waits for its frame to finish")
+
+if __name__ == "__main__":
+    print("🧪 Testing session store...\n")
+    test_expiry_closes_detectors()
+    print("\n🎉 All session store tests passed!")
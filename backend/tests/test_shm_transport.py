@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+Shared-memory transport tests: frames round-trip through the ring, the socket
+and key file are owner-only, a wrong key is refused without stopping the
+server, and TCP addresses are rejected. Run from the backend directory:
+    python tests/test_shm_transport.py
+"""
+import os
+import stat
+import sys
+import tempfile
+from multiprocessing import AuthenticationError
+from multiprocessing.connection import Client
+
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.shm_transport import FrameRing, LocalFrameClient, LocalFrameServer, key_path, parse_address
+
+class FakeService:
+    """Stands in for AnalysisService: counts frames and 'draws' into the slot"""
+
+    def __init__(self):
+        self.frames = 0
+
+    def analyze_frame(self, data, frame=None):
+        self.frames += 1
+        frame[0, 0] = 255
+        return {"reps": self.frames, "mean": float(frame[1:].mean())}, 200, {}
+
+def socket_address():
+    return os.path.join(tempfile.mkdtemp(), "transport.sock")
+
+def test_ring_round_trip():
+    ring = FrameRing.create(2, 48, 64)
+    try:
+        frame = np.random.default_rng(0).integers(0, 255, (40, 64, 3), dtype=np.uint8)
+        slot = ring.write(3, frame)
+        view, seq = ring.view(slot)
+        assert slot == 1 and seq == 3 and np.array_equal(view, frame)
+        try:
+            ring.write(4, np.zeros((60, 64, 3), np.uint8))
+            raise AssertionError("oversized frame accepted")
+        except ValueError:
+            pass
+    finally:
+        ring.close()
+    print("✅ Frames round-trip through the shared-memory ring; oversized frames are refused")
+
+def test_analyze_over_socket():
+    address = socket_address()
+    server = LocalFrameServer(FakeService(), address).start()
+    client = LocalFrameClient(address)
+    try:
+        frame = np.full((48, 64, 3), 7, np.uint8)
+        for expected in (1, 2):
+            reply, annotated = client.analyze(frame, exercise_type="squat")
+            assert reply["reps"] == expected and reply["mean"] == 7.0, reply
+            assert annotated[0, 0, 0] == 255 and frame[0, 0, 0] == 7  # drawn into the slot, not the capture
+    finally:
+        client.close()
+        server.close()
+    assert not os.path.exists(address) and not os.path.exists(key_path(address))
+    print("✅ Frames analyzed over the local socket; socket and key file removed on close")
+
+def test_owner_only_and_random_key():
+    address = socket_address()
+    server = LocalFrameServer(FakeService(), address).start()
+    try:
+        for path in (address, key_path(address)):
+            assert stat.S_IMODE(os.stat(path).st_mode) & 0o077 == 0, (path, oct(os.stat(path).st_mode))
+        with open(key_path(address), "rb") as f:
+            key = f.read()
+        assert len(key) == 32 and key != b"formfeedback-local"
+        try:
+            Client(address, authkey=b"formfeedback-local")
+            raise AssertionError("wrong key accepted")
+        except AuthenticationError:
+            pass
+        # The refused handshake did not stop the server
+        client = LocalFrameClient(address)
+        reply, _ = client.analyze(np.zeros((8, 8, 3), np.uint8))
+        assert reply["reps"] == 1
+        client.close()
+    finally:
+        server.close()
+    other = LocalFrameServer(FakeService(), address)
+    with open(key_path(address), "rb") as f:
+        assert f.read() != key  # a new key every run
+    other.close()
+    print("✅ Socket and key file are owner-only, keys are random per run, wrong keys are refused")
+
+def test_tcp_refused():
+    for address in ("localhost:5001", "0.0.0.0:5001", ("127.0.0.1", 5001)):
+        try:
+            parse_address(address)
+            raise AssertionError(f"{address} accepted")
+        except ValueError:
+            pass
+    print("✅ TCP addresses are refused")
+
+if __name__ == "__main__":
+    print("🧪 Testing the shared-memory transport...\n")
+    test_ring_round_trip()
+    test_analyze_over_socket()
+    test_owner_only_and_random_key()
+    test_tcp_refused()
+    print("\n🎉 All shared-memory transport tests passed!")
@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+"""
+Rep template scoring tests: banded DTW against a plain loop, scores that
+separate clean and shallow reps, rest between reps left out of the score, and
+per-rep latency. Run from the backend directory:
+    python tests/test_templates.py
+"""
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from model.rep_counter import EXERCISES, RepCounter
+from model.replay import hysteresis
+from model.templates import RepScorer, TemplateStore, band_dtw, reference_sweep, resample, trim_rest
+from tests.test_replay import as_landmarks, synthetic_session
+from tools.build_templates import most_typical, split_reps
+from utils.recording import load_sessions, save_session
+
+def loop_dtw(a, b, width):
+    """Textbook banded DTW, for checking the vectorized one"""
+    n = len(a)
+    cost = np.full((n + 1, n + 1), np.inf)
+    cost[0, 0] = 0.0
+    for i in range(n):
+        for j in range(max(0, i - width), min(n, i + width + 1)):
+            cost[i + 1, j + 1] = abs(a[i] - b[j]) + min(cost[i, j], cost[i, j + 1], cost[i + 1, j])
+    return cost[n, n] / n
+
+def rep(rest, peak, frames, seed=0):
+    """One noisy rep of `frames` samples with an uneven tempo"""
+    t = np.linspace(0, 1, frames) ** 1.3
+    noise = np.random.default_rng(seed).normal(0, 3, frames)
+    return rest + (peak - rest) * (1 - np.cos(2 * np.pi * t)) / 2 + noise
+
+def test_matches_loop():
+    rng = np.random.default_rng(0)
+    series = resample(rep(170, 90, 50))
+    templates = np.stack([reference_sweep(170, 85), reference_sweep(160, 120), rng.uniform(60, 170, 64)])
+    for band in (0.05, 0.15, 0.5):
+        width = max(1, int(round(band * 64)))
+        expected = [loop_dtw(series, t, width) for t in templates]
+        assert np.allclose(band_dtw(series, templates, band), expected)
+    print("✅ Vectorized banded DTW matches the loop version for 3 band widths")
+
+def test_scores_separate_form():
+    scorer = RepScorer("squat")
+    clean = [scorer.score(rep(170, 85, frames, seed)) for seed, frames in enumerate((25, 40, 70))]
+    shallow = [scorer.score(rep(170, 135, frames, seed)) for seed, frames in enumerate((25, 40, 70))]
+    assert min(clean) > 80 and max(shallow) < 50, (clean, shallow)
+    started = time.perf_counter()
+    for _ in range(100):
+        scorer.score(rep(170, 85, 300))
+    per_rep = (time.perf_counter() - started) * 10
+    assert per_rep < scorer.budget_ms, per_rep
+    print(f"✅ Clean reps score {min(clean):.0f}-{max(clean):.0f}, shallow ones {min(shallow):.0f}-{max(shallow):.0f}, "
+          f"{per_rep:.2f} ms per rep")
+
+def test_scored_on_completed_reps():
+    counter, scorer = RepCounter("squat"), RepScorer("squat")
+    poses = synthetic_session(600, missing=0.0)
+    scores = []
+    for pose in poses:
+        reps, angle = counter.update(as_landmarks(pose))
+        score = scorer.update(reps, angle)
+        if reps and (not scores or scores[-1][0] != reps):
+            scores.append((reps, score))
+    assert counter.count >= 5 and len(scores) == counter.count
+    assert all(score is None or 0 <= score <= 100 for _, score in scores)
+    print(f"✅ {counter.count} reps scored as they completed: {[s for _, s in scores]}")
+
+def scored_reps(series, exercise="squat"):
+    """Score of each rep as the scorer reports it when the count goes up"""
+    scorer, scores = RepScorer(exercise), []
+    _, counts = hysteresis(series, EXERCISES[exercise])
+    for count, angle in zip(counts, series):
+        score = scorer.update(count, angle)
+        if count > len(scores):
+            scores.append(score)
+    return scores
+
+def test_rest_between_reps_is_trimmed():
+    rng = np.random.default_rng(5)
+    reps = [rep(170, 85, 40, seed) for seed in range(5)]
+    def session(pause):
+        rests = [170 + rng.normal(0, 2, pause) for _ in reps]
+        return np.concatenate([part for pair in zip(rests, reps) for part in pair] + [[170.0]])
+    back_to_back, paused = scored_reps(session(0)), scored_reps(session(90))
+    assert len(paused) == 5 and np.allclose(paused, back_to_back), (paused, back_to_back)
+    assert min(paused) > 80
+    # The kept part starts at the last frame above the exit threshold (160) before going under 120
+    angles = np.concatenate([np.full(50, 170.0), [175.0, 150.0, 110.0, 90.0, 130.0, 170.0]])
+    assert trim_rest(angles, EXERCISES["squat"]).tolist() == [175.0, 150.0, 110.0, 90.0, 130.0, 170.0]
+    assert len(trim_rest(np.full(20, 170.0), EXERCISES["squat"])) == 20
+    print(f"✅ Reps after 3 s rests score as back-to-back ones: {paused}")
+
+def test_long_rest_is_bounded():
+    scorer = RepScorer("squat", max_samples=200)
+    for _ in range(5000):
+        scorer.update(0, 170.0)  # standing around before the first rep
+    assert len(scorer.angles) == 200
+    for angle in rep(170, 85, 40):
+        scorer.update(0, angle)
+    assert scorer.update(1, 170.0) is None  # rest + rep is not one rep
+    for angle in rep(170, 85, 40, seed=1):
+        scorer.update(1, angle)
+    assert scorer.update(2, 170.0) > 80 and len(scorer.angles) == 1
+    print("✅ A long rest stays within the scorer's 200-sample buffer and doesn't skew the next rep's score")
+
+def test_build_templates():
+    directory = tempfile.mkdtemp()
+    for seed in range(3):
+        save_session(os.path.join(directory, f"squat_{seed}.npz"), synthetic_session(400, seed=seed, missing=0.0), "squat")
+    reps = [r for session in load_sessions(directory) for r in split_reps(session)]
+    chosen = most_typical([resample(r) for r in reps], 2)
+    store = TemplateStore()
+    for trajectory in chosen:
+        store.add("squat", trajectory)
+    path = os.path.join(directory, "templates.npz")
+    store.save(path)
+    loaded = TemplateStore()
+    loaded.load(path)
+    assert loaded.get("squat").shape == (2, 64) and loaded.get("pullup").shape == (1, 64)
+    print(f"✅ Built 2 squat templates from {len(reps)} recorded reps; other exercises keep the built-in one")
+
+if __name__ == "__main__":
+    test_matches_loop()
+    test_scores_separate_form()
+    test_scored_on_completed_reps()
+    test_rest_between_reps_is_trimmed()
+    test_long_rest_is_bounded()
+    test_build_templates()
@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""
+Track-ID tests for multi-person mode, on synthetic poses (no camera or model needed).
+Run from the backend directory:
+    python tests/test_tracking.py
+"""
+import os
+import sys
+from types import SimpleNamespace
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from model.tracking import PoseTracker
+
+def make_pose(x, knee_angle_bent=False):
+    """33 landmarks of a standing person centred at x (normalized coordinates)"""
+    points = [SimpleNamespace(x=x, y=0.5, z=0.0, visibility=1.0) for _ in range(33)]
+    for i, (dx, y) in {0: (0, 0.15), 11: (-0.04, 0.3), 12: (0.04, 0.3), 23: (-0.03, 0.5), 24: (0.03, 0.5),
+                       26: (0.03, 0.7), 28: (0.03, 0.9)}.items():
+        points[i] = SimpleNamespace(x=x + dx, y=y, z=0.0, visibility=1.0)
+    if knee_angle_bent:
+        points[26] = SimpleNamespace(x=x + 0.15, y=0.6, z=0.0, visibility=1.0)
+    return points
+
+def test_ids_follow_people():
+    tracker = PoseTracker("squat")
+    first = tracker.update([make_pose(0.2), make_pose(0.7)])
+    ids = [track.track_id for track, _ in first]
+    # Same people, listed in the opposite order and slightly moved
+    second = tracker.update([make_pose(0.72), make_pose(0.21)])
+    assert [track.track_id for track, _ in second] == ids[::-1]
+    print("✅ Track IDs follow people regardless of detection order")
+
+def test_occlusion_keeps_track():
+    tracker = PoseTracker("squat", max_missed=3)
+    (track, _), = tracker.update([make_pose(0.5)])
+    for _ in range(3):
+        tracker.update([])
+    (again, _), = tracker.update([make_pose(0.5)])
+    assert again is track
+    for _ in range(4):
+        tracker.update([])
+    (new, _), = tracker.update([make_pose(0.5)])
+    assert new.track_id != track.track_id
+    print("✅ Briefly hidden people keep their track; long-gone ones are dropped")
+
+def test_independent_counters():
+    tracker = PoseTracker("squat")
+    # Person at 0.2 squats twice, person at 0.7 stays standing
+    for bent in [False, True, False, True, False]:
+        for track, landmarks in tracker.update([make_pose(0.2, bent), make_pose(0.7)]):
+            track.rep_counter.update(landmarks)
+    reps = {track.track_id: track.rep_counter.reps for track in tracker.tracks.values()}
+    assert reps == {1: 2, 2: 0}, reps
+    print(f"✅ Rep counters are per person: {reps}")
+
+def test_switch_keeps_counts():
+    tracker = PoseTracker("squat")
+    for bent in [False, True, False, True, False]:
+        for track, landmarks in tracker.update([make_pose(0.2, bent)]):
+            track.rep_counter.update(landmarks)
+    # An exercise switch (e.g. auto mode trying another candidate) and back keeps each person's count
+    tracker.set_exercise("pullup")
+    track = tracker.tracks[1]
+    assert track.rep_counter.exercise == "pullup" and track.rep_counter.reps == 0
+    tracker.set_exercise("squat")
+    assert track.rep_counter.reps == 2 and track.counters["squat"] is track.rep_counter
+    print("✅ Switching exercise and back resumes each person's count")
+
+if __name__ == "__main__":
+    test_ids_follow_people()
+    test_occlusion_keeps_track()
+    test_independent_counters()
+    test_switch_keeps_counts()
@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+3D world-landmark angle tests: a squat filmed from the front is invisible to
+the image-plane angle but counted on world landmarks, streaming and replay
+agree, and sessions keep their world array. Run from the backend directory:
+    python tests/test_world_angles.py
+"""
+import os
+import sys
+import tempfile
+
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from model.feedback_rules import check_squat_form, rule_angles
+from model.landmarks import array_to_landmarks, compact
+from model.rep_counter import EXERCISES, RepCounter
+from model.replay import replay
+from utils.recording import load_session, save_session
+
+WORLD_SQUAT = dict(EXERCISES["squat"], world=True)
+
+def frontal_squat(frames=300, reps=5):
+    """(image landmarks, world landmarks) of squats facing the camera: the knees travel
+    toward the camera, so in the image the legs stay straight lines"""
+    depth = (1 - np.cos(np.linspace(0, 2 * np.pi * reps, frames))) / 2
+    hip_flexion, knee_bend = np.radians(80) * depth, np.radians(110) * depth
+    world = np.zeros((frames, 33, 4))
+    world[..., 3] = 1.0
+    for side, (shoulder, hip, knee, ankle) in ((-1, (11, 23, 25, 27)), (1, (12, 24, 26, 28))):
+        world[:, shoulder, :2] = (0.18 * side, -0.5)
+        world[:, hip, 0] = 0.1 * side
+        thigh = np.stack([np.zeros(frames), np.cos(hip_flexion), -np.sin(hip_flexion)], 1)
+        shin = np.stack([np.zeros(frames), np.cos(hip_flexion - knee_bend), -np.sin(hip_flexion - knee_bend)], 1)
+        world[:, knee, :3] = world[:, hip, :3] + 0.45 * thigh
+        world[:, ankle, :3] = world[:, knee, :3] + 0.45 * shin
+    image = world.copy()
+    image[..., :3] = world[..., :3] * 0.4 + [0.5, 0.5, 0.0]
+    return image, world
+
+def test_frontal_squat_counted_in_3d():
+    image, world = frontal_squat()
+    flat, deep = RepCounter("squat"), RepCounter("squat")
+    deep.config = WORLD_SQUAT
+    streamed = []
+    for pose, world_pose in zip(image, world):
+        flat.update(array_to_landmarks(pose), world_pose)  # 2D exercise: world is ignored
+        streamed.append(deep.update(array_to_landmarks(pose), world_pose)[1])
+    assert flat.count == 0 and deep.count == 5, (flat.count, deep.count)
+
+    replayed = replay(image, "squat", WORLD_SQUAT, world)
+    assert replayed["reps"][-1] == 5 and np.allclose(replayed["angle"], streamed)
+    assert replay(image, "squat", WORLD_SQUAT)["reps"][-1] == 0  # no world array: 2D fallback
+    print(f"✅ Frontal squat: 2D counter {flat.count} reps, 3D counter {deep.count}, "
+          f"knee angle down to {min(streamed):.0f}°; replay matches streaming")
+
+def test_rules_use_world_angles():
+    image, world = frontal_squat()
+    bottom = int(np.argmin(replay(image, "squat", WORLD_SQUAT, world)["angle"]))
+    landmarks = array_to_landmarks(image[bottom])
+    knee_2d, = rule_angles(landmarks, [(24, 26, 28)])
+    knee_3d, = rule_angles(landmarks, [(24, 26, 28)], world[bottom])
+    assert knee_2d > 175 and knee_3d < 80, (knee_2d, knee_3d)
+    assert "Go deeper" in check_squat_form(landmarks, "down")
+    assert "Go deeper" not in check_squat_form(landmarks, "down", world[bottom])
+    print(f"✅ Rules at the bottom of the squat: knee {knee_2d:.0f}° in the image, {knee_3d:.0f}° in 3D")
+
+def test_session_keeps_world():
+    image, world = frontal_squat(60, 1)
+    path = os.path.join(tempfile.mkdtemp(), "squat.npz")
+    save_session(path, image, "squat", 1, world=world)
+    assert np.allclose(load_session(path)["world"], compact(world))
+    save_session(path, image, "squat", 1)
+    assert load_session(path)["world"] is None
+    print("✅ Sessions round-trip their world landmarks (None when not recorded)")
+
+if __name__ == "__main__":
+    print("🧪 Testing 3D world-landmark angles...\n")
+    test_frontal_squat_counted_in_3d()
+    test_rules_use_world_angles()
+    test_session_keeps_world()
+    print("\n🎉 All world-landmark angle tests passed!")
@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+"""
+Build rep templates for form scoring (model/templates.py) from recorded sessions.
+
+Every session is replayed with the vectorized counter (model/replay.py) and
+cut into reps at the frames where the count goes up, without the rest before
+each one (model/templates.trim_rest). For each exercise the
+reps most similar to all the others (smallest mean band-DTW distance) are
+kept as templates, so one odd rep in the archive doesn't become the reference.
+
+    python tools/build_templates.py sessions/ -o model/templates.npz
+    REP_TEMPLATES=model/templates.npz python flask_server.py
+"""
+import argparse
+import os
+import sys
+
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from model.rep_counter import EXERCISES
+from model.replay import replay
+from model.templates import MIN_REP_SAMPLES, TemplateStore, band_dtw, resample, trim_rest
+from utils.recording import load_sessions
+
+def split_reps(session):
+    """Angle series of each completed rep in a session"""
+    counted = replay(session["poses"], session["exercise"], world=session.get("world"))
+    angles = np.where(counted["angle"] > 0, counted["angle"], np.nan)
+    ends = np.flatnonzero(np.diff(counted["reps"])) + 1
+    starts = np.concatenate(([0], ends[:-1]))
+    config = EXERCISES[session["exercise"]]
+    reps = (trim_rest(angles[start:end + 1], config) for start, end in zip(starts, ends))
+    return [r for r in reps if len(r) >= MIN_REP_SAMPLES]
+
+def most_typical(trajectories, count):
+    """The `count` trajectories with the smallest mean DTW distance to all the others"""
+    stacked = np.stack(trajectories)
+    distances = np.stack([band_dtw(t, stacked) for t in stacked])
+    return stacked[np.argsort(distances.mean(axis=1))[:count]]
+
+def main():
+    parser = argparse.ArgumentParser(description="Build rep templates from recorded sessions")
+    parser.add_argument("sessions", help="directory of recorded .npz sessions")
+    parser.add_argument("--exercise", default=None, help="only build templates for this exercise")
+    parser.add_argument("--per-exercise", type=int, default=3, help="templates kept per exercise (default 3)")
+    parser.add_argument("-o", "--output", required=True)
+    args = parser.parse_args()
+
+    reps = {}
+    for session in load_sessions(args.sessions, args.exercise):
+        if session["exercise"] in EXERCISES:
+            reps.setdefault(session["exercise"], []).extend(split_reps(session))
+
+    store = TemplateStore()
+    for exercise, exercise_reps in sorted(reps.items()):
+        trajectories = [t for t in (resample(r) for r in exercise_reps) if t is not None]
+        if not trajectories:
+            continue
+        for trajectory in most_typical(trajectories, args.per_exercise):
+            store.add(exercise, trajectory)
+        print(f"📐 {exercise}: {min(args.per_exercise, len(trajectories))} templates from {len(trajectories)} reps")
+    if not reps:
+        print(f"❌ No reps found in {args.sessions}")
+        return 1
+    store.save(args.output)
+    print(f"💾 Wrote templates to {args.output} (load with REP_TEMPLATES={args.output})")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
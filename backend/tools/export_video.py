@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+"""
+Render a recorded session as an annotated video: skeleton, rep count, stage,
+angle and form feedback over the source footage.
+
+Landmarks come from the session file (tools/record_session.py), so nothing is
+re-detected; reps and stages come from the vectorized replay (model/replay.py).
+The video is split into time chunks that worker processes render in parallel,
+each streaming frames from its own reader (utils/video_io.py) into its own
+segment file, and the segments are then joined into the output. Only a few
+frames per worker are ever in memory.
+
+    python tools/record_session.py squat_01.mp4 --exercise squat -o sessions/squat_01.npz
+    python tools/export_video.py squat_01.mp4 sessions/squat_01.npz -o squat_01_annotated.mp4
+"""
+import argparse
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import cv2
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from model.landmarks import array_to_landmarks
+from model.replay import replay
+from server.pipeline import get_exercise_feedback
+from utils.draw_pose import SkeletonRenderer
+from utils.recording import load_session
+from utils.video_io import chunk_ranges, probe, read_frames
+
+# Container -> codec OpenCV can write without extra libraries
+FOURCC = {".mp4": "mp4v", ".avi": "MJPG", ".mov": "mp4v"}
+
+# Set in each worker process so the session arrays are sent once, not per chunk
+_source = None
+_track = None
+_renderer = SkeletonRenderer()
+
+def _init_worker(source, track):
+    global _source, _track
+    _source, _track = source, track
+
+def session_track(session):
+    """Per-sample overlay data for a recorded session: poses plus replayed reps/stage/angle"""
+    counted = replay(session["poses"], session["exercise"], world=session.get("world"))
+    return {"exercise": session["exercise"], "timestamps": session["timestamps"], "poses": session["poses"],
+            "reps": counted["reps"], "stage": counted["stage"], "angle": counted["angle"]}
+
+def sample_at(timestamps, timestamp):
+    """Index of the latest session sample at or before `timestamp`, or -1 before the first"""
+    return int(np.searchsorted(timestamps, timestamp + 1e-6, side="right")) - 1
+
+def draw_overlay(frame, pose, reps, stage, angle, feedback):
+    """Skeleton and text overlay, in place (same layout as app.py)"""
+    _renderer.draw(frame, pose)
+    cv2.putText(frame, f"Reps: {reps}", (10, 30), cv2.FONT_HERSHEY_SIMPLEX, 1, (0, 255, 0), 2)
+    cv2.putText(frame, f"Stage: {stage or '-'}  Angle: {angle:.1f}", (10, 60),
+                cv2.FONT_HERSHEY_SIMPLEX, 0.6, (255, 0, 0), 2)
+    for i, line in enumerate((feedback or "").split(" | ")):
+        cv2.putText(frame, line, (10, 90 + 25 * i), cv2.FONT_HERSHEY_SIMPLEX, 0.6, (0, 0, 255), 2)
+    return frame
+
+def open_writer(path, fps, size):
+    fourcc = FOURCC.get(os.path.splitext(path)[1].lower(), "mp4v")
+    writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*fourcc), fps, size)
+    if not writer.isOpened():
+        raise IOError(f"Could not open {path} for writing")
+    return writer
+
+def render_chunk(task):
+    """Render frames [start, end) of the source into `path`; returns the number of frames written"""
+    start, end, path, fps, size = task
+    track = _track
+    writer = open_writer(path, fps, size)
+    written, last_sample, feedback = 0, None, None
+    for _, timestamp, frame in read_frames(_source, start, end):
+        sample = sample_at(track["timestamps"], timestamp)
+        if sample < 0:
+            writer.write(frame)
+            written += 1
+            continue
+        pose, stage = track["poses"][sample], track["stage"][sample]
+        if sample != last_sample:
+            # Decimated recordings hold one sample for several frames: check the rules once per sample
+            landmarks = array_to_landmarks(pose)
+            feedback = get_exercise_feedback(landmarks, stage, track["exercise"]) if landmarks else "No pose detected"
+            last_sample = sample
+        writer.write(draw_overlay(frame, pose, int(track["reps"][sample]), stage, track["angle"][sample], feedback))
+        written += 1
+    writer.release()
+    return written
+
+def concat_segments(segments, output, fps, size):
+    """Join the rendered segments into `output`: stream copy with ffmpeg when it is installed,
+    otherwise re-encode them one frame at a time"""
+    ffmpeg = shutil.which("ffmpeg")
+    if ffmpeg:
+        listing = os.path.join(os.path.dirname(segments[0]), "segments.txt")
+        with open(listing, "w") as f:
+            f.writelines(f"file '{os.path.abspath(path)}'\n" for path in segments)
+        subprocess.run([ffmpeg, "-y", "-loglevel", "error", "-f", "concat", "-safe", "0", "-i", listing,
+                        "-c", "copy", output], check=True)
+        return
+    writer = open_writer(output, fps, size)
+    for path in segments:
+        for _, _, frame in read_frames(path):
+            writer.write(frame)
+    writer.release()
+
+def export(source, session, output, workers=1, chunks=None):
+    """Render `session` over `source` into `output`; returns the number of frames written"""
+    info = probe(source)
+    size = (info["width"], info["height"])
+    track = session_track(session)
+    ranges = chunk_ranges(info, chunks=chunks or workers)
+    if len(ranges) == 1:
+        _init_worker(source, track)
+        return render_chunk((*ranges[0], output, info["fps"], size))
+
+    with tempfile.TemporaryDirectory(dir=os.path.dirname(os.path.abspath(output))) as scratch:
+        ext = os.path.splitext(output)[1] or ".mp4"
+        tasks = [(start, end, os.path.join(scratch, f"segment_{i:04d}{ext}"), info["fps"], size)
+                 for i, (start, end) in enumerate(ranges)]
+        with ProcessPoolExecutor(workers, initializer=_init_worker, initargs=(source, track)) as pool:
+            written = sum(pool.map(render_chunk, tasks))
+        concat_segments([task[2] for task in tasks], output, info["fps"], size)
+    return written
+
+def main():
+    parser = argparse.ArgumentParser(description="Render a recorded session as an annotated video")
+    parser.add_argument("source", help="the video the session was recorded from")
+    parser.add_argument("session", help="recorded .npz session (tools/record_session.py)")
+    parser.add_argument("-o", "--output", required=True, help="output video (.mp4 or .avi)")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    args = parser.parse_args()
+
+    session = load_session(args.session)
+    started = time.perf_counter()
+    frames = export(args.source, session, args.output, args.workers)
+    elapsed = time.perf_counter() - started
+    duration = probe(args.source)["duration"]
+    print(f"🎬 Wrote {frames} frames to {args.output} in {elapsed:.1f}s "
+          f"({duration / elapsed:.1f}x real time, {args.workers} workers)")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""
+Record the landmarks of a video (or webcam) into a session file for replay and tuning.
+
+    python tools/record_session.py squat_01.mp4 --exercise squat --reps 12 -o sessions/squat_01.npz
+
+With --cache DIR (or RESULT_CACHE_DIR) the landmarks of a video file are kept
+by content hash, so recording the same file with the same settings again
+skips detection.
+"""
+import argparse
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from model.landmarks import landmarks_to_subset
+from model.pose_detector import PoseDetector
+from utils.recording import load_session, save_session
+from utils.result_cache import DiskCache, file_key
+from utils.video_io import is_camera, read_frames
+
+# Detector settings for recordings (part of the cache key)
+DETECTOR_OPTIONS = {"model_complexity": 1, "smooth_landmarks": True}
+
+def record(source, detector, start=0.0, end=None, target_fps=None):
+    """(poses, world landmarks, timestamps, (width, height)) for the frames of a video file or camera index"""
+    poses, world, timestamps, frame_size = [], [], [], None
+    # Video files: frame time; live cameras: wall clock
+    for _, timestamp, frame in read_frames(source, start, end, target_fps=target_fps):
+        frame_size = frame_size or (frame.shape[1], frame.shape[0])
+        _, landmarks = detector.detect_pose(frame, draw=False)
+        poses.append(landmarks_to_subset(landmarks.landmark if landmarks else None))
+        world.append(landmarks_to_subset(detector.world_landmarks.landmark if detector.world_landmarks else None))
+        timestamps.append(timestamp)
+    return poses, world, timestamps, frame_size
+
+def main():
+    parser = argparse.ArgumentParser(description="Record pose landmarks from a video into a .npz session")
+    parser.add_argument("source", help="video file or camera index")
+    parser.add_argument("--exercise", required=True)
+    parser.add_argument("--reps", type=int, default=None, help="ground-truth rep count (needed for tuning)")
+    parser.add_argument("--start", type=float, default=0.0, help="seconds into the video to start at")
+    parser.add_argument("--end", type=float, default=None, help="seconds into the video to stop at")
+    parser.add_argument("--fps", type=float, default=None, help="decimate to at most this frame rate")
+    parser.add_argument("--cache", default=os.environ.get("RESULT_CACHE_DIR"),
+                        help="directory for cached analyses of video files")
+    parser.add_argument("--cache-size", type=float, default=2.0, help="cache size limit in GB (default 2)")
+    parser.add_argument("-o", "--output", required=True)
+    args = parser.parse_args()
+
+    cache = key = cached = None
+    if args.cache and not is_camera(args.source):
+        cache = DiskCache(args.cache, int(args.cache_size * (1 << 30)))
+        key = file_key(args.source, args.exercise.lower(), args.start, args.end, args.fps,
+                       sorted(DETECTOR_OPTIONS.items()))
+        cached = cache.get(key, load_session)
+    if cached:
+        poses, world, timestamps, frame_size = (cached["poses"], cached["world"], cached["timestamps"],
+                                                cached["frame_size"])
+        print(f"♻️ Reusing cached analysis of {args.source}")
+    else:
+        detector = PoseDetector(**DETECTOR_OPTIONS)
+        poses, world, timestamps, frame_size = record(args.source, detector, args.start, args.end, args.fps)
+        detector.close()
+        if cache:
+            cache.put(key, lambda path: save_session(path, poses, args.exercise.lower(), None, timestamps, world,
+                                                     frame_size))
+    save_session(args.output, poses, args.exercise.lower(), args.reps, timestamps, world, frame_size)
+    print(f"💾 Saved {len(poses)} frames of {args.exercise} to {args.output}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+Train the exercise / phase classifier (model/classifier.py) on recorded sessions.
+
+Every frame with a pose is one example: its features (model/features.py)
+and their change since the previous frame, the session's exercise and, as
+the phase, the stage the vectorized counter (model/replay.py) is in on that
+frame. Every k-th session is held out for evaluation, so the reported
+accuracy is on people and takes the model has not seen. Features use each
+session's recorded frame aspect ratio, as the server does; --aspect covers
+sessions recorded before frame sizes were saved.
+
+    python tools/train_classifier.py sessions/ -o model/classifier.npz
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from model.classifier import NO_PHASE, PoseClassifier, motion
+from model.features import pose_features
+from model.rep_counter import EXERCISES
+from model.replay import replay
+from utils.recording import load_sessions, session_aspect
+
+def session_examples(session, use_z=False, aspect=1.0):
+    """(features, motion, exercise labels, phase labels) of a session's frames with a pose;
+    `aspect` is used when the session has no recorded frame size"""
+    features = pose_features(session["poses"], use_z, session_aspect(session, aspect))
+    keep = ~np.isnan(features).any(axis=1)
+    stages = replay(session["poses"], session["exercise"], world=session.get("world"))["stage"][keep]
+    phases = [NO_PHASE if stage is None else stage for stage in stages]
+    return features[keep], motion(features)[keep], [session["exercise"]] * len(phases), phases
+
+def collect(sessions, use_z=False, aspect=1.0):
+    examples = [session_examples(session, use_z, aspect) for session in sessions]
+    return (np.concatenate([e[0] for e in examples]), np.concatenate([e[1] for e in examples]),
+            [exercise for e in examples for exercise in e[2]], [phase for e in examples for phase in e[3]])
+
+def evaluate(classifier, features, deltas, exercises, phases):
+    """Exercise and phase accuracy plus the exercise confusion counts {(true, predicted): frames}"""
+    probabilities, predicted_phases = classifier.classify_batch(features, deltas)
+    predicted = np.array(classifier.exercises)[probabilities.argmax(axis=1)]
+    exercises, phases = np.array(exercises), np.array(phases)
+    confusion = {}
+    for truth, guess in zip(exercises, predicted):
+        confusion[(truth, guess)] = confusion.get((truth, guess), 0) + 1
+    return {
+        "exercise_accuracy": float((predicted == exercises).mean()),
+        "phase_accuracy": float((np.array(predicted_phases) == phases).mean()),
+        "confusion": confusion,
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Train the exercise / phase classifier on recorded sessions")
+    parser.add_argument("sessions", help="directory of recorded .npz sessions")
+    parser.add_argument("--holdout", type=int, default=5, help="hold out every k-th session for evaluation (default 5)")
+    parser.add_argument("--hidden", type=int, default=32, help="hidden units per network (default 32)")
+    parser.add_argument("--epochs", type=int, default=40)
+    parser.add_argument("--use-z", action="store_true", help="include MediaPipe z in the features")
+    parser.add_argument("--aspect", type=float, default=1.0,
+                        help="frame width / height of sessions without a recorded frame size (e.g. 1.78 for 16:9)")
+    parser.add_argument("-o", "--output", required=True)
+    args = parser.parse_args()
+
+    sessions = [s for s in load_sessions(args.sessions) if s["exercise"] in EXERCISES]
+    if not sessions:
+        print(f"❌ No sessions for known exercises in {args.sessions}")
+        return 1
+    held_out = sessions[args.holdout - 1::args.holdout] if len(sessions) >= args.holdout else []
+    training = [s for s in sessions if not any(s is h for h in held_out)]
+    unsized = sum(s.get("frame_size") is None for s in sessions)
+    if unsized:
+        print(f"⚠️ {unsized} sessions have no recorded frame size; assuming width / height = {args.aspect:.2f} "
+              f"(--aspect), which must match the camera the server will see")
+    examples = collect(training, args.use_z, args.aspect)
+    print(f"📂 {len(training)} training sessions ({len(examples[0])} frames), {len(held_out)} held out")
+
+    started = time.perf_counter()
+    classifier = PoseClassifier.train(*examples, hidden=args.hidden, use_z=args.use_z, epochs=args.epochs)
+    print(f"🧠 Trained in {time.perf_counter() - started:.1f}s")
+
+    if held_out:
+        test = collect(held_out, args.use_z, args.aspect)
+        started = time.perf_counter()
+        scores = evaluate(classifier, *test)
+        per_frame_us = (time.perf_counter() - started) / max(1, len(test[0])) * 1e6
+        print(f"📊 Held out: exercise {scores['exercise_accuracy']:.1%}, phase {scores['phase_accuracy']:.1%} "
+              f"({per_frame_us:.2f} µs/frame batched)")
+        for (truth, guess), frames in sorted(scores["confusion"].items()):
+            if truth != guess:
+                print(f"   {truth} taken for {guess}: {frames} frames")
+    classifier.save(args.output)
+    print(f"💾 Wrote classifier to {args.output}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+"""
+Tune the rep-counting thresholds in model/rep_counter.py against labeled sessions.
+
+Every session in the archive (see utils/recording.py, tools/record_session.py)
+carries its true rep count. For each exercise this sweeps a grid of enter/exit
+thresholds around the current ones, replays every session with the vectorized
+counter (model/replay.py) in parallel across cores, and reports how often the
+count is exactly right and the mean absolute error. The best thresholds are
+written to a JSON file the server loads with REP_THRESHOLDS=<file>.
+
+Only the rep counter's enter/exit thresholds are tuned. The form-rule limits in
+model/feedback_rules.py (e.g. "Go deeper" above 120° of knee angle) stay as
+written: sessions are labeled with rep counts, not form faults, so there is
+nothing to score them against.
+
+    python tools/tune_thresholds.py sessions/ -o model/thresholds.json
+    python tools/tune_thresholds.py sessions/ --exercise squat --stride 2   # as if at half the fps
+"""
+import argparse
+import csv
+import itertools
+import json
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from model.rep_counter import EXERCISES
+from model.replay import exercise_angles, hysteresis
+from utils.recording import load_sessions
+
+# Set in each worker process so the angle series are sent once, not per task
+_angles = None
+_truth = None
+
+def _init_worker(angles, truth):
+    global _angles, _truth
+    _angles, _truth = angles, truth
+
+def score(configs, angles=None, truth=None):
+    """[(accuracy, mean absolute error, mean signed error)] for each config"""
+    angles = _angles if angles is None else angles
+    truth = _truth if truth is None else truth
+    scores = []
+    for config in configs:
+        counts = np.array([hysteresis(a, config)[1][-1] if len(a) else 0 for a in angles])
+        errors = counts - truth
+        scores.append((float(np.mean(errors == 0)), float(np.mean(np.abs(errors))), float(np.mean(errors))))
+    return scores
+
+def overlaps(enter, exit_):
+    """True when one angle can satisfy both thresholds (no hysteresis band)"""
+    (enter_op, enter_value), (exit_op, exit_value) = enter, exit_
+    if enter_op == exit_op:
+        return True
+    return enter_value >= exit_value if enter_op == "<" else enter_value <= exit_value
+
+def threshold_grid(config, span, step):
+    """Every non-overlapping (enter, exit) pair within +/- span degrees of the current thresholds"""
+    def values(threshold):
+        op, value = threshold
+        return [(op, float(v)) for v in np.arange(max(0, value - span), min(180, value + span) + 1e-9, step)]
+    return [dict(config, enter=enter, exit=exit_)
+            for enter, exit_ in itertools.product(values(config["enter"]), values(config["exit"]))
+            if not overlaps(enter, exit_)]
+
+def tune_exercise(exercise, sessions, args, world=None):
+    """Sweep the grid for one exercise; `world` overrides whether it counts on 3D angles"""
+    config = EXERCISES[exercise] if world is None else dict(EXERCISES[exercise], world=world)
+    angles = [exercise_angles(s["poses"], config, s.get("world"))[::args.stride] for s in sessions]
+    truth = np.array([s["reps"] for s in sessions])
+    grid = threshold_grid(config, args.span, args.step)
+
+    # A few chunks per worker keeps every core busy without much pickling
+    chunk = max(1, len(grid) // (args.workers * 4))
+    chunks = [grid[i:i + chunk] for i in range(0, len(grid), chunk)]
+    with ProcessPoolExecutor(args.workers, initializer=_init_worker, initargs=(angles, truth)) as pool:
+        scores = [s for chunk_scores in pool.map(score, chunks) for s in chunk_scores]
+
+    results = [{"enter": c["enter"], "exit": c["exit"], "accuracy": s[0], "mae": s[1], "bias": s[2]}
+               for c, s in zip(grid, scores)]
+    # Most exact counts, then smallest error, then the widest band (least sensitive to noise)
+    results.sort(key=lambda r: (-r["accuracy"], r["mae"], -abs(r["exit"][1] - r["enter"][1])))
+    baseline = score([config], angles, truth)[0]
+    return results, baseline
+
+def print_results(exercise, sessions, results, baseline, top):
+    print(f"\n=== {exercise}: {len(sessions)} sessions, {len(results)} threshold pairs ===")
+    print(f"current  enter {EXERCISES[exercise]['enter']} exit {EXERCISES[exercise]['exit']}: "
+          f"accuracy {baseline[0]:.1%}, MAE {baseline[1]:.2f}, bias {baseline[2]:+.2f}")
+    print(f"{'enter':>10} {'exit':>10} {'accuracy':>9} {'MAE':>6} {'bias':>6}")
+    for r in results[:top]:
+        print(f"{r['enter'][0]:>4} {r['enter'][1]:>5.1f} {r['exit'][0]:>4} {r['exit'][1]:>5.1f} "
+              f"{r['accuracy']:>9.1%} {r['mae']:>6.2f} {r['bias']:>+6.2f}")
+
+def main():
+    parser = argparse.ArgumentParser(description="Tune rep-counting (not form-rule) thresholds on labeled sessions")
+    parser.add_argument("sessions", help="directory of recorded .npz sessions")
+    parser.add_argument("--exercise", default=None, help="only tune this exercise")
+    parser.add_argument("--span", type=float, default=30, help="search +/- this many degrees (default 30)")
+    parser.add_argument("--step", type=float, default=2.5, help="grid step in degrees (default 2.5)")
+    parser.add_argument("--stride", type=int, default=1, help="use every Nth frame, to tune for a lower fps")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--top", type=int, default=10, help="rows to print per exercise")
+    parser.add_argument("-o", "--output", default=None, help="write the best thresholds here (merged if it exists)")
+    parser.add_argument("--csv", default=None, help="write every grid point's scores here")
+    args = parser.parse_args()
+
+    sessions = load_sessions(args.sessions, args.exercise, labeled_only=True)
+    by_exercise = {}
+    for session in sessions:
+        by_exercise.setdefault(session["exercise"], []).append(session)
+    if not by_exercise:
+        print(f"❌ No labeled sessions found in {args.sessions}")
+        return 1
+
+    tuned = {}
+    if args.output and os.path.exists(args.output):
+        with open(args.output) as f:
+            tuned = json.load(f)
+    rows = []
+    for exercise, exercise_sessions in sorted(by_exercise.items()):
+        if exercise not in EXERCISES:
+            print(f"⚠️ Skipping {len(exercise_sessions)} sessions of unknown exercise '{exercise}'")
+            continue
+        # Merge into the existing entry so settings such as "world": true survive (and are tuned for)
+        entry = tuned.setdefault(exercise, {})
+        results, baseline = tune_exercise(exercise, exercise_sessions, args, entry.get("world"))
+        print_results(exercise, exercise_sessions, results, baseline, args.top)
+        best = results[0]
+        entry.update({"enter": list(best["enter"]), "exit": list(best["exit"]),
+                      "accuracy": round(best["accuracy"], 4), "mae": round(best["mae"], 4),
+                      "sessions": len(exercise_sessions), "stride": args.stride})
+        rows += [dict(r, exercise=exercise) for r in results]
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(tuned, f, indent=2)
+        print(f"\n💾 Wrote thresholds to {args.output} (load with REP_THRESHOLDS={args.output})")
+    if args.csv:
+        with open(args.csv, "w", newline="") as f:
+            writer = csv.DictWriter(f, fieldnames=["exercise", "enter", "exit", "accuracy", "mae", "bias"])
+            writer.writeheader()
+            writer.writerows(rows)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,116 @@
+"""
+JPEG codecs for the frame path.
+
+Both codecs can decode straight to 1/2, 1/4 or 1/8 scale in the DCT domain,
+which is cheaper than decoding full size and resizing, and take an encode
+quality. The libjpeg-turbo codec (via the optional `simplejpeg` package) can
+also decode into a caller-owned buffer.
+"""
+import struct
+
+import cv2
+import numpy as np
+
+try:
+    import simplejpeg
+except ImportError:  # optional: fall back to OpenCV
+    simplejpeg = None
+
+DEFAULT_QUALITY = 80
+SCALES = (1, 2, 4, 8)
+
+# Start-of-frame markers that carry the image size (baseline, extended, progressive, ...)
+_SOF_MARKERS = {0xC0, 0xC1, 0xC2, 0xC3, 0xC5, 0xC6, 0xC7, 0xC9, 0xCA, 0xCB, 0xCD, 0xCE, 0xCF}
+
+def jpeg_dimensions(data):
+    """(height, width) from a JPEG header without decoding, or None if not found"""
+    data = memoryview(data).cast("B")
+    i = 2  # skip SOI
+    while i + 9 < len(data):
+        if data[i] != 0xFF:
+            i += 1
+            continue
+        marker = data[i + 1]
+        if marker in _SOF_MARKERS:
+            height, width = struct.unpack(">HH", data[i + 5:i + 9])
+            return height, width
+        if marker == 0xFF or 0xD0 <= marker <= 0xD9:
+            i += 1 if marker == 0xFF else 2
+            continue
+        i += 2 + struct.unpack(">H", data[i + 2:i + 4])[0]
+    return None
+
+def pick_scale(width, target_width):
+    """Largest DCT scale factor that still leaves at least target_width pixels"""
+    if not target_width or not width:
+        return 1
+    for scale in reversed(SCALES):
+        if width / scale >= target_width:
+            return scale
+    return 1
+
+class OpenCVCodec:
+    """cv2.imdecode/imencode with IMREAD_REDUCED_* scaled decoding"""
+    name = "opencv"
+    _FLAGS = {1: cv2.IMREAD_COLOR, 2: cv2.IMREAD_REDUCED_COLOR_2,
+              4: cv2.IMREAD_REDUCED_COLOR_4, 8: cv2.IMREAD_REDUCED_COLOR_8}
+
+    def __init__(self, quality=DEFAULT_QUALITY):
+        self.quality = quality
+
+    def decode(self, data, scale=1, out=None):
+        """Decode JPEG bytes to a BGR array at 1/scale size (imdecode cannot write into `out`)"""
+        return cv2.imdecode(np.frombuffer(data, dtype=np.uint8), self._FLAGS.get(scale, cv2.IMREAD_COLOR))
+
+    def encode(self, image, quality=None):
+        ok, buffer = cv2.imencode('.jpg', image, [cv2.IMWRITE_JPEG_QUALITY, quality or self.quality])
+        return buffer.tobytes() if ok else None
+
+class TurboJPEGCodec:
+    """libjpeg-turbo through simplejpeg: faster, and decodes into a reusable buffer"""
+    name = "turbojpeg"
+
+    def __init__(self, quality=DEFAULT_QUALITY, fast=True):
+        if simplejpeg is None:
+            raise ImportError("TurboJPEGCodec requires the 'simplejpeg' package")
+        self.quality = quality
+        self.fast = fast  # fast DCT / upsampling: a few % faster for a minor loss in quality
+
+    def decode(self, data, scale=1, out=None):
+        """Decode JPEG bytes to a BGR array at 1/scale size, into `out` when it is large enough"""
+        height, width, _, _ = simplejpeg.decode_jpeg_header(data)
+        # libjpeg-turbo picks the smallest scale that still meets the minimum size
+        min_height, min_width = -(-height // scale), -(-width // scale)
+        if out is not None and out.nbytes < min_height * min_width * 3:
+            out = None
+        return simplejpeg.decode_jpeg(data, colorspace='BGR', fastdct=self.fast, fastupsample=self.fast,
+                                      min_height=min_height, min_width=min_width, buffer=out)
+
+    def encode(self, image, quality=None):
+        # 4:2:0 chroma subsampling, as OpenCV uses, keeps files small
+        return simplejpeg.encode_jpeg(np.ascontiguousarray(image), quality=quality or self.quality,
+                                      colorspace='BGR', colorsubsampling='420', fastdct=self.fast)
+
+CODECS = {"opencv": OpenCVCodec, "turbojpeg": TurboJPEGCodec}
+
+def get_codec(name="auto", quality=DEFAULT_QUALITY):
+    """Codec by name; "auto" prefers libjpeg-turbo when simplejpeg is installed"""
+    if name == "auto":
+        name = "turbojpeg" if simplejpeg is not None else "opencv"
+    if name not in CODECS:
+        raise ValueError(f"Unknown codec '{name}', expected one of {sorted(CODECS)} or 'auto'")
+    return CODECS[name](quality=quality)
+
+def decode_scaled(codec, data, target_width=None, buffers=None):
+    """Decode at the smallest DCT scale that still covers target_width.
+
+    With a FrameBuffers, the image is decoded into its reusable "decode" buffer
+    (codecs that cannot write into a buffer simply return a new array).
+    """
+    size = jpeg_dimensions(data)
+    scale = pick_scale(size[1], target_width) if size is not None else 1
+    out = None
+    if buffers is not None and size is not None:
+        # libjpeg scaled output is ceil(dimension / scale)
+        out = buffers.get("decode", (-(-size[0] // scale), -(-size[1] // scale), 3))
+    return codec.decode(data, scale, out)
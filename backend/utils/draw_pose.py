@@ -1,28 +1,79 @@
+"""
+Skeleton overlay drawn with NumPy and a handful of OpenCV calls.
+
+MediaPipe's drawing_utils walks the landmarks and connections in Python and
+issues one cv2.line / cv2.circle per bone and joint on every frame. Here the
+connection index arrays are built once; each frame the landmarks become pixel
+coordinates in one array operation, and all bones and all joints are drawn
+with one cv2.polylines call each (a zero-length thick polyline is a dot).
+"""
 import cv2
 import numpy as np
 import mediapipe as mp
 
+from model.landmarks import NUM_LANDMARKS, X, Y, VISIBILITY, expand, landmarks_to_array
+
+# Same threshold MediaPipe's drawing_utils uses to hide joints
+MIN_VISIBILITY = 0.5
+
+WHITE, RED, GREEN = (255, 255, 255), (0, 0, 255), (0, 255, 0)
+
+def connection_pairs(connections=None):
+    """(K, 2) array of landmark index pairs to join (default: the full pose)"""
+    return np.array(sorted(connections or mp.solutions.pose.POSE_CONNECTIONS), dtype=np.intp)
+
+class SkeletonRenderer:
+    """Draws pose skeletons onto BGR frames"""
+
+    def __init__(self, bone_color=WHITE, joint_color=RED, thickness=2, radius=2, min_visibility=MIN_VISIBILITY,
+                 connections=None):
+        self.bone_color = bone_color
+        self.joint_color = joint_color
+        self.thickness = thickness
+        self.radius = radius
+        self.min_visibility = min_visibility
+        self.pairs = connection_pairs(connections)
+        # Each joint as a zero-length segment (i, i)
+        self.dots = np.repeat(np.arange(NUM_LANDMARKS), 2).reshape(-1, 2)
+
+    def draw(self, image, landmarks):
+        """Draw one pose in place: a full or compact landmark array, a landmark list, or
+        MediaPipe's pose_landmarks"""
+        if landmarks is None:
+            return image
+        pose = expand(landmarks) if isinstance(landmarks, np.ndarray) else \
+            landmarks_to_array(getattr(landmarks, "landmark", landmarks))
+        height, width = image.shape[:2]
+
+        # mp_drawing's rules: hide joints that are unlikely or outside the frame (NaN compares False)
+        x, y = pose[:, X], pose[:, Y]
+        visible = (pose[:, VISIBILITY] >= self.min_visibility) & (x >= 0) & (x <= 1) & (y >= 0) & (y <= 1)
+        if not visible.any():
+            return image
+        pixels = pose[:, :2] * (width, height)
+        pixels[~visible] = 0
+        points = pixels.astype(np.int32)
+
+        # (K, 2, 2) start/end pixel pairs in one gather, drawn in one call
+        bones = self.pairs[visible[self.pairs].all(axis=1)]
+        if len(bones):
+            cv2.polylines(image, points[bones], False, self.bone_color, self.thickness)
+        joints = points[self.dots[visible]]
+        if self.joint_color != self.bone_color:
+            # White rim, like mp_drawing's circle border
+            cv2.polylines(image, joints, False, WHITE, 2 * self.radius + 4)
+        cv2.polylines(image, joints, False, self.joint_color, 2 * self.radius + 2)
+        return image
+
+# All-green skeleton, as this module has always drawn it
+_renderer = SkeletonRenderer(bone_color=GREEN, joint_color=GREEN)
+
 def draw_pose_landmarks(image, landmarks, connections=None):
     """
     Draw pose landmarks and connections on an image
     """
-    if not landmarks:
+    if landmarks is None:
         return image
-    
-    mp_drawing = mp.solutions.drawing_utils
-    mp_pose = mp.solutions.pose
-    
-    # Use MediaPipe's default pose connections if none provided
-    if connections is None:
-        connections = mp_pose.POSE_CONNECTIONS
-    
-    # Draw the pose landmarks
-    mp_drawing.draw_landmarks(
-        image, 
-        landmarks, 
-        connections,
-        mp_drawing.DrawingSpec(color=(0, 255, 0), thickness=2, circle_radius=2),
-        mp_drawing.DrawingSpec(color=(0, 255, 0), thickness=2)
-    )
-    
-    return image
\ No newline at end of file
+    if connections is not None:
+        return SkeletonRenderer(GREEN, GREEN, connections=connections).draw(image, landmarks)
+    return _renderer.draw(image, landmarks)
@@ -0,0 +1,27 @@
+import numpy as np
+
+class FrameBuffers:
+    """Named NumPy buffers reused frame after frame by one stream.
+
+    A buffer is only reallocated when the requested shape or dtype changes, so
+    a steady stream of same-sized frames allocates nothing after the first one.
+    Not thread-safe: keep one instance per session or worker.
+    """
+
+    def __init__(self):
+        self._buffers = {}
+        self.allocations = 0  # how many times a buffer had to be (re)allocated
+
+    def get(self, name, shape, dtype=np.uint8):
+        buffer = self._buffers.get(name)
+        if buffer is None or buffer.shape != tuple(shape) or buffer.dtype != dtype:
+            buffer = np.empty(shape, dtype=dtype)
+            self._buffers[name] = buffer
+            self.allocations += 1
+        return buffer
+
+    def nbytes(self):
+        return sum(buffer.nbytes for buffer in self._buffers.values())
+
+    def clear(self):
+        self._buffers.clear()
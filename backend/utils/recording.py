@@ -0,0 +1,57 @@
+"""
+Recorded landmark sessions for offline replay and threshold tuning.
+
+A session is one .npz file holding the landmark array (NaN rows where no pose
+was found), per-frame timestamps, the exercise and, when known, the
+ground-truth rep count and the matching world-landmark array (meters, for
+exercises counted on 3D angles). Landmarks are stored compact, only the
+SUBSET joints (N, 12, 4); sessions saved with all 33 landmarks still load.
+The frame size (width, height) is kept too, so offline features see the same
+aspect ratio as the server; older sessions have none (None).
+"""
+import glob
+import os
+
+import numpy as np
+
+from model.landmarks import compact
+
+def save_session(path, poses, exercise, reps=None, timestamps=None, world=None, frame_size=None):
+    poses = compact(np.asarray(poses, dtype=np.float32))
+    if timestamps is None:
+        timestamps = np.arange(len(poses), dtype=np.float64)
+    extra = {} if world is None else {"world": compact(np.asarray(world, dtype=np.float32))}
+    if frame_size is not None:
+        extra["frame_size"] = np.asarray(frame_size, dtype=np.int32)
+    np.savez_compressed(path, poses=poses, timestamps=np.asarray(timestamps, dtype=np.float64),
+                        exercise=exercise, reps=-1 if reps is None else int(reps), **extra)
+
+def load_session(path):
+    with np.load(path) as data:
+        reps = int(data["reps"])
+        return {
+            "path": path,
+            "poses": data["poses"],
+            "timestamps": data["timestamps"],
+            "exercise": str(data["exercise"]),
+            "reps": None if reps < 0 else reps,
+            "world": data["world"] if "world" in data.files else None,
+            "frame_size": tuple(int(v) for v in data["frame_size"]) if "frame_size" in data.files else None,
+        }
+
+def session_aspect(session, default=1.0):
+    """Width / height of a session's frames, `default` when it wasn't recorded"""
+    frame_size = session.get("frame_size")
+    return frame_size[0] / frame_size[1] if frame_size else default
+
+def load_sessions(directory, exercise=None, labeled_only=False):
+    """All sessions in a directory (recursively), optionally for one exercise / with labels only"""
+    sessions = []
+    for path in sorted(glob.glob(os.path.join(directory, "**", "*.npz"), recursive=True)):
+        session = load_session(path)
+        if exercise and session["exercise"] != exercise:
+            continue
+        if labeled_only and session["reps"] is None:
+            continue
+        sessions.append(session)
+    return sessions
@@ -0,0 +1,141 @@
+"""
+Content-addressed caches for repeated analysis of identical inputs.
+
+Test scripts, retrying clients and re-analysis send byte-identical frames and
+videos. Keys are a hash of the payload (plus whatever settings change the
+result), so a repeat costs one hash instead of inference:
+
+- LRUCache: bounded in-memory cache for per-frame detector output, least
+  recently used entries evicted first.
+- DiskCache: directory of result files for whole-video analyses, evicted
+  oldest-access-first once it grows past `max_bytes`.
+"""
+import hashlib
+import logging
+import os
+import threading
+from collections import OrderedDict
+
+logger = logging.getLogger(__name__)
+
+_CHUNK = 1 << 20
+
+def content_key(payload, *settings):
+    """Hex digest of a payload (bytes or str) and any settings that change the result"""
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(payload.encode("utf-8") if isinstance(payload, str) else payload)
+    if settings:
+        digest.update(repr(settings).encode("utf-8"))
+    return digest.hexdigest()
+
+def file_key(path, *settings):
+    """content_key of a file's bytes, read in chunks"""
+    digest = hashlib.blake2b(digest_size=16)
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(_CHUNK), b""):
+            digest.update(chunk)
+    if settings:
+        digest.update(repr(settings).encode("utf-8"))
+    return digest.hexdigest()
+
+class LRUCache:
+    """Thread-safe in-memory cache holding at most `max_entries` results"""
+
+    def __init__(self, max_entries=256):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key, default=None):
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return self._entries[key]
+            self.misses += 1
+            return default
+
+    def put(self, key, value):
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def __len__(self):
+        return len(self._entries)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            }
+
+class DiskCache:
+    """Result files named by key in `directory`, kept under `max_bytes` in total.
+
+    get() marks an entry as used (its mtime), so eviction drops the entries
+    that have gone longest without a hit.
+    """
+
+    def __init__(self, directory, max_bytes=2 << 30, suffix=".npz"):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.suffix = suffix
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        os.makedirs(directory, exist_ok=True)
+
+    def path(self, key):
+        return os.path.join(self.directory, key + self.suffix)
+
+    def get(self, key, load):
+        """load(path) of the cached entry, or None"""
+        path = self.path(key)
+        if not os.path.exists(path):
+            self.misses += 1
+            return None
+        os.utime(path)
+        self.hits += 1
+        return load(path)
+
+    def put(self, key, save):
+        """Store an entry by calling save(path); written under a temporary name, so readers never see half a file"""
+        path = self.path(key)
+        partial = f"{path}.{os.getpid()}.partial{self.suffix}"
+        save(partial)
+        os.replace(partial, path)
+        self.evict()
+        return path
+
+    def evict(self):
+        entries = []
+        for name in os.listdir(self.directory):
+            if name.endswith(self.suffix) and ".partial" not in name:
+                stat = os.stat(os.path.join(self.directory, name))
+                entries.append((stat.st_mtime, stat.st_size, name))
+        total = sum(size for _, size, _ in entries)
+        for _, size, name in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            os.remove(os.path.join(self.directory, name))
+            total -= size
+            self.evictions += 1
+            logger.info(f"🧹 Evicted cached result {name}")
+
+    def stats(self):
+        return {"hits": self.hits, "misses": self.misses, "evictions": self.evictions}
@@ -0,0 +1,279 @@
+"""
+Shared-memory frame transport for capture clients running on the same host as the server.
+
+The client owns a ring of raw BGR frame slots in shared memory and writes each
+captured frame straight into the next slot. A small control message (slot,
+sequence number, exercise, session) goes over a local socket; the server wraps
+the slot in a NumPy view, runs the normal analysis pipeline on it, draws the
+skeleton back into the same slot and replies with the result dict. No JPEG,
+no base64, no HTTP, and no copies beyond the capture itself.
+
+Control messages are pickled, so the socket must only be reachable by the
+same user: the transport listens on a Unix socket (a named pipe on Windows)
+with owner-only permissions, never TCP, and every run of the server
+authenticates clients with a fresh random key. The key is written next to
+the socket in a 0600 file (or given to both sides in $LOCAL_TRANSPORT_KEY, hex).
+"""
+import logging
+import os
+import secrets
+import tempfile
+import threading
+import time
+from multiprocessing import AuthenticationError, resource_tracker
+from multiprocessing.connection import Client, Listener
+from multiprocessing.shared_memory import SharedMemory
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Windows named pipes (the local counterpart of Unix sockets) live under \\.\pipe\
+PIPE_PREFIX = "\\\\.\\pipe\\"
+DEFAULT_ADDRESS = "/tmp/formfeedback.sock" if os.name == "posix" else PIPE_PREFIX + "formfeedback"
+# Hex authkey shared by server and client instead of the key file
+KEY_ENV = "LOCAL_TRANSPORT_KEY"
+
+# Per-slot metadata: sequence number, height, width, capture time (µs)
+_META_FIELDS = 4
+
+def parse_address(address):
+    """Unix socket path (POSIX) or named pipe (Windows); TCP addresses are refused"""
+    address = address or DEFAULT_ADDRESS
+    # Pickled control messages must never be reachable over the network
+    if not isinstance(address, str) or (":" in address and not address.startswith(("/", PIPE_PREFIX))):
+        raise ValueError(f"Local transport only uses Unix sockets or named pipes, not {address!r}")
+    if os.name != "posix" and not address.startswith(PIPE_PREFIX):
+        address = PIPE_PREFIX + address
+    return address
+
+def key_path(address):
+    """File holding the authkey of the server listening on `address`"""
+    if os.name == "posix":
+        return address + ".key"
+    return os.path.join(tempfile.gettempdir(), address[len(PIPE_PREFIX):] + ".key")
+
+def create_authkey(address):
+    """Random authkey for this server run, saved where same-user clients can read it"""
+    if os.environ.get(KEY_ENV):
+        return bytes.fromhex(os.environ[KEY_ENV])
+    key = secrets.token_bytes(32)
+    path = key_path(address)
+    if os.path.lexists(path):
+        os.unlink(path)
+    # O_EXCL: never write through a file or symlink someone else put there
+    with os.fdopen(os.open(path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600), "wb") as f:
+        f.write(key)
+    return key
+
+def read_authkey(address):
+    if os.environ.get(KEY_ENV):
+        return bytes.fromhex(os.environ[KEY_ENV])
+    with open(key_path(address), "rb") as f:
+        return f.read()
+
+class FrameRing:
+    """Fixed number of raw-frame slots (max_height x max_width x 3) in shared memory"""
+
+    def __init__(self, shm, slots, max_height, max_width, owner):
+        self.shm = shm
+        self.slots = slots
+        self.max_height = max_height
+        self.max_width = max_width
+        self.owner = owner
+        self.meta = np.ndarray((slots, _META_FIELDS), dtype=np.int64, buffer=shm.buf)
+        offset = self.meta.nbytes
+        self.data = np.ndarray((slots, max_height, max_width, 3), dtype=np.uint8, buffer=shm.buf, offset=offset)
+
+    @staticmethod
+    def nbytes(slots, max_height, max_width):
+        return slots * _META_FIELDS * 8 + slots * max_height * max_width * 3
+
+    @classmethod
+    def create(cls, slots, max_height, max_width):
+        shm = SharedMemory(create=True, size=cls.nbytes(slots, max_height, max_width))
+        ring = cls(shm, slots, max_height, max_width, owner=True)
+        ring.meta[:] = 0
+        return ring
+
+    @classmethod
+    def attach(cls, name, slots, max_height, max_width):
+        shm = SharedMemory(name=name)
+        # The creating process owns the segment; stop our resource tracker from unlinking it at exit
+        try:
+            resource_tracker.unregister(shm._name, "shared_memory")
+        except Exception:
+            pass
+        return cls(shm, slots, max_height, max_width, owner=False)
+
+    @property
+    def name(self):
+        return self.shm.name
+
+    def describe(self):
+        return {"name": self.name, "slots": self.slots, "max_height": self.max_height, "max_width": self.max_width}
+
+    def write(self, seq, frame):
+        """Copy a frame into slot seq % slots and return the slot index"""
+        height, width = frame.shape[:2]
+        if height > self.max_height or width > self.max_width or frame.ndim != 3 or frame.shape[2] != 3:
+            raise ValueError(f"Frame {frame.shape} does not fit ring slots of {self.max_height}x{self.max_width}x3")
+        slot = seq % self.slots
+        self.data[slot, :height, :width] = frame
+        self.meta[slot] = (seq, height, width, int(time.time() * 1e6))
+        return slot
+
+    def view(self, slot):
+        """Zero-copy view of the frame currently in a slot, and its sequence number"""
+        seq, height, width, _ = self.meta[slot]
+        return self.data[slot, :height, :width], int(seq)
+
+    def close(self):
+        # Drop our views before releasing the mapping
+        self.meta = self.data = None
+        self.shm.close()
+        if self.owner:
+            self.shm.unlink()
+
+class LocalFrameClient:
+    """Capture-side endpoint: writes frames into the ring and exchanges control messages"""
+
+    def __init__(self, address=None, slots=4, max_height=None, max_width=None, session_id=None):
+        address = parse_address(address)
+        self.conn = Client(address, authkey=read_authkey(address))
+        self.session_id = session_id
+        self.slots = slots
+        self.max_height = max_height
+        self.max_width = max_width
+        self.ring = None
+        self.seq = 0
+
+    def _open_ring(self, frame):
+        # Size slots to the first frame unless told otherwise, so views stay contiguous
+        height, width = frame.shape[:2]
+        self.ring = FrameRing.create(self.slots, self.max_height or height, self.max_width or width)
+        self.conn.send({"op": "hello", "ring": self.ring.describe(), "session_id": self.session_id})
+
+    def submit(self, frame, **fields):
+        """Publish a frame without waiting; returns its sequence number"""
+        if self.ring is None:
+            self._open_ring(frame)
+        self.seq += 1
+        slot = self.ring.write(self.seq, frame)
+        message = {"op": "frame", "slot": slot, "seq": self.seq, "client_ts": time.time() * 1000}
+        if self.session_id:
+            message["session_id"] = self.session_id
+        message.update(fields)
+        self.conn.send(message)
+        return self.seq
+
+    def receive(self, timeout=None):
+        """Next reply from the server, or None on timeout"""
+        if timeout is not None and not self.conn.poll(timeout):
+            return None
+        return self.conn.recv()
+
+    def analyze(self, frame, timeout=2.0, **fields):
+        """Submit a frame and wait for its result.
+
+        Returns (result, annotated_frame); annotated_frame is a view of the ring
+        slot with the skeleton drawn in, valid until the slot is reused.
+        """
+        seq = self.submit(frame, **fields)
+        deadline = time.monotonic() + timeout
+        while True:
+            reply = self.receive(max(0.0, deadline - time.monotonic()))
+            if reply is None:
+                return None, frame
+            if reply.get("seq") == seq:
+                annotated, _ = self.ring.view(reply["slot"]) if "slot" in reply else (frame, seq)
+                return reply, annotated
+
+    def close(self):
+        try:
+            self.conn.send({"op": "bye"})
+            self.conn.close()
+        finally:
+            if self.ring is not None:
+                self.ring.close()
+
+class LocalFrameServer:
+    """Inference-side endpoint: one thread per connected capture client.
+
+    Each connection processes only the newest pending frame; older frames that
+    queued up while inference was busy are answered with {"dropped": true}.
+    """
+
+    def __init__(self, service, address=None):
+        self.service = service
+        self.address = parse_address(address)
+        if os.path.exists(self.address):
+            os.unlink(self.address)
+        self.key_path = None if os.environ.get(KEY_ENV) else key_path(self.address)
+        authkey = create_authkey(self.address)
+        # Owner-only socket: other local users can't even attempt the handshake
+        umask = os.umask(0o177)
+        try:
+            self.listener = Listener(self.address, authkey=authkey)
+        finally:
+            os.umask(umask)
+        self._thread = None
+
+    def start(self):
+        self._thread = threading.Thread(target=self.serve_forever, name="shm-transport", daemon=True)
+        self._thread.start()
+        return self
+
+    def serve_forever(self):
+        logger.info(f"🔌 Local frame transport listening on {self.address}")
+        while True:
+            try:
+                conn = self.listener.accept()
+            except AuthenticationError:
+                logger.warning("🔒 Local frame transport refused a client with the wrong key")
+                continue
+            except OSError:
+                break
+            threading.Thread(target=self._handle, args=(conn,), daemon=True).start()
+
+    def _handle(self, conn):
+        ring = None
+        try:
+            hello = conn.recv()
+            if hello.get("op") != "hello":
+                return
+            spec = hello["ring"]
+            ring = FrameRing.attach(spec["name"], spec["slots"], spec["max_height"], spec["max_width"])
+            while True:
+                message = conn.recv()
+                # Newest wins: skip frames that queued up behind a slow one
+                while message.get("op") == "frame" and conn.poll():
+                    newer = conn.recv()
+                    conn.send({"seq": message["seq"], "dropped": True})
+                    message = newer
+                if message.get("op") != "frame":
+                    break
+                conn.send(self._analyze(ring, message))
+        except (EOFError, OSError):
+            pass
+        finally:
+            if ring is not None:
+                ring.close()
+            conn.close()
+
+    def _analyze(self, ring, message):
+        frame, seq = ring.view(message["slot"])
+        if seq != message["seq"]:
+            # The client has already overwritten this slot
+            return {"seq": message["seq"], "dropped": True}
+        body, status, _ = self.service.analyze_frame(message, frame=frame)
+        reply = dict(body, seq=message["seq"], slot=message["slot"])
+        if status != 200:
+            reply["status"] = status
+        return reply
+
+    def close(self):
+        self.listener.close()
+        for path in (self.address, self.key_path):
+            if path is not None and os.path.exists(path):
+                os.unlink(path)
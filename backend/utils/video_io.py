@@ -0,0 +1,188 @@
+"""
+Headless video ingestion for offline analysis.
+
+VideoReader decodes on a background thread into a small bounded queue, so
+decoding overlaps with whatever the caller does with each frame (inference,
+rendering) while memory stays at `prefetch` frames. A reader can cover just a
+time range of the file, which lets one long video be split across workers
+with chunk_ranges(), and can keep only every `stride`-th frame: skipped frames
+are only grabbed (demuxed and decoded by the codec, never converted to BGR or
+copied to Python).
+
+Seeking goes through the container index, which lands on the keyframe before
+the target and decodes forward to it; the reader then checks the position it
+actually got and grabs its way to the exact first frame, so chunks tile the
+video with no duplicated or missing frames.
+"""
+import logging
+import math
+import queue
+import threading
+import time
+
+import cv2
+
+logger = logging.getLogger(__name__)
+
+_END = object()
+
+def is_camera(source):
+    return isinstance(source, int) or str(source).isdigit()
+
+def probe(source):
+    """fps, frame count, size and duration of a video file (without decoding it)"""
+    cap = cv2.VideoCapture(source)
+    if not cap.isOpened():
+        raise IOError(f"Could not open video {source}")
+    fps = cap.get(cv2.CAP_PROP_FPS) or 30.0
+    info = {
+        "fps": fps,
+        "frame_count": int(cap.get(cv2.CAP_PROP_FRAME_COUNT)),
+        "width": int(cap.get(cv2.CAP_PROP_FRAME_WIDTH)),
+        "height": int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT)),
+    }
+    info["duration"] = info["frame_count"] / fps
+    cap.release()
+    return info
+
+def stride_for(fps, target_fps=None):
+    """Frame stride that brings `fps` down to at most `target_fps` (1 = keep every frame)"""
+    if not target_fps or target_fps >= fps:
+        return 1
+    return max(1, math.ceil(fps / target_fps - 1e-6))
+
+def chunk_ranges(source, chunks=None, chunk_seconds=None):
+    """Split a video into back-to-back (start, end) time ranges in seconds, one per worker.
+
+    Boundaries fall on whole frames, so readers given these ranges see every
+    frame exactly once between them.
+    """
+    info = probe(source) if not isinstance(source, dict) else source
+    fps, total = info["fps"], info["frame_count"]
+    if chunk_seconds:
+        size = max(1, round(chunk_seconds * fps))
+    else:
+        size = max(1, math.ceil(total / (chunks or 1)))
+    return [(start / fps, min(start + size, total) / fps) for start in range(0, total, size)]
+
+def _seek(cap, frame):
+    """Position `cap` so the next grab returns frame index `frame`; returns the index reached"""
+    if frame <= 0:
+        return 0
+    cap.set(cv2.CAP_PROP_POS_FRAMES, frame)
+    position = int(cap.get(cv2.CAP_PROP_POS_FRAMES))
+    if position > frame or position < 0:
+        # Container seek overshot (broken index): rewind and walk forward
+        cap.set(cv2.CAP_PROP_POS_FRAMES, 0)
+        position = 0
+    while position < frame and cap.grab():
+        position += 1
+    return position
+
+class VideoReader:
+    """Iterates (frame_index, timestamp, frame) over a video file or camera.
+
+        with VideoReader("squat.mp4", start=30.0, end=60.0, stride=2) as reader:
+            for index, timestamp, frame in reader:
+                ...
+
+    `start`/`end` are seconds (end exclusive), `stride` keeps every n-th frame
+    of the whole video (so chunks read separately decimate on the same grid),
+    `target_fps` picks the stride from the file's frame rate instead.
+    Timestamps are frame times for files and wall-clock seconds for cameras.
+    """
+
+    def __init__(self, source, start=0.0, end=None, stride=1, target_fps=None, prefetch=8):
+        self.source = int(source) if is_camera(source) else source
+        self.camera = is_camera(source)
+        self.cap = cv2.VideoCapture(self.source)
+        if not self.cap.isOpened():
+            raise IOError(f"Could not open video {source}")
+        self.fps = self.cap.get(cv2.CAP_PROP_FPS) or 30.0
+        self.frame_count = 0 if self.camera else int(self.cap.get(cv2.CAP_PROP_FRAME_COUNT))
+        self.stride = stride_for(self.fps, target_fps) if target_fps else max(1, int(stride))
+        self.start_frame = 0 if self.camera else round(start * self.fps)
+        self.end_frame = None if end is None or self.camera else min(round(end * self.fps), self.frame_count)
+        self.decoded = 0  # frames handed to the consumer
+        self.grabbed = 0  # frames skipped by stride without being retrieved
+        self._queue = queue.Queue(maxsize=prefetch)
+        self._stop = threading.Event()
+        self._thread = None
+        self._error = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def __iter__(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._decode, name="video-reader", daemon=True)
+            self._thread.start()
+        while True:
+            item = self._queue.get()
+            if item is _END:
+                break
+            yield item
+        if self._error is not None:
+            raise self._error
+
+    def _put(self, item):
+        # Blocks while the consumer is behind, but still notices close()
+        while not self._stop.is_set():
+            try:
+                self._queue.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                pass
+        return False
+
+    def _decode(self):
+        try:
+            index = _seek(self.cap, self.start_frame)
+            if index < self.start_frame:
+                logger.warning(f"⚠️ {self.source} ends before {self.start_frame / self.fps:.2f}s")
+            started = time.monotonic()
+            while not self._stop.is_set() and (self.end_frame is None or index < self.end_frame):
+                if not self.cap.grab():
+                    break
+                if index % self.stride == 0:
+                    ok, frame = self.cap.retrieve()
+                    if not ok:
+                        break
+                    timestamp = time.monotonic() - started if self.camera else index / self.fps
+                    self.decoded += 1
+                    if not self._put((index, timestamp, frame)):
+                        break
+                else:
+                    self.grabbed += 1
+                index += 1
+        except Exception as e:
+            self._error = e
+        finally:
+            self.cap.release()
+            if not self._put(_END):
+                # Closed early: nobody reads the rest, make room for the end marker
+                while True:
+                    try:
+                        self._queue.put_nowait(_END)
+                        break
+                    except queue.Full:
+                        try:
+                            self._queue.get_nowait()
+                        except queue.Empty:
+                            pass
+
+    def close(self):
+        """Stop decoding early and release the file"""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+        else:
+            self.cap.release()
+
+def read_frames(source, start=0.0, end=None, stride=1, target_fps=None, prefetch=8):
+    """Generator over (frame_index, timestamp, frame) that always releases the file"""
+    with VideoReader(source, start, end, stride, target_fps, prefetch) as reader:
+        yield from reader
@@ -2,14 +2,25 @@ import cv2
 import requests
 import json
 import base64
+import os
+import sys
+import time
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'backend'))
+from utils.codec import get_codec
 
 # Flask API configuration
 FLASK_API_URL = "http://localhost:5000/api"
 
-def encode_frame_to_base64(frame):
+# Server asked us to back off (429/503) until this time
+backoff_until = 0.0
+
+# Upload codec (libjpeg-turbo when simplejpeg is installed) and quality, shared with the backend
+CODEC = get_codec()
+
+def encode_frame_to_base64(frame, quality=None):
     """Convert frame to base64 string for API transmission"""
-    _, buffer = cv2.imencode('.jpg', frame)
-    frame_base64 = base64.b64encode(buffer).decode('utf-8')
+    frame_base64 = base64.b64encode(CODEC.encode(frame, quality)).decode('utf-8')
     return frame_base64
 
 def decode_base64_to_frame(base64_string):
@@ -26,12 +37,20 @@ def decode_base64_to_frame(base64_string):
 
 def call_flask_api(endpoint, data):
     """Generic function to call Flask API endpoints"""
+    global backoff_until
+    if time.time() < backoff_until:
+        return None
     try:
         response = requests.post(f"{FLASK_API_URL}/{endpoint}", 
                                json=data, 
                                timeout=2)
         if response.status_code == 200:
             return response.json()
+        elif response.status_code in (429, 503):
+            # Overloaded or frame dropped: honour the server's retry hint
+            retry_after_ms = response.json().get('retry_after_ms', 1000)
+            backoff_until = time.time() + retry_after_ms / 1000
+            return None
         else:
             print(f"API Error: {response.status_code}")
             return None
@@ -42,7 +61,8 @@ def call_flask_api(endpoint, data):
 def send_frame_for_analysis(frame):
     """Send frame to Flask backend that uses YOUR classes"""
     data = {
-        'frame': encode_frame_to_base64(frame)
+        'frame': encode_frame_to_base64(frame),
+        'client_ts': time.time() * 1000  # lets the server drop frames we've given up on
     }
     return call_flask_api("analyze-frame", data)
 
@@ -55,8 +75,20 @@ def get_gemini_feedback(frame, issue):
     }
     return call_flask_api("get-gemini-feedback", data)
 
-def main(video_path=0):
+def connect_local_transport(address=None):
+    """Connect to a backend on this machine over shared memory (no JPEG/base64/HTTP)"""
+    from multiprocessing import AuthenticationError
+    from utils.shm_transport import LocalFrameClient
+    try:
+        return LocalFrameClient(address)
+    except (OSError, ValueError, AuthenticationError) as e:
+        print(f"Local transport not available ({e}), using HTTP")
+        return None
+
+def main(video_path=0, local_transport=None):
     cap = cv2.VideoCapture(video_path)
+    # Same-host backend started with --local-transport: frames go through shared memory
+    local_client = connect_local_transport(local_transport or None) if local_transport is not None else None
     
     # Variables for optimization
     frame_count = 0
@@ -76,9 +108,6 @@ def main(video_path=0):
     
     # Local fallback imports (if backend is not available)
     if not use_backend:
-        import sys
-        import os
-        sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'backend'))
         from model.pose_detector import PoseDetector
         from model.feedback_rules import check_pullup_form
         from model.rep_counter import RepCounter
@@ -95,7 +124,13 @@ def main(video_path=0):
         
         if use_backend:
             # === BACKEND MODE: Use your classes through Flask API ===
-            api_response = send_frame_for_analysis(frame)
+            if local_client:
+                # Skeleton is drawn straight into the shared frame slot
+                api_response, frame = local_client.analyze(frame)
+                if api_response and (api_response.get('dropped') or 'error' in api_response):
+                    api_response = None
+            else:
+                api_response = send_frame_for_analysis(frame)
             
             if api_response:
                 # Get processed frame from backend (with pose overlay)
@@ -187,11 +222,19 @@ def main(video_path=0):
     
     cap.release()
     cv2.destroyAllWindows()
+    if local_client:
+        local_client.close()
 
 if __name__ == "__main__":
+    import argparse
+    parser = argparse.ArgumentParser(description="Gym Form Detection client")
+    parser.add_argument("--local-transport", nargs="?", const="", default=None, metavar="ADDRESS",
+                        help="send frames over shared memory to a backend on this machine")
+    args = parser.parse_args()
+
     print("Starting Gym Form Detection...")
     print("Controls:")
     print("- 'q': Quit")
     print("- 'r': Reset counter (backend mode only)")
     print("\nTrying to connect to Flask backend...")
-    main(0)  # 0 = default webcam
\ No newline at end of file
+    main(0, args.local_transport)  # 0 = default webcam
\ No newline at end of file
@@ -1,5 +1,5 @@
 import { useCallback, useRef, useState } from 'react';
-import { flaskApi, FlaskApiAdapter } from '@/lib/adapters/flask-api';
+import { flaskApi, FlaskApiAdapter, BackoffError } from '@/lib/adapters/flask-api';
 
 export interface PoseAnalysisResult {
   haspose: boolean;
@@ -8,6 +8,7 @@ export interface PoseAnalysisResult {
   stage: string;
   feedback: string;
   processedFrame?: string;
+  processedFrameJpeg?: Uint8Array;
 }
 
 export interface PoseAnalysisOptions {
@@ -22,18 +23,25 @@ export const usePoseAnalysis = () => {
   const [error, setError] = useState<string | null>(null);
   const intervalRef = useRef<NodeJS.Timeout | null>(null);
   const videoRef = useRef<HTMLVideoElement | null>(null);
+  const backoffUntilRef = useRef(0);
 
   const analyzeFrame = useCallback(async (exerciseType: string): Promise<PoseAnalysisResult | null> => {
     if (!videoRef.current) {
       throw new Error('Video element not available');
     }
 
+    // Server asked us to back off; skip this tick instead of piling up requests
+    if (Date.now() < backoffUntilRef.current) {
+      return null;
+    }
+
     try {
       const frame = FlaskApiAdapter.encodeFrameToBase64(videoRef.current);
-      const apiResponse = await flaskApi.analyzeFrame({ 
+      // Binary responses are smaller and cheaper to parse than JSON at frame rate
+      const apiResponse = await flaskApi.analyzeFrame({
         frame,
         exercise_type: exerciseType.toLowerCase()
-      });
+      }, true);
 
       const result: PoseAnalysisResult = {
         haspose: apiResponse.has_pose || false,
@@ -41,13 +49,18 @@ export const usePoseAnalysis = () => {
         angle: apiResponse.armpit_angle || 0,
         stage: apiResponse.stage || 'unknown',
         feedback: apiResponse.feedback || 'No feedback',
-        processedFrame: apiResponse.processed_frame
+        processedFrame: apiResponse.processed_frame,
+        processedFrameJpeg: apiResponse.processed_frame_jpeg
       };
 
       setLastResult(result);
       setError(null);
       return result;
     } catch (err) {
+      if (err instanceof BackoffError) {
+        backoffUntilRef.current = Date.now() + err.retryAfterMs;
+        return null;
+      }
       const errorMessage = err instanceof Error ? err.message : 'Analysis failed';
       setError(errorMessage);
       console.error('Pose analysis error:', err);
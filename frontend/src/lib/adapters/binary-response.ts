@@ -0,0 +1,164 @@
+import type { PoseAnalysisResponse, QualityTier, TrackedPerson } from './flask-api';
+
+// Compact analyze-frame response (Accept: application/x-formfeedback).
+// Mirrors backend/server/encoding.py; keep the tables and layout in step with it.
+export const BINARY_MEDIA_TYPE = 'application/x-formfeedback';
+
+const VERSION = 4;
+const HAS_POSE = 1, LANDMARKS = 2, PEOPLE = 4, TIMINGS = 8, FRAME = 16, REUSED = 32, IDLE = 64, REP_SCORE = 128;
+
+const QUALITY_NAMES: Array<QualityTier | undefined> = [undefined, 'lite', 'full', 'heavy'];
+const STAGE_NAMES: Array<string | null> = [null, 'up', 'down'];
+const EXERCISE_NAMES: Array<string | undefined> = [undefined, 'pullup', 'squat', 'shoulderabduction'];
+const TIMING_NAMES = ['', 'decode', 'inference', 'analysis', 'encode', 'gate', 'presence'];
+const FEEDBACK_MESSAGES = [
+  '',
+  'No pose detected',
+  'No person detected.',
+  'Unknown exercise type',
+  'Pull-up form is good!',
+  'Pull higher, arms not bending enough.',
+  'Lower fully, arms not straight enough.',
+  'Body is swinging, keep stable.',
+  'Squat form is good!',
+  'Go deeper, knees not bending enough.',
+  'Stand up fully, incomplete extension.',
+  'Keep torso upright, avoid leaning forward.',
+  'Shoulder abduction form is good!',
+  'Raise arms higher, not enough elevation.',
+  'Lower arms fully to sides.',
+  'Keep arms straight, avoid bending elbows.',
+  'Slow down, control the movement.',
+];
+
+const textDecoder = new TextDecoder();
+
+class Reader {
+  pos = 0;
+  private buffer: ArrayBuffer;
+  private view: DataView;
+  private bytes: Uint8Array;
+
+  constructor(buffer: ArrayBuffer) {
+    this.buffer = buffer;
+    this.view = new DataView(buffer);
+    this.bytes = new Uint8Array(buffer);
+  }
+
+  u8(): number {
+    return this.bytes[this.pos++];
+  }
+
+  varint(): number {
+    let value = 0;
+    let scale = 1;
+    for (;;) {
+      const byte = this.u8();
+      value += (byte & 0x7f) * scale;
+      if (byte < 0x80) return value;
+      scale *= 128;
+    }
+  }
+
+  f32(): number {
+    const value = this.view.getFloat32(this.pos, true);
+    this.pos += 4;
+    return value;
+  }
+
+  bytesView(size: number): Uint8Array {
+    const view = this.bytes.subarray(this.pos, this.pos + size);
+    this.pos += size;
+    return view;
+  }
+
+  // Zero-copy when aligned (the server pads the landmark block to 4 bytes)
+  float32Array(count: number): Float32Array {
+    const array = new Float32Array(this.buffer, this.pos, count);
+    this.pos += count * 4;
+    return array;
+  }
+
+  feedback(): string {
+    const parts: string[] = [];
+    for (let n = this.varint(); n > 0; n--) {
+      const code = this.varint();
+      parts.push(code ? FEEDBACK_MESSAGES[code] ?? '' : textDecoder.decode(this.bytesView(this.varint())));
+    }
+    return parts.join(' | ');
+  }
+}
+
+export function decodeAnalysisResponse(buffer: ArrayBuffer): PoseAnalysisResponse {
+  const reader = new Reader(buffer);
+  const version = reader.u8();
+  if (version !== VERSION) {
+    throw new Error(`Unsupported binary response version ${version}`);
+  }
+  const flags = reader.u8();
+  const quality = QUALITY_NAMES[reader.u8()];
+  const stage = STAGE_NAMES[reader.u8()] ?? '';
+  // Detected exercise in auto mode (0 otherwise)
+  const exercise = EXERCISE_NAMES[reader.u8()];
+  // The classifier's movement phase, as a stage code (0 when there is none)
+  const phase = STAGE_NAMES[reader.u8()];
+  const result: PoseAnalysisResponse = {
+    quality,
+    stage,
+    reps: reader.varint(),
+    armpit_angle: reader.f32(),
+    feedback: reader.feedback(),
+    has_pose: (flags & HAS_POSE) !== 0,
+  };
+  if (exercise) {
+    result.exercise = exercise;
+  }
+  if (phase) {
+    result.phase = phase;
+  }
+  if (flags & REP_SCORE) {
+    result.rep_score = reader.f32();
+  }
+  if (flags & REUSED) {
+    result.reused = true;
+  }
+  if (flags & IDLE) {
+    result.idle = true;
+  }
+
+  if (flags & LANDMARKS) {
+    // MediaPipe index of each row (the server sends only the joints it uses)
+    const indices = reader.bytesView(reader.u8());
+    reader.pos += (4 - (reader.pos % 4)) % 4;
+    // One row of x, y, z, visibility per index
+    result.landmark_indices = Array.from(indices);
+    result.landmarks = reader.float32Array(indices.length * 4);
+  }
+  if (flags & PEOPLE) {
+    const people: TrackedPerson[] = [];
+    for (let n = reader.varint(); n > 0; n--) {
+      people.push({
+        track_id: reader.varint(),
+        reps: reader.varint(),
+        stage: STAGE_NAMES[reader.u8()],
+        armpit_angle: reader.f32(),
+        feedback: reader.feedback(),
+        center: [reader.f32(), reader.f32()],
+      });
+    }
+    result.people = people;
+  }
+  if (flags & TIMINGS) {
+    const timings: Record<string, number> = {};
+    for (let n = reader.u8(); n > 0; n--) {
+      const code = reader.u8();
+      timings[TIMING_NAMES[code] || String(code)] = reader.f32();
+    }
+    result.timings_ms = timings;
+  }
+  if (flags & FRAME) {
+    // Raw JPEG: wrap in a Blob / object URL instead of a base64 data URL
+    result.processed_frame_jpeg = reader.bytesView(reader.varint());
+  }
+  return result;
+}
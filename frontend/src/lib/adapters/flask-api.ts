@@ -1,4 +1,5 @@
 import { SessionSummary, SessionDetail, Comment, Appointment, PresignedUpload, ID } from '@/types';
+import { BINARY_MEDIA_TYPE, decodeAnalysisResponse } from './binary-response';
 
 // Flask API configuration
 const FLASK_API_BASE_URL = process.env.NEXT_PUBLIC_FLASK_API_URL || 'http://localhost:5000/api';
@@ -9,11 +10,26 @@ export interface FlaskApiResponse<T = any> {
   data?: T;
 }
 
+export type QualityTier = 'lite' | 'full' | 'heavy';
+
+// One person in multi-person mode
+export interface TrackedPerson {
+  track_id: number;
+  reps: number;
+  stage: string | null;
+  armpit_angle: number;
+  feedback: string;
+  center: [number, number];
+}
+
 export interface PoseAnalysisResponse {
   feedback: string;
   reps: number;
   armpit_angle: number;
   stage: string;
+  rep_score?: number | null; // 0-100 match of the last completed rep to the reference movement
+  exercise?: string; // detected exercise when exercise_type is "auto"
+  phase?: string; // "up" / "down" from the exercise classifier (auto mode with a classifier)
   processed_frame?: string;
   pose_landmarks?: Array<{
     name: string;
@@ -24,6 +40,38 @@ export interface PoseAnalysisResponse {
   }>;
   clean_frame?: string;
   has_pose?: boolean;
+  quality?: QualityTier;
+  people?: TrackedPerson[];
+  reused?: boolean; // nothing moved; the previous frame's result was returned
+  idle?: boolean; // nobody in view; only a cheap presence probe ran
+  timings_ms?: Record<string, number>;
+  // Binary responses only: (x, y, z, visibility) rows for the MediaPipe landmarks in
+  // landmark_indices, and the annotated frame as raw JPEG
+  landmarks?: Float32Array;
+  landmark_indices?: number[];
+  processed_frame_jpeg?: Uint8Array;
+}
+
+export interface AnalyzeFrameRequest {
+  frame: string; // base64 encoded image
+  exercise_type?: string; // Add exercise type parameter
+  session_id?: string;
+  quality?: QualityTier;
+  multi_person?: boolean;
+  landmarks?: boolean; // include pose landmarks in the response
+}
+
+// One live-metrics update for a watched session (GET sessions/<id>/events)
+export interface SessionUpdate {
+  session_id: string;
+  ts: number;
+  reps?: number;
+  stage?: string | null;
+  armpit_angle?: number;
+  feedback?: string;
+  rep_score?: number | null;
+  has_pose?: boolean;
+  quality?: QualityTier;
 }
 
 export interface GeminiFeedbackResponse {
@@ -44,6 +92,13 @@ export interface ResetCounterResponse {
   message: string;
 }
 
+// Thrown when the server sheds load (429/503); callers should wait retryAfterMs
+export class BackoffError extends Error {
+  constructor(public status: number, public retryAfterMs: number) {
+    super(`Server busy (${status}), retry in ${retryAfterMs}ms`);
+  }
+}
+
 class FlaskApiAdapter {
   private baseUrl: string;
 
@@ -66,13 +121,23 @@ class FlaskApiAdapter {
         ...options,
       });
 
+      if (response.status === 429 || response.status === 503) {
+        const body = await response.json().catch(() => ({}));
+        throw new BackoffError(response.status, body.retry_after_ms ?? 1000);
+      }
+
       if (!response.ok) {
         throw new Error(`HTTP error! status: ${response.status}`);
       }
 
+      if (response.headers.get('Content-Type')?.startsWith(BINARY_MEDIA_TYPE)) {
+        return decodeAnalysisResponse(await response.arrayBuffer()) as T;
+      }
       return await response.json();
     } catch (error) {
-      console.error(`API request failed for ${endpoint}:`, error);
+      if (!(error instanceof BackoffError)) {
+        console.error(`API request failed for ${endpoint}:`, error);
+      }
       throw error;
     }
   }
@@ -128,14 +193,25 @@ class FlaskApiAdapter {
   }
 
   // Analyze single frame
-  async analyzeFrame(data: {
-    frame: string; // base64 encoded image
-    exercise_type?: string; // Add exercise type parameter
-  }): Promise<PoseAnalysisResponse> {
+  // binary: ask for the compact encoding (smaller, faster to parse; frame as raw JPEG bytes)
+  async analyzeFrame(data: AnalyzeFrameRequest, binary = false): Promise<PoseAnalysisResponse> {
     return this.makeRequest('analyze-frame', {
       method: 'POST',
-      body: JSON.stringify(data),
+      ...(binary ? { headers: { 'Content-Type': 'application/json', Accept: BINARY_MEDIA_TYPE } } : {}),
+      // client_ts lets the server drop frames that are already too old to matter
+      body: JSON.stringify({ client_ts: Date.now(), ...data }),
+    });
+  }
+
+  // Watch a session's live reps/stage/angle/feedback (server-sent events, no polling).
+  // EventSource reconnects on its own if the server drops a slow connection.
+  // Returns a function that stops watching.
+  subscribeToSession(sessionId: string, onUpdate: (update: SessionUpdate) => void): () => void {
+    const source = new EventSource(`${this.baseUrl}/sessions/${encodeURIComponent(sessionId)}/events`);
+    source.addEventListener('update', (event) => {
+      onUpdate(JSON.parse((event as MessageEvent).data));
     });
+    return () => source.close();
   }
 
   // Utility function to encode frame to base64